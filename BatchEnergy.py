@@ -0,0 +1,555 @@
+'''
+Filename: BatchEnergy.py
+Author: Michael Hathaway
+
+Description: The Batch Energy module calculates free energies for large numbers of StructureComponents at once. The
+components are packed into encoded numpy arrays and the energy model is evaluated with array operations using the tables
+in the EnergyTables module, instead of calling the energy() method of every component. Each batch function returns an
+array of energies together with a boolean mask that marks the components whose energy() method would return None.
+Energies under the mask are NaN. The results match the energy() methods of the StructureComponent classes exactly.
+Every batch function takes a temperature in Kelvin and reads the cached tables for that temperature from EnergyTables.energyTables().
+'''
+
+## Module Imports ##
+import numpy as np
+
+## Diagnostics Imports ##
+from Diagnostics import report
+
+## Energy Table Imports ##
+from EnergyTables import T, R, energyTables, SPECIAL_HAIRPIN_LENGTHS, BASE_CODES, PAIR_CODES, UNKNOWN_PAIR
+from EnergyTables import encodeSequence, encodeBase, encodePair, encodePairs, hairpinInitEnergy, bulgeInitEnergy, internalLoopInitEnergy
+
+## Free Energy Parameter Imports ##
+from StructureComponents import INTERMOLECULAR_INIT, STEM_SYMMETRY_PENALTY, STEM_AU_END_PENALTY
+from StructureComponents import HAIRPIN_UU_GA_FIRST_MISMATCH_BONUS, HAIRPIN_GG_FIRST_MISMATCH_BONUS, HAIRPIN_SPECIAL_GU_CLOSURE
+from StructureComponents import HAIRPIN_C3, HAIRPIN_C_LOOP_A, HAIRPIN_C_LOOP_B, SPECIAL_C_BULGE
+from StructureComponents import INNER_LOOP_ASYMMETRY_PENALTY, INNER_LOOP_CLOSING_PENALTY
+
+#internal loop size classes used by batchInternalLoopEnergy()
+LOOP_1x1, LOOP_1x2, LOOP_2x1, LOOP_2x2, LOOP_2x3, LOOP_3x2, LOOP_1xN, LOOP_OTHER = range(8)
+
+#pair codes that receive the terminal AU/GU penalty at the end of a helix
+END_PENALTY_PAIRS = np.array([PAIR_CODES[pair] for pair in [('A', 'U'), ('U', 'A'), ('G', 'U'), ('U', 'G')]])
+
+
+'''
+Function Name: _raggedColumnSum(values, offsets, counts, total)
+Description: Internal function that adds up a ragged array one column at a time. Row i of the ragged array is
+values[offsets[i]:offsets[i]+counts[i]]. Adding the columns in order reproduces the left to right summation of the scalar
+energy functions, so the sums are bit for bit identical to adding the values one at a time in a python loop.
+Parameters:
+        (values) - numpy array of float64 - concatenated rows
+        (offsets) - numpy array of int - start of each row in values
+        (counts) - numpy array of int - length of each row
+        (total) - numpy array of float64 - running sums that the rows are added to in place
+Return Type:
+        numpy array of float64 - total
+'''
+def _raggedColumnSum(values, offsets, counts, total):
+    order = np.argsort(-counts, kind='stable') #longest rows first so the rows still being summed are always a prefix
+    sortedCounts = counts[order]
+    sortedOffsets = offsets[order]
+    for column in range(int(sortedCounts[0]) if len(sortedCounts) else 0):
+        active = np.searchsorted(-sortedCounts, -column, side='left') #number of rows longer than column
+        rows = order[:active]
+        total[rows] += values[sortedOffsets[:active] + column]
+    return total
+
+
+'''
+Function Name: _packSequences(sequences)
+Description: Internal function that encodes a list of sequences into one concatenated array of base codes
+Parameters:
+        (sequences) - list of str - sequences to encode
+Return Type:
+        (numpy array of int8, numpy array of int64, numpy array of int64) - base codes, start offset of each sequence, length of each sequence
+'''
+def _packSequences(sequences):
+    lengths = np.array([len(sequence) for sequence in sequences], dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1])) if len(lengths) else np.zeros(0, dtype=np.int64)
+    bases = np.append(encodeSequence(''.join(sequences)), BASE_CODES['A']) #trailing base keeps empty sequences in bounds
+    return bases, offsets, lengths
+
+
+'''
+Function Name: _lengthTerm(lengths, function)
+Description: Internal function that evaluates a scalar energy term of a loop length once for every distinct length. Initiation
+energies are looked up or extrapolated by the same EnergyTables function used by the energy() methods, so they are identical.
+Parameters:
+        (lengths) - numpy array of int - loop lengths
+        (function) - function - scalar function of a loop length
+Return Type:
+        numpy array of float64
+'''
+def _lengthTerm(lengths, function):
+    uniqueLengths, inverse = np.unique(lengths, return_inverse=True)
+    values = np.array([function(int(length)) for length in uniqueLengths], dtype=np.float64)
+    return values[inverse].reshape(lengths.shape)
+
+
+'''
+Function Name: batchStemEnergy(stems, strict=True, init=False, temperature=T)
+Description: Function calculates the folding free energy change of many stems at once. The result for each stem matches
+Stem.energy(strict, init), including the symmetry penalty, the terminal AU/GU penalty, and the exemption from the terminal
+penalty for stem ends next to a bulge of length 1.
+Parameters:
+        (stems) - iterable of Stem objects - stems to evaluate, for example from Structure.stems() or a whole corpus
+        (strict=True) -- bool -- when true, stems with a missing stacking parameter are masked as missing.
+                                 When false, missing stacking parameters are skipped.
+        (init=False) -- bool -- when true, the 4.09 Kcal/mol initiation value is included in the energies
+        (temperature=T) -- float -- temperature in Kelvin
+Return Type:
+        (numpy array of float64, numpy array of bool) - energy of each stem in input order, and a mask that is True where
+        Stem.energy() would return None. Masked energies are NaN.
+'''
+def batchStemEnergy(stems, strict=True, init=False, temperature=T):
+    stems = list(stems)
+    if not stems:
+        return np.zeros(0, dtype=np.float64), np.zeros(0, dtype=bool)
+
+    #pack the stems into one concatenated array of base codes for each strand
+    #the 3' strand is reversed so that position i of both strands forms the i-th base pair of the stem
+    numPairs = np.array([min(len(stem._sequence5p), len(stem._sequence3p)) for stem in stems], dtype=np.int64)
+    stemLens = np.array([stem._sequenceLen for stem in stems], dtype=np.int64)
+    bases5p = encodeSequence(''.join(stem._sequence5p[:n] for stem, n in zip(stems, numPairs)))
+    bases3p = encodeSequence(''.join(stem._sequence3p[::-1][:n] for stem, n in zip(stems, numPairs)))
+    symmetric = np.array([stem._sequence5p == stem._sequence3p for stem in stems], dtype=bool)
+    adjacentBulges = np.array([stem._adjacentBulgeBoolean() for stem in stems], dtype=bool).reshape(len(stems), 2)
+
+    return batchStemEnergyArrays(bases5p, bases3p, numPairs, stemLens, symmetric, adjacentBulges, strict=strict, init=init, temperature=temperature,
+                                 fallback=lambda i: stems[i].energy(strict=strict, init=init, temperature=temperature))
+
+
+'''
+Function Name: batchStemEnergyArrays(bases5p, bases3p, numPairs, stemLens, symmetric, adjacentBulges, strict=True, init=False, temperature=T, fallback=None)
+Description: Function calculates the folding free energy change of many stems that are already packed into arrays, for example
+by a ComponentStore. batchStemEnergy() packs Stem objects and calls this function.
+Parameters:
+        (bases5p) - numpy array of int - concatenated base codes of the first numPairs bases of the 5' strand of each stem
+        (bases3p) - numpy array of int - concatenated base codes of the first numPairs bases of the reversed 3' strand of each stem
+        (numPairs) - numpy array of int - number of bases of each stem in bases5p and bases3p
+        (stemLens) - numpy array of int - length of each stem in base pairs, (len(5' strand) + len(3' strand)) // 2
+        (symmetric) - numpy array of bool - True for stems whose 5' and 3' strands are the same sequence
+        (adjacentBulges) - numpy array of bool - (number of stems, 2) flags for stem ends next to a bulge of length 1
+        (strict=True) -- bool -- when true, stems with a missing stacking parameter are masked as missing
+        (init=False) -- bool -- when true, the 4.09 Kcal/mol initiation value is included in the energies
+        (temperature=T) -- float -- temperature in Kelvin
+        (fallback=None) -- function -- function(i) that returns Stem.energy() of stem i. Used for stems whose strands have
+                           different lengths, which are masked as missing when no fallback is given
+Return Type:
+        (numpy array of float64, numpy array of bool) - energy of each stem, and the mask of stems without an energy
+'''
+def batchStemEnergyArrays(bases5p, bases3p, numPairs, stemLens, symmetric, adjacentBulges, strict=True, init=False, temperature=T, fallback=None):
+    numStems = len(numPairs)
+    energies = np.full(numStems, np.nan, dtype=np.float64)
+    missing = np.zeros(numStems, dtype=bool)
+    if numStems == 0:
+        return energies, missing
+
+    pairs = np.append(encodePairs(bases5p, bases3p), UNKNOWN_PAIR) #trailing unknown pair keeps every index below in bounds
+    offsets = np.concatenate(([0], np.cumsum(numPairs)[:-1]))
+
+    #stems of length 1 have no energy. Stems with strands of different lengths are left to Stem.energy()
+    valid = (stemLens > 1) & (numPairs == stemLens)
+    missing[stemLens <= 1] = True
+
+    #stacking energy of every pair with the next pair in the concatenated array. Only the first n-1 steps of each stem are used
+    steps = energyTables(temperature).stack[pairs[:-1], pairs[1:]]
+    missingSteps = np.isnan(steps)
+    stepCounts = np.where(valid, stemLens - 1, 0)
+
+    #a stem is missing a parameter if any of its stacking steps is NaN
+    missingTotals = np.concatenate(([0], np.cumsum(missingSteps)))
+    missingStem = (missingTotals[offsets + stepCounts] - missingTotals[offsets]) > 0
+
+    #sum the stacking steps column by column. Missing steps add nothing in non-strict mode
+    stack = np.zeros(numStems, dtype=np.float64)
+    _raggedColumnSum(np.where(missingSteps, 0.0, steps), offsets, stepCounts, stack)
+
+    #symmetry penalty
+    symmetry = np.where(symmetric, STEM_SYMMETRY_PENALTY, 0.0)
+
+    #terminal AU/GU penalty, skipped at ends next to a bulge of length 1
+    firstPairs = pairs[np.where(valid, offsets, 0)]
+    lastPairs = pairs[np.where(valid, offsets + numPairs - 1, 0)]
+    endPenalty = np.zeros(numStems, dtype=np.float64)
+    endPenalty += np.where(np.isin(firstPairs, END_PENALTY_PAIRS) & ~adjacentBulges[:, 0], STEM_AU_END_PENALTY, 0.0)
+    endPenalty += np.where(np.isin(lastPairs, END_PENALTY_PAIRS) & ~adjacentBulges[:, 1], STEM_AU_END_PENALTY, 0.0)
+
+    #sum the terms in the same order as Stem.energy()
+    if init:
+        total = INTERMOLECULAR_INIT + symmetry + endPenalty + stack
+    else:
+        total = symmetry + endPenalty + stack
+
+    computed = valid & ~(missingStem & strict)
+    energies[computed] = total[computed]
+    missing[valid & missingStem & strict] = True
+
+    #stems with strands of different lengths
+    for i in np.flatnonzero((stemLens > 1) & (numPairs != stemLens)):
+        energy = fallback(int(i)) if fallback is not None else None
+        if energy is None:
+            missing[i] = True
+        else:
+            energies[i] = energy
+
+    if missing.any():
+        report('Stem', 'batch', 'In batchStemEnergy(), {} of {} stems are missing energy parameters or are too short to have an energy.', int(missing.sum()), numStems, count=int(missing.sum()))
+
+    return energies, missing
+
+
+'''
+Function Name: batchHairpinEnergy(sequences, closingPairs, strict=True, temperature=T)
+Description: Function calculates the folding free energy change of many hairpins at once. Special hairpins are looked up in
+a hash table keyed by closing pair and loop sequence, and the initiation, terminal mismatch, first mismatch bonuses, GU closure,
+and all C loop penalty are evaluated as array expressions. The result for each hairpin matches Hairpin.energy(strict).
+Parameters:
+        (sequences) - list of str - hairpin loop sequences, for example Hairpin.sequence()
+        (closingPairs) - list of (str, str) - hairpin closing pairs, for example Hairpin.closingPair()
+        (strict=True) -- bool -- when true, hairpins with a missing terminal mismatch parameter are masked as missing.
+                                 When false, the missing terminal mismatch is counted as 0.
+        (temperature=T) -- float -- temperature in Kelvin
+Return Type:
+        (numpy array of float64, numpy array of bool) - energy of each hairpin in input order, and a mask that is True where
+        Hairpin.energy() would return None. Masked energies are NaN.
+'''
+def batchHairpinEnergy(sequences, closingPairs, strict=True, temperature=T):
+    tables = energyTables(temperature)
+    sequences = list(sequences)
+    closingPairs = list(closingPairs)
+    numHairpins = len(sequences)
+    if numHairpins == 0:
+        return np.zeros(0, dtype=np.float64), np.zeros(0, dtype=bool)
+
+    bases, offsets, lengths = _packSequences(sequences)
+    pairCodes = np.array([encodePair(closingPair) for closingPair in closingPairs], dtype=np.int64)
+
+    #special hairpins. Only loops of the special lengths are looked up
+    special = np.full(numHairpins, np.nan, dtype=np.float64)
+    for i in np.flatnonzero(np.isin(lengths, list(SPECIAL_HAIRPIN_LENGTHS))):
+        energy = tables.specialHairpins.get((tuple(closingPairs[i]), sequences[i]))
+        if energy is not None:
+            special[i] = energy
+
+    cTotals = np.concatenate(([0], np.cumsum(bases == BASE_CODES['C'])))
+    allC = (cTotals[offsets + lengths] - cTotals[offsets]) == lengths
+    first = bases[offsets]
+    last = bases[np.maximum(offsets + lengths - 1, 0)]
+    return batchHairpinEnergyArrays(lengths, first, last, allC, pairCodes, special, strict=strict, temperature=temperature)
+
+
+'''
+Function Name: batchHairpinEnergyArrays(lengths, first, last, allC, pairCodes, special, strict=True, temperature=T)
+Description: Function calculates the folding free energy change of many hairpins that are already described by arrays, for
+example the candidate hairpins of a folding algorithm. batchHairpinEnergy() packs hairpin sequences and calls this function.
+Parameters:
+        (lengths) - numpy array of int - number of unpaired nucleotides in each hairpin
+        (first) - numpy array of int - base code of the first unpaired nucleotide of each hairpin
+        (last) - numpy array of int - base code of the last unpaired nucleotide of each hairpin
+        (allC) - numpy array of bool - True for hairpins whose unpaired nucleotides are all C
+        (pairCodes) - numpy array of int - pair code of the closing pair of each hairpin
+        (special) - numpy array of float64 - special hairpin energy of each hairpin, NaN for hairpins that are not special
+        (strict=True) -- bool -- when true, hairpins with a missing terminal mismatch parameter are masked as missing
+        (temperature=T) -- float -- temperature in Kelvin
+Return Type:
+        (numpy array of float64, numpy array of bool) - energy of each hairpin, and the mask of hairpins without an energy
+'''
+def batchHairpinEnergyArrays(lengths, first, last, allC, pairCodes, special, strict=True, temperature=T):
+    tables = energyTables(temperature)
+    numHairpins = len(lengths)
+    energies = np.full(numHairpins, np.nan, dtype=np.float64)
+    missing = np.zeros(numHairpins, dtype=bool)
+    if numHairpins == 0:
+        return energies, missing
+
+    #hairpins shorter than 3 nucleotides have no energy
+    missing[lengths < 3] = True
+    valid = lengths >= 3
+
+    #special hairpins
+    isSpecial = valid & ~np.isnan(special)
+    energies[isSpecial] = special[isSpecial]
+    special = isSpecial
+
+    #initiation energy
+    init = _lengthTerm(np.where(valid, lengths, 3), lambda length: hairpinInitEnergy(length, temperature))
+
+    #hairpins of length 3
+    triloop = valid & ~special & (lengths == 3)
+    energies[triloop] = np.where(allC, init + HAIRPIN_C3, init)[triloop]
+
+    #hairpins of 4 nucleotides or greater
+    terminalMismatch = tables.terminalMismatch[pairCodes, first, last]
+    missingMismatch = np.isnan(terminalMismatch)
+    terminalMismatch = np.where(missingMismatch, 0.0, terminalMismatch)
+
+    uu_ga_bonus = np.where(((first == BASE_CODES['U']) & (last == BASE_CODES['U'])) | ((first == BASE_CODES['G']) & (last == BASE_CODES['A'])), HAIRPIN_UU_GA_FIRST_MISMATCH_BONUS, 0.0)
+    ggMismatch = (first == BASE_CODES['G']) & (last == BASE_CODES['G'])
+    gg_bonus = np.where(ggMismatch, HAIRPIN_GG_FIRST_MISMATCH_BONUS, 0.0)
+    gu_closure = np.where((pairCodes == PAIR_CODES[('G', 'U')]) & ggMismatch, HAIRPIN_SPECIAL_GU_CLOSURE, 0.0)
+    c_loop_penalty = np.where(allC, (lengths * HAIRPIN_C_LOOP_A) + HAIRPIN_C_LOOP_B, 0.0)
+
+    #sum the terms in the same order as Hairpin.energy()
+    total = init + terminalMismatch + uu_ga_bonus + gg_bonus + gu_closure + c_loop_penalty
+
+    longer = valid & ~special & (lengths > 3)
+    masked = longer & missingMismatch & strict
+    computed = longer & ~masked
+    energies[computed] = total[computed]
+    missing[masked] = True
+
+    if missing.any():
+        report('Hairpin', 'batch', 'In batchHairpinEnergy(), {} of {} hairpins are missing energy parameters or are too short to have an energy.', int(missing.sum()), numHairpins, count=int(missing.sum()))
+
+    return energies, missing
+
+
+'''
+Function Name: batchBulgeEnergy(sequences, closingPairs5p, closingPairs3p, strict=True, temperature=T)
+Description: Function calculates the folding free energy change of many bulges at once. Bulges of length 1 get the stacking
+energy of their closing pairs and the special C bulge bonus, and longer bulges get the initiation energy. The result for each
+bulge matches Bulge.energy(strict).
+Parameters:
+        (sequences) - list of str - bulge sequences, for example Bulge.sequence()
+        (closingPairs5p) - list of (str, str) - 5' closing pair of each bulge, for example Bulge.closingPair5p()
+        (closingPairs3p) - list of (str, str) - 3' closing pair of each bulge, for example Bulge.closingPair3p()
+        (strict=True) -- bool -- when true, bulges of length 1 with a missing stacking parameter are masked as missing.
+                                 When false, the missing stacking parameter is counted as 0.
+        (temperature=T) -- float -- temperature in Kelvin
+Return Type:
+        (numpy array of float64, numpy array of bool) - energy of each bulge in input order, and a mask that is True where
+        Bulge.energy() would return None. Masked energies are NaN.
+'''
+def batchBulgeEnergy(sequences, closingPairs5p, closingPairs3p, strict=True, temperature=T):
+    sequences = list(sequences)
+    lengths = np.array([len(sequence) for sequence in sequences], dtype=np.int64)
+    singleC = np.array([sequence == 'C' for sequence in sequences], dtype=bool)
+    closing5p = np.array([[encodeBase(base) for base in pair] for pair in closingPairs5p], dtype=np.int64).reshape(len(sequences), 2)
+    closing3p = np.array([[encodeBase(base) for base in pair] for pair in closingPairs3p], dtype=np.int64).reshape(len(sequences), 2)
+    return batchBulgeEnergyArrays(lengths, singleC, closing5p, closing3p, strict=strict, temperature=temperature)
+
+
+'''
+Function Name: batchBulgeEnergyArrays(lengths, singleC, closing5p, closing3p, strict=True, temperature=T)
+Description: Function calculates the folding free energy change of many bulges that are already described by arrays.
+batchBulgeEnergy() encodes bulge sequences and closing pairs and calls this function.
+Parameters:
+        (lengths) - numpy array of int - number of unpaired nucleotides in each bulge
+        (singleC) - numpy array of bool - True for bulges whose sequence is 'C'
+        (closing5p) - numpy array of int - (number of bulges, 2) base codes of the 5' closing pair of each bulge
+        (closing3p) - numpy array of int - (number of bulges, 2) base codes of the 3' closing pair of each bulge
+        (strict=True) -- bool -- when true, bulges of length 1 with a missing stacking parameter are masked as missing
+        (temperature=T) -- float -- temperature in Kelvin
+Return Type:
+        (numpy array of float64, numpy array of bool) - energy of each bulge, and the mask of bulges without an energy
+'''
+def batchBulgeEnergyArrays(lengths, singleC, closing5p, closing3p, strict=True, temperature=T):
+    numBulges = len(lengths)
+    energies = np.full(numBulges, np.nan, dtype=np.float64)
+    missing = np.zeros(numBulges, dtype=bool)
+    if numBulges == 0:
+        return energies, missing
+
+    #bulges longer than 1 nucleotide
+    init = _lengthTerm(np.maximum(lengths, 1), lambda length: bulgeInitEnergy(length, temperature))
+    longer = lengths > 1
+    energies[longer] = init[longer]
+
+    #bulges of length 1 - stacking energy of the closing pairs as if the bulge was not present
+    single = lengths == 1
+    basePairStack = energyTables(temperature).stack[encodePairs(closing5p[:, 0], closing5p[:, 1]), encodePairs(closing3p[:, 0], closing3p[:, 1])]
+    missingStack = np.isnan(basePairStack)
+    basePairStack = np.where(missingStack, 0.0, basePairStack)
+
+    #special C bulges. The number of states is 1 + the number of adjacent C's
+    adjacentC5p = closing5p[:, 0] == BASE_CODES['C']
+    adjacentC3p = closing3p[:, 0] == BASE_CODES['C']
+    specialC = singleC & (adjacentC5p | adjacentC3p)
+    cCount = 1 + adjacentC5p.astype(np.int64) + adjacentC3p.astype(np.int64)
+    total = np.where(specialC, init + basePairStack + SPECIAL_C_BULGE - (R * temperature * np.log(cCount)), init + basePairStack)
+
+    masked = single & missingStack & strict
+    computed = single & ~masked
+    energies[computed] = total[computed]
+    missing[masked] = True
+
+    if missing.any():
+        report('Bulge', 'batch', 'In batchBulgeEnergy(), {} of {} bulges are missing energy parameters.', int(missing.sum()), numBulges, count=int(missing.sum()))
+
+    return energies, missing
+
+
+'''
+Function Name: _internalLoopClasses(lengths5p, lengths3p)
+Description: Internal function that assigns every internal loop to a size class
+Parameters:
+        (lengths5p) - numpy array of int - length of the 5' side of each loop
+        (lengths3p) - numpy array of int - length of the 3' side of each loop
+Return Type:
+        numpy array of int - size class of each loop(LOOP_1x1, LOOP_1x2, ...)
+'''
+def _internalLoopClasses(lengths5p, lengths3p):
+    loopLengths = lengths5p + lengths3p
+    classes = np.full(len(loopLengths), LOOP_OTHER, dtype=np.int8)
+    #order matters, later classes take priority in the same way as the branches of InternalLoop.energy()
+    classes[((lengths5p == 1) & (lengths3p == loopLengths-1)) | ((lengths5p == loopLengths-1) & (lengths3p == 1))] = LOOP_1xN
+    classes[(lengths5p == 2) & (lengths3p == 3)] = LOOP_2x3
+    classes[(lengths5p == 3) & (lengths3p == 2)] = LOOP_3x2
+    classes[(lengths5p == 1) & (lengths3p == 1)] = LOOP_1x1
+    classes[(lengths5p == 1) & (lengths3p == 2)] = LOOP_1x2
+    classes[(lengths5p == 2) & (lengths3p == 1)] = LOOP_2x1
+    classes[(lengths5p == 2) & (lengths3p == 2)] = LOOP_2x2
+    return classes
+
+
+'''
+Function Name: _sumMismatches(mismatch5p, mismatch3p, strict)
+Description: Internal function that adds the two mismatch terms of internal loops in the same way as the InternalLoop mismatch methods
+Parameters:
+        (mismatch5p) - numpy array of float64 - first mismatch energy, NaN where missing
+        (mismatch3p) - numpy array of float64 - second mismatch energy, NaN where missing
+        (strict) - bool - when true, loops with a missing mismatch are marked missing. When false, missing mismatches are skipped
+Return Type:
+        (numpy array of float64, numpy array of bool) - mismatch energies and the mask of loops with a missing mismatch
+'''
+def _sumMismatches(mismatch5p, mismatch3p, strict):
+    missing = (np.isnan(mismatch5p) | np.isnan(mismatch3p)) & strict
+    total = 0.0 + np.where(np.isnan(mismatch5p), 0.0, mismatch5p) + np.where(np.isnan(mismatch3p), 0.0, mismatch3p)
+    return total, missing
+
+
+'''
+Function Name: batchInternalLoopEnergy(loops5p, loops3p, closingPairs, strict=True, temperature=T)
+Description: Function calculates the folding free energy change of many internal loops at once. The loops are grouped by size
+class. The 1x1, 1x2, 2x1, and 2x2 classes are gathered from the EnergyTables internal loop tables, and every other loop is
+evaluated with the initiation, asymmetry, AU/GU closure, and mismatch terms(2x3 mismatch table for 2x3 and 3x2 loops). The
+results are scattered back into input order and match InternalLoop.energy(strict).
+Parameters:
+        (loops5p) - list of str - 5' loop sequence of each internal loop
+        (loops3p) - list of str - 3' loop sequence of each internal loop
+        (closingPairs) - list of ((str, str), (str, str)) - 5' and 3' closing pairs of each loop, for example InternalLoop.closingPairs()
+        (strict=True) -- bool -- when true, loops with a missing parameter are masked as missing. When false, loops missing from
+                                 the 1x1, 1x2, and 2x2 tables are calculated with the generic model and missing mismatches are skipped
+        (temperature=T) -- float -- temperature in Kelvin
+Return Type:
+        (numpy array of float64, numpy array of bool) - energy of each loop in input order, and a mask that is True where
+        InternalLoop.energy() would return None. Masked energies are NaN.
+'''
+def batchInternalLoopEnergy(loops5p, loops3p, closingPairs, strict=True, temperature=T):
+    loops5p = list(loops5p)
+    loops3p = list(loops3p)
+    closingPairs = list(closingPairs)
+    numLoops = len(loops5p)
+    if numLoops == 0:
+        return np.zeros(0, dtype=np.float64), np.zeros(0, dtype=bool)
+
+    #encode the loop sequences and closing pair bases
+    bases5p, offsets5p, lengths5p = _packSequences(loops5p)
+    bases3p, offsets3p, lengths3p = _packSequences(loops3p)
+    loopBases5p = np.stack((bases5p[offsets5p], bases5p[offsets5p + 1], bases5p[np.maximum(offsets5p + lengths5p - 1, 0)]), axis=1)
+    loopBases3p = np.stack((bases3p[offsets3p], bases3p[offsets3p + 1], bases3p[np.maximum(offsets3p + lengths3p - 1, 0)]), axis=1)
+    closing5p = np.array([[encodeBase(base) for base in pairs[0]] for pairs in closingPairs], dtype=np.int64).reshape(numLoops, 2)
+    closing3p = np.array([[encodeBase(base) for base in pairs[1]] for pairs in closingPairs], dtype=np.int64).reshape(numLoops, 2)
+    return batchInternalLoopEnergyArrays(lengths5p, lengths3p, loopBases5p, loopBases3p, closing5p, closing3p, strict=strict, temperature=temperature)
+
+
+'''
+Function Name: batchInternalLoopEnergyArrays(lengths5p, lengths3p, loopBases5p, loopBases3p, closing5p, closing3p, strict=True, temperature=T)
+Description: Function calculates the folding free energy change of many internal loops that are already described by arrays,
+for example the candidate loops of a folding algorithm. batchInternalLoopEnergy() encodes loop sequences and calls this function.
+Parameters:
+        (lengths5p) - numpy array of int - length of the 5' side of each loop
+        (lengths3p) - numpy array of int - length of the 3' side of each loop
+        (loopBases5p) - numpy array of int - (number of loops, 3) base codes of the first, second, and last nucleotides of the
+                        5' side of each loop. The second nucleotide is only used for loops with at least 2 nucleotides on that side
+        (loopBases3p) - numpy array of int - (number of loops, 3) base codes of the first, second, and last nucleotides of the 3' side
+        (closing5p) - numpy array of int - (number of loops, 2) base codes of the 5' closing pair of each loop
+        (closing3p) - numpy array of int - (number of loops, 2) base codes of the 3' closing pair of each loop, read from the loop
+        (strict=True) -- bool -- when true, loops with a missing parameter are masked as missing
+        (temperature=T) -- float -- temperature in Kelvin
+Return Type:
+        (numpy array of float64, numpy array of bool) - energy of each loop, and the mask of loops without an energy
+'''
+def batchInternalLoopEnergyArrays(lengths5p, lengths3p, loopBases5p, loopBases3p, closing5p, closing3p, strict=True, temperature=T):
+    tables = energyTables(temperature)
+    numLoops = len(lengths5p)
+    energies = np.full(numLoops, np.nan, dtype=np.float64)
+    missing = np.zeros(numLoops, dtype=bool)
+    if numLoops == 0:
+        return energies, missing
+
+    first5p, second5p, last5p = loopBases5p[:, 0], loopBases5p[:, 1], loopBases5p[:, 2]
+    first3p, second3p, last3p = loopBases3p[:, 0], loopBases3p[:, 1], loopBases3p[:, 2]
+    pair5p = encodePairs(closing5p[:, 0], closing5p[:, 1])
+    pair3p = encodePairs(closing3p[:, 0], closing3p[:, 1])
+    reversePair5p = encodePairs(closing5p[:, 1], closing5p[:, 0])
+    reversePair3p = encodePairs(closing3p[:, 1], closing3p[:, 0])
+
+    classes = _internalLoopClasses(lengths5p, lengths3p)
+    needsModel = np.zeros(numLoops, dtype=bool) #loops evaluated with the generic model
+
+    #1x1, 1x2, 2x1, and 2x2 loops - gathered from the internal loop tables
+    tableGathers = {
+        LOOP_1x1: lambda i: tables.internalLoop1x1[pair5p[i], pair3p[i], first5p[i], first3p[i]],
+        LOOP_1x2: lambda i: tables.internalLoop1x2[pair5p[i], pair3p[i], first5p[i], second3p[i], first3p[i]],
+        LOOP_2x1: lambda i: tables.internalLoop1x2[reversePair3p[i], reversePair5p[i], first3p[i], second5p[i], first5p[i]],
+        LOOP_2x2: lambda i: tables.internalLoop2x2[pair5p[i], pair3p[i], first5p[i], second3p[i], second5p[i], first3p[i]],
+    }
+    for sizeClass, gather in tableGathers.items():
+        index = np.flatnonzero(classes == sizeClass)
+        tableEnergies = gather(index)
+        found = ~np.isnan(tableEnergies)
+        energies[index[found]] = tableEnergies[found]
+        if strict:
+            missing[index[~found]] = True
+        else:
+            needsModel[index[~found]] = True
+
+    needsModel |= np.isin(classes, [LOOP_2x3, LOOP_3x2, LOOP_1xN, LOOP_OTHER])
+    index = np.flatnonzero(needsModel)
+
+    #generic model - initiation, asymmetry, and AU/GU closure
+    lengths5pModel, lengths3pModel = lengths5p[index], lengths3p[index]
+    ilInit = _lengthTerm(lengths5pModel + lengths3pModel, lambda length: internalLoopInitEnergy(length, temperature))
+    asym = np.abs(lengths5pModel - lengths3pModel) * INNER_LOOP_ASYMMETRY_PENALTY
+    closingPenalty = 0.0 + np.where(np.isin(pair5p[index], END_PENALTY_PAIRS), INNER_LOOP_CLOSING_PENALTY, 0.0)
+    closingPenalty = closingPenalty + np.where(np.isin(pair3p[index], END_PENALTY_PAIRS), INNER_LOOP_CLOSING_PENALTY, 0.0)
+
+    #mismatch energy by size class. Loops missing from the tables use the mismatch rule for their size
+    modelClasses = classes[index]
+    modelClasses[np.isin(modelClasses, [LOOP_1x1, LOOP_1x2, LOOP_2x1])] = LOOP_1xN
+    modelClasses[modelClasses == LOOP_2x2] = LOOP_OTHER
+    mismatchEnergy = np.zeros(len(index), dtype=np.float64) #1xn loops have no mismatch energy
+    missingMismatch = np.zeros(len(index), dtype=bool)
+
+    c5 = closing5p[index]
+    c3 = closing3p[index]
+    f5, l5 = first5p[index], last5p[index]
+    f3, l3 = first3p[index], last3p[index]
+    mismatchTerms = {
+        LOOP_2x3: (tables.mismatch2x3[c5[:, 0], c5[:, 1], f5, l3], tables.mismatch2x3[c3[:, 1], c3[:, 0], f3, l5]),
+        LOOP_3x2: (tables.mismatch2x3[c3[:, 1], c3[:, 0], f3, l5], tables.mismatch2x3[c5[:, 1], c5[:, 0], f5, l3]),
+        LOOP_OTHER: (tables.mismatchOther[f5, l3], tables.mismatchOther[l5, f3]),
+    }
+    for sizeClass, (mismatch5p, mismatch3p) in mismatchTerms.items():
+        inClass = modelClasses == sizeClass
+        classEnergy, classMissing = _sumMismatches(mismatch5p[inClass], mismatch3p[inClass], strict)
+        mismatchEnergy[inClass] = classEnergy
+        missingMismatch[inClass] = classMissing
+
+    #loops with an empty side outside of the 1xn class have no mismatch bases
+    emptySide = ((lengths5pModel == 0) | (lengths3pModel == 0)) & (modelClasses != LOOP_1xN)
+    missingMismatch |= emptySide
+
+    #sum the terms in the same order as InternalLoop._calcEnergy() and scatter back to input order
+    total = ilInit + asym + closingPenalty + mismatchEnergy
+    energies[index[~missingMismatch]] = total[~missingMismatch]
+    missing[index[missingMismatch]] = True
+
+    if missing.any():
+        report('InternalLoop', 'batch', 'In batchInternalLoopEnergy(), {} of {} internal loops are missing energy parameters.', int(missing.sum()), numLoops, count=int(missing.sum()))
+
+    return energies, missing
@@ -0,0 +1,481 @@
+'''
+Filename: ComponentStore.py
+Author: Michael Hathaway
+
+Description: The Component Store module holds the StructureComponents of one structure as a struct of arrays: one fixed width
+table per component type, using the same columns as the StructureBinary component tables. Spans and closing pairs are integer
+columns and sequences are (offset, length) columns into a shared sequence buffer, so questions about every component of a type
+can be answered with array operations, for example:
+
+    store = structure.componentStore()
+    stems = store.table('stems')
+    firstPairs, lastPairs = store.stemEndPairs()
+    store.select('stems', (store.stemLengths() >= 6) & np.isin(lastPairs, [PAIR_CODES[('G', 'U')], PAIR_CODES[('U', 'G')]]))
+
+The stem, hairpin, and internal loop energies of the store are calculated by the BatchEnergy functions directly from the columns.
+A Structure can also keep its components in a store(Structure.compactComponents() or Structure.loadBinary(compact=True)). Its
+component dictionaries are then LazyComponentDict objects that create each StructureComponent object the first time it is accessed.
+'''
+
+## Module Imports ##
+import numpy as np
+from collections.abc import MutableMapping
+
+## Binary Format Imports ##
+from StructureBinary import BinaryCorpusWriter, COMPONENT_TABLES, componentArguments, _decodePair
+
+## Energy Imports ##
+from EnergyTables import T, encodeBytes, encodePairs, UNKNOWN_PAIR
+from BatchEnergy import batchStemEnergyArrays, batchHairpinEnergy, batchInternalLoopEnergy
+
+## Structure Type Component Imports ##
+from StructureComponents import Stem, Hairpin, Bulge, InternalLoop, MultiLoop, ExternalLoop, NCBP, End
+
+#component class stored in each table
+COMPONENT_CLASSES = {'stems': Stem, 'hairpins': Hairpin, 'bulges': Bulge, 'internalLoops': InternalLoop, 'multiLoops': MultiLoop,
+                     'externalLoops': ExternalLoop, 'ncbps': NCBP, 'ends': End}
+
+#table that holds the components with each label prefix
+LABEL_TABLES = {'S': 'stems', 'H': 'hairpins', 'B': 'bulges', 'I': 'internalLoops', 'M': 'multiLoops', 'X': 'externalLoops', 'N': 'ncbps', 'E': 'ends'}
+
+
+'''
+Function Name: _raggedPositions(starts, counts, step=1)
+Description: Internal function that concatenates the ranges starts[i], starts[i] + step, ... of counts[i] positions
+Parameters:
+        (starts) - numpy array of int - first position of each range
+        (counts) - numpy array of int - number of positions in each range
+        (step=1) - int - 1 for increasing ranges, -1 for decreasing ranges
+Return Type:
+        numpy array of int64
+'''
+def _raggedPositions(starts, counts, step=1):
+    counts = np.asarray(counts, dtype=np.int64)
+    rangeStarts = np.cumsum(counts) - counts
+    within = np.arange(int(counts.sum()), dtype=np.int64) - np.repeat(rangeStarts, counts)
+    return np.repeat(np.asarray(starts, dtype=np.int64), counts) + step * within
+
+
+'''
+## COMPONENT STORE OBJECT ##
+The ComponentStore object holds the component tables of one structure.
+
+Member variable -- data type -- description:
+self._tables -- dict -- table name : structured numpy array with the rows of the structure(see StructureBinary.TABLE_DTYPES)
+self._strings -- list -- string table that the label columns index into
+self._sequenceBuffer -- numpy array of uint8 -- buffer that the sequence offset columns point into
+self._length -- int -- length of the molecule
+self._componentArray -- numpy array of int32 -- component id of every location of the molecule, -1 for unassigned locations
+self._componentLabels -- list -- label of each component id
+self._rows -- dict -- table name : {label : row}. Multiloops map to a (first row, stop row) tuple of their subunit rows
+self._adjacentBulges -- numpy array of bool -- stem end flags for bulges of length 1, built on first use
+'''
+class ComponentStore:
+    #__init__() method for the ComponentStore object
+    def __init__(self, columns, index=0, strings=None):
+        record = columns['records'][index]
+        self._tables = {}
+        for table in COMPONENT_TABLES:
+            start = int(record[table + 'Row'])
+            self._tables[table] = columns[table][start:start + int(record[table + 'Count'])]
+        self._strings = strings if strings is not None else columns['strings'].tolist()
+        self._sequenceBuffer = columns['sequence']
+        self._length = int(record['length'])
+
+        offset = int(record['componentArrayOffset'])
+        self._componentArray = columns['componentArray'][offset:offset + self._length]
+        offset = int(record['componentLabelOffset'])
+        self._componentLabels = [self._strings[i] for i in columns['componentLabels'][offset:offset + int(record['componentLabelCount'])].tolist()]
+
+        self._rows = {}
+        for table, rows in self._tables.items():
+            labels = [self._strings[i] for i in rows['label'].tolist()]
+            if table == 'multiLoops':
+                self._rows[table] = {}
+                for row, label in enumerate(labels):
+                    first = self._rows[table].get(label, (row, row))[0]
+                    self._rows[table][label] = (first, row + 1)
+            else:
+                self._rows[table] = {label: row for row, label in enumerate(labels)}
+        self._adjacentBulges = None
+
+    #define len function for the store as the number of components
+    def __len__(self):
+        return sum(len(rows) for rows in self._rows.values())
+
+    #a label is in the store if one of the tables has a component with that label
+    def __contains__(self, label):
+        name = LABEL_TABLES.get(label[:1])
+        return name is not None and label in self._rows[name]
+
+    #define string representation of the store
+    def __str__(self):
+        return 'Component Store: ' + ', '.join(f'{len(self._rows[table])} {table}' for table in COMPONENT_TABLES)
+
+
+    '''
+    Function Name: fromStructure(structure)
+    Description: Function builds a store from the components of a Structure object. The store is a copy, so later changes made
+    through the component setters are not reflected in it
+    Parameters:
+            (structure) - Structure - structure to pack
+    Return Type:
+            ComponentStore
+    '''
+    @classmethod
+    def fromStructure(cls, structure):
+        writer = BinaryCorpusWriter(None)
+        writer.add(structure)
+        return cls(writer.columns())
+
+
+    '''
+    Function Name: fromBinaryCorpus(corpus, index)
+    Description: Function builds a store for a structure of a binary corpus. The tables are views into the memory mapped corpus columns
+    Parameters:
+            (corpus) - StructureBinary.BinaryCorpus - open binary corpus
+            (index) - int - index of the structure in the corpus
+    Return Type:
+            ComponentStore
+    '''
+    @classmethod
+    def fromBinaryCorpus(cls, corpus, index):
+        return cls(corpus.columns(), index, strings=corpus._stringList)
+
+    #internal method that decodes a component sequence from the sequence buffer
+    def _sequence(self, offset, length):
+        return bytes(self._sequenceBuffer[offset:offset+length]).decode('utf-8') if length >= 0 else None
+
+    #internal method that returns the rows of a table as tuples of python values
+    def _tableRows(self, table, rows):
+        return zip(*[rows[name].tolist() for name in rows.dtype.names])
+
+
+    '''
+    Function Name: table(name)
+    Description: Function returns the table of a component type
+    Parameters:
+            (name) - str - 'stems', 'hairpins', 'bulges', 'internalLoops', 'multiLoops', 'externalLoops', 'ncbps', or 'ends'
+    Return Type:
+            structured numpy array - one row per component(one row per subunit for multiloops). See StructureBinary.TABLE_DTYPES
+    '''
+    def table(self, name):
+        return self._tables[name]
+
+
+    '''
+    Function Name: labels(name)
+    Description: Function returns the labels of the components of a type in table order
+    Parameters:
+            (name) - str - table name
+    Return Type:
+            list of str
+    '''
+    def labels(self, name):
+        return list(self._rows[name].keys())
+
+
+    '''
+    Function Name: numComponents(name)
+    Description: Function returns the number of components of a type
+    Parameters:
+            (name) - str - table name
+    Return Type:
+            int
+    '''
+    def numComponents(self, name):
+        return len(self._rows[name])
+
+
+    '''
+    Function Name: select(name, mask)
+    Description: Function returns the labels of the table rows selected by a boolean mask, for example the result of a vectorized filter
+    Parameters:
+            (name) - str - table name
+            (mask) - numpy array of bool - one value per table row
+    Return Type:
+            list of str
+    '''
+    def select(self, name, mask):
+        labels = self._tables[name]['label'][np.asarray(mask, dtype=bool)].tolist()
+        return list(dict.fromkeys(self._strings[i] for i in labels)) #multiloop subunits share a label
+
+
+    '''
+    Function Name: arguments(name, label)
+    Description: Function returns the constructor arguments of a component, in the format stored by Structure._serialize()
+    Parameters:
+            (name) - str - table name
+            (label) - str - component label
+    Return Type:
+            tuple, or None if the label is not in the table
+    '''
+    def arguments(self, name, label):
+        row = self._rows[name].get(label)
+        if row is None:
+            return None
+        rows = self._tables[name][row[0]:row[1]] if name == 'multiLoops' else self._tables[name][row:row+1]
+        return componentArguments(name, self._tableRows(name, rows), self._strings, self._sequence)[0]
+
+
+    '''
+    Function Name: component(label)
+    Description: Function creates the StructureComponent object of a label. Each call creates a new object without neighbor information
+    Parameters:
+            (label) - str - component label
+    Return Type:
+            StructureComponent object, or None if the label is not in the store
+    '''
+    def component(self, label):
+        name = LABEL_TABLES.get(label[:1])
+        arguments = self.arguments(name, label) if name is not None else None
+        return COMPONENT_CLASSES[name](*arguments) if arguments is not None else None
+
+
+    '''
+    Function Name: span(label)
+    Description: Function returns the span of a component without creating the component object. The result has the same
+    shape as the span() method of the component
+    Parameters:
+            (label) - str - component label
+    Return Type:
+            tuple, or dict of subunit label : span for multiloops
+    '''
+    def span(self, label):
+        name = LABEL_TABLES[label[0]]
+        row = self._rows[name][label]
+        table = self._tables[name]
+        if name == 'multiLoops':
+            rows = table[row[0]:row[1]]
+            return {self._strings[subunit]: tuple(span) for subunit, span in zip(rows['subunit'].tolist(), rows['span'].tolist())}
+        elif name in ('stems', 'internalLoops'):
+            return (tuple(table['span5p'][row].tolist()), tuple(table['span3p'][row].tolist()))
+        elif name == 'ncbps':
+            return tuple(table['basePairSpan'][row].tolist())
+        return tuple(table['span'][row].tolist())
+
+
+    '''
+    Function Name: componentArray()
+    Description: Function returns the component id array of the structure
+    Parameters: None
+    Return Type:
+            numpy array of int32 - read only for stores of a binary corpus
+    '''
+    def componentArray(self):
+        return self._componentArray
+
+
+    '''
+    Function Name: componentLabels()
+    Description: Function returns the label of each component id in the component array
+    Parameters: None
+    Return Type:
+            list of str
+    '''
+    def componentLabels(self):
+        return list(self._componentLabels)
+
+
+    '''
+    Function Name: sequences(name, field='sequence')
+    Description: Function returns a sequence column of a table as strings
+    Parameters:
+            (name) - str - table name
+            (field='sequence') - str - prefix of the offset and length columns, for example 'sequence5p' for stems or 'loop3p' for internal loops
+    Return Type:
+            list of str
+    '''
+    def sequences(self, name, field='sequence'):
+        table = self._tables[name]
+        return [self._sequence(offset, length) for offset, length in zip(table[field + 'Offset'].tolist(), table[field + 'Length'].tolist())]
+
+
+    '''
+    Function Name: stemLengths()
+    Description: Function returns the length of every stem in base pairs, matching Stem.sequenceLen()
+    Parameters: None
+    Return Type:
+            numpy array of int64
+    '''
+    def stemLengths(self):
+        stems = self._tables['stems']
+        return (stems['sequence5pLength'].astype(np.int64) + stems['sequence3pLength']) // 2
+
+
+    '''
+    Function Name: stemEndPairs()
+    Description: Function returns the pair codes(EnergyTables.PAIR_CODES) of the first and last base pair of every stem. The
+    first pair is the outermost pair(the first base of the 5' strand and the last base of the 3' strand)
+    Parameters: None
+    Return Type:
+            (numpy array of int8, numpy array of int8) - first pairs, last pairs. Stems with an empty strand have UNKNOWN_PAIR
+    '''
+    def stemEndPairs(self):
+        stems = self._tables['stems']
+        offset5p, length5p = stems['sequence5pOffset'].astype(np.int64), stems['sequence5pLength'].astype(np.int64)
+        offset3p, length3p = stems['sequence3pOffset'].astype(np.int64), stems['sequence3pLength'].astype(np.int64)
+        empty = (length5p <= 0) | (length3p <= 0)
+        base = lambda positions: encodeBytes(self._sequenceBuffer[np.where(empty, 0, positions)]) if len(positions) else np.zeros(0, dtype=np.int8)
+        firstPairs = encodePairs(base(offset5p), base(offset3p + length3p - 1))
+        lastPairs = encodePairs(base(offset5p + length5p - 1), base(offset3p))
+        return np.where(empty, UNKNOWN_PAIR, firstPairs).astype(np.int8), np.where(empty, UNKNOWN_PAIR, lastPairs).astype(np.int8)
+
+
+    '''
+    Function Name: adjacentBulges()
+    Description: Function returns whether the 5' and 3' end of every stem is next to a bulge of length 1. The flags are found
+    from the component array in the same way as Structure._addStemBulgeNeighborBooleans()
+    Parameters: None
+    Return Type:
+            numpy array of bool - (number of stems, 2)
+    '''
+    def adjacentBulges(self):
+        if self._adjacentBulges is None:
+            #component ids are shifted by 2 so that -2(past either end of the molecule) and -1(unassigned) index the lookup tables
+            numIds = len(self._componentLabels) + 2
+            isBulge = np.zeros(numIds, dtype=bool)
+            isShortBulge = np.zeros(numIds, dtype=bool)
+            bulgeIds = {label: i + 2 for i, label in enumerate(self._componentLabels) if label[0] == 'B'}
+            bulgeLengths = self._tables['bulges']['sequenceLength'].tolist()
+            for label, row in self._rows['bulges'].items():
+                if label in bulgeIds:
+                    isBulge[bulgeIds[label]] = True
+                    isShortBulge[bulgeIds[label]] = bulgeLengths[row] == 1
+
+            paddedIds = np.concatenate(([-2], np.asarray(self._componentArray, dtype=np.int64), [-2])) + 2
+            idAt = lambda locations: paddedIds[np.clip(locations, -1, self._length) + 1] #0-indexed locations past either end are -2
+            stems = self._tables['stems']
+            span5p, span3p = stems['span5p'].astype(np.int64), stems['span3p'].astype(np.int64)
+
+            #the 5' end is checked 5' of the 5' strand, then 3' of the 3' strand. The 3' end is checked 5' of the 3' strand, then 3' of the 5' strand
+            ends = []
+            for before, after in ((span5p[:, 0] - 2, span3p[:, 1]), (span3p[:, 0] - 2, span5p[:, 1])):
+                first, second = idAt(before), idAt(after)
+                ends.append(np.where(isBulge[first], isShortBulge[first], isBulge[second] & isShortBulge[second]))
+            self._adjacentBulges = np.stack(ends, axis=1) if len(stems) else np.zeros((0, 2), dtype=bool)
+        return self._adjacentBulges
+
+
+    '''
+    Function Name: stemEnergy(strict=True, init=False, temperature=T)
+    Description: Function calculates the energy of every stem with BatchEnergy.batchStemEnergyArrays(). The base codes are
+    gathered from the sequence buffer, so no Stem objects are created
+    Parameters:
+            (strict=True) -- bool -- when true, stems with a missing stacking parameter are masked as missing
+            (init=False) -- bool -- when true, the 4.09 Kcal/mol initiation value is included in the energies
+            (temperature=T) -- float -- temperature in Kelvin
+    Return Type:
+            (numpy array of float64, numpy array of bool) - energy of each stem in table order, and the mask of stems without an energy
+    '''
+    def stemEnergy(self, strict=True, init=False, temperature=T):
+        stems = self._tables['stems']
+        offset5p, length5p = stems['sequence5pOffset'].astype(np.int64), stems['sequence5pLength'].astype(np.int64)
+        offset3p, length3p = stems['sequence3pOffset'].astype(np.int64), stems['sequence3pLength'].astype(np.int64)
+        numPairs = np.minimum(length5p, length3p)
+        stemLens = (length5p + length3p) // 2
+
+        #the 3' strand is read backwards from its last base so that position i of both strands forms the i-th base pair
+        bytes5p = self._sequenceBuffer[_raggedPositions(offset5p, numPairs)]
+        bytes3p = self._sequenceBuffer[_raggedPositions(offset3p + length3p - 1, numPairs, step=-1)]
+
+        #a stem is symmetric if its strands have the same length and the same bases
+        forward3p = self._sequenceBuffer[_raggedPositions(offset3p, numPairs)]
+        differences = np.concatenate(([0], np.cumsum(bytes5p != forward3p)))
+        pairEnds = np.cumsum(numPairs)
+        symmetric = (length5p == length3p) & (differences[pairEnds] == differences[pairEnds - numPairs])
+
+        adjacentBulges = self.adjacentBulges()
+        def fallback(row):
+            stem = Stem(*componentArguments('stems', self._tableRows('stems', stems[row:row+1]), self._strings, self._sequence)[0])
+            stem._addAdjacentBulgeBoolean(*adjacentBulges[row].tolist())
+            return stem.energy(strict=strict, init=init, temperature=temperature)
+
+        return batchStemEnergyArrays(encodeBytes(bytes5p), encodeBytes(bytes3p), numPairs, stemLens, symmetric, adjacentBulges,
+                                     strict=strict, init=init, temperature=temperature, fallback=fallback)
+
+
+    '''
+    Function Name: hairpinEnergy(strict=True, temperature=T)
+    Description: Function calculates the energy of every hairpin with BatchEnergy.batchHairpinEnergy()
+    Parameters:
+            (strict=True) -- bool -- when true, hairpins with a missing parameter are masked as missing
+            (temperature=T) -- float -- temperature in Kelvin
+    Return Type:
+            (numpy array of float64, numpy array of bool) - energy of each hairpin in table order, and the mask of hairpins without an energy
+    '''
+    def hairpinEnergy(self, strict=True, temperature=T):
+        closingPairs = [_decodePair(pair) for pair in self._tables['hairpins']['closingPair'].tolist()]
+        return batchHairpinEnergy(self.sequences('hairpins'), closingPairs, strict=strict, temperature=temperature)
+
+
+    '''
+    Function Name: internalLoopEnergy(strict=True, temperature=T)
+    Description: Function calculates the energy of every internal loop with BatchEnergy.batchInternalLoopEnergy()
+    Parameters:
+            (strict=True) -- bool -- when true, internal loops with a missing parameter are masked as missing
+            (temperature=T) -- float -- temperature in Kelvin
+    Return Type:
+            (numpy array of float64, numpy array of bool) - energy of each internal loop in table order, and the mask of internal
+            loops without an energy
+    '''
+    def internalLoopEnergy(self, strict=True, temperature=T):
+        closingPairs = [(_decodePair(pairs[0]), _decodePair(pairs[1])) for pairs in self._tables['internalLoops']['closingPairs'].tolist()]
+        return batchInternalLoopEnergy(self.sequences('internalLoops', 'loop5p'), self.sequences('internalLoops', 'loop3p'), closingPairs,
+                                       strict=strict, temperature=temperature)
+
+
+'''
+## LAZY COMPONENT DICTIONARY OBJECT ##
+The LazyComponentDict object is the label : component dictionary used by a Structure whose components are kept in a
+ComponentStore. It knows every label up front, and creates the component object of a label with a factory function the first
+time the label is accessed. Created and added components are kept, so each label always returns the same object.
+
+Member variable -- data type -- description:
+self._components -- dict -- label : component object, or None for components that have not been created yet
+self._factory -- function -- function(label) that creates the component object of a label
+'''
+class LazyComponentDict(MutableMapping):
+    #__init__() method for the LazyComponentDict object
+    def __init__(self, labels, factory):
+        self._components = dict.fromkeys(labels)
+        self._factory = factory
+
+    def __getitem__(self, label):
+        component = self._components[label]
+        if component is None:
+            component = self._factory(label)
+            self._components[label] = component
+        return component
+
+    def __setitem__(self, label, component):
+        self._components[label] = component
+
+    def __delitem__(self, label):
+        del self._components[label]
+
+    def __iter__(self):
+        return iter(self._components)
+
+    def __len__(self):
+        return len(self._components)
+
+    def __contains__(self, label):
+        return label in self._components
+
+    def keys(self):
+        return self._components.keys()
+
+    def clear(self):
+        self._components.clear()
+
+
+    '''
+    Function Name: numMaterialized()
+    Description: Function returns the number of component objects that have been created or added
+    Parameters: None
+    Return Type:
+            int
+    '''
+    def numMaterialized(self):
+        return sum(component is not None for component in self._components.values())
@@ -0,0 +1,213 @@
+'''
+Filename: Diagnostics.py
+Author: Michael Hathaway
+
+Description: The Diagnostics module collects the warnings produced by the StructureComponent energy functions and the batch
+energy functions, which are usually caused by missing energy parameters. Every report increments an in-memory counter keyed by
+(component type, missing key). The text of a message is only formatted when the collector keeps a sample of messages or writes
+them to a log file, so reports in the energy loops cost a counter update by default.
+
+Usage:
+    import Diagnostics
+    Diagnostics.getCollector().counts() #counter of (component type, key) : number of reports
+    Diagnostics.setCollector(Diagnostics.DiagnosticsCollector(sampleSize=100, logFile='StructureComponents.log'))
+'''
+
+## Module Imports ##
+import logging
+from collections import Counter, deque
+
+#format used by the opt-in log file
+LOG_FORMAT = '%(process)d - %(levelname)s - %(message)s'
+
+
+'''
+## DIAGNOSTICS COLLECTOR OBJECT ##
+The DiagnosticsCollector object is the sink for energy function warnings.
+
+Member variable -- data type -- description:
+self._counts -- Counter -- number of reports for each (component type, key)
+self._samples -- deque -- bounded sample of the most recent formatted messages, or None if messages are not sampled
+self._logger -- logging.Logger -- logger used to write messages to the log file
+self._handler -- logging.FileHandler -- file handler for the log file, or None if messages are not written to a file
+self._wantsMessages -- bool -- True if reported messages need to be formatted
+'''
+class DiagnosticsCollector:
+    #__init__() method for the DiagnosticsCollector object
+    def __init__(self, sampleSize=0, logFile=None):
+        self._counts = Counter()
+        self._samples = deque(maxlen=sampleSize) if sampleSize > 0 else None
+        self._logger = logging.getLogger(f'{__name__}.{id(self)}')
+        self._logger.propagate = False
+        self._logger.setLevel(logging.WARNING)
+        self._handler = None
+        self._wantsMessages = self._samples is not None
+        if logFile is not None:
+            self.enableFileLog(logFile)
+
+    #__str__() method for the DiagnosticsCollector object
+    def __str__(self):
+        return '\n'.join(f'{componentType} {key}: {count}' for (componentType, key), count in self._counts.most_common())
+
+
+    '''
+    Function Name: report(componentType, key, message, *args, count=1)
+    Description: Function records a warning. The message is formatted with str.format(*args) only if it is sampled or logged.
+    Parameters:
+            (componentType) - str - type of the component that produced the warning, for example 'Stem'
+            (key) - hashable - the missing parameter or condition, for example ('stack', ('G', 'U'), ('A', 'A'))
+            (message) - str - message template using {} fields
+            (*args) - values for the message fields
+            (count=1) - int - number of occurrences being reported
+    Return Type:
+            None
+    '''
+    def report(self, componentType, key, message, *args, count=1):
+        self._counts[(componentType, key)] += count
+        if self._wantsMessages:
+            text = message.format(*args)
+            if self._samples is not None:
+                self._samples.append(text)
+            if self._handler is not None:
+                self._logger.warning(text)
+
+
+    '''
+    Function Name: counts(componentType=None)
+    Description: Function returns the report counts
+    Parameters:
+            (componentType=None) - str - when given, only the counts for this component type are returned, keyed by key
+    Return Type:
+            Counter
+    '''
+    def counts(self, componentType=None):
+        if componentType is None:
+            return Counter(self._counts)
+        return Counter({key: count for (reportType, key), count in self._counts.items() if reportType == componentType})
+
+
+    '''
+    Function Name: total()
+    Description: Function returns the total number of reports
+    Parameters: None
+    Return Type:
+            int
+    '''
+    def total(self):
+        return sum(self._counts.values())
+
+
+    '''
+    Function Name: samples()
+    Description: Function returns the sampled messages, oldest first
+    Parameters: None
+    Return Type:
+            list of str - empty if the collector does not sample messages
+    '''
+    def samples(self):
+        return list(self._samples) if self._samples is not None else []
+
+
+    '''
+    Function Name: merge(counts)
+    Description: Function adds counts collected elsewhere, for example by a worker process, to the collector
+    Parameters:
+            (counts) - Counter or DiagnosticsCollector - (component type, key) : count
+    Return Type:
+            None
+    '''
+    def merge(self, counts):
+        if isinstance(counts, DiagnosticsCollector):
+            counts = counts._counts
+        self._counts.update(counts)
+
+
+    '''
+    Function Name: reset()
+    Description: Function clears the counts and sampled messages
+    Parameters: None
+    Return Type:
+            None
+    '''
+    def reset(self):
+        self._counts.clear()
+        if self._samples is not None:
+            self._samples.clear()
+
+
+    '''
+    Function Name: enableFileLog(filename, mode='a')
+    Description: Function writes every reported message to a log file
+    Parameters:
+            (filename) - str - path of the log file
+            (mode='a') - str - file mode
+    Return Type:
+            None
+    '''
+    def enableFileLog(self, filename, mode='a'):
+        self.disableFileLog()
+        self._handler = logging.FileHandler(filename, mode=mode)
+        self._handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        self._logger.addHandler(self._handler)
+        self._wantsMessages = True
+
+
+    '''
+    Function Name: disableFileLog()
+    Description: Function stops writing messages to the log file and closes it
+    Parameters: None
+    Return Type:
+            None
+    '''
+    def disableFileLog(self):
+        if self._handler is not None:
+            self._logger.removeHandler(self._handler)
+            self._handler.close()
+            self._handler = None
+        self._wantsMessages = self._samples is not None
+
+
+## Module Collector ##
+_collector = DiagnosticsCollector()
+
+
+'''
+Function Name: getCollector()
+Description: Function returns the collector that currently receives reports
+Parameters: None
+Return Type:
+        DiagnosticsCollector
+'''
+def getCollector():
+    return _collector
+
+
+'''
+Function Name: setCollector(collector)
+Description: Function replaces the collector that receives reports
+Parameters:
+        (collector) - DiagnosticsCollector - new collector
+Return Type:
+        DiagnosticsCollector - the previous collector
+'''
+def setCollector(collector):
+    global _collector
+    previous = _collector
+    _collector = collector
+    return previous
+
+
+'''
+Function Name: report(componentType, key, message, *args, count=1)
+Description: Function records a warning with the current collector. See DiagnosticsCollector.report()
+Parameters:
+        (componentType) - str - type of the component that produced the warning
+        (key) - hashable - the missing parameter or condition
+        (message) - str - message template using {} fields
+        (*args) - values for the message fields
+        (count=1) - int - number of occurrences being reported
+Return Type:
+        None
+'''
+def report(componentType, key, message, *args, count=1):
+    _collector.report(componentType, key, message, *args, count=count)
@@ -0,0 +1,557 @@
+'''
+Filename: EnergyTables.py
+Author: Michael Hathaway
+
+Description: The Energy Tables module compiles the Turner free energy parameter dictionaries in the parameters package into
+dense numpy arrays. Nucleotides and base pairs are encoded as small integers and used to index the arrays directly, and
+parameters that are missing from the dictionaries are stored as NaN. The accessor functions at the bottom of the module are
+used by the StructureComponent energy() methods and return None when a parameter is missing.
+
+Encodings:
+    bases: A -> 0, C -> 1, G -> 2, U -> 3, anything else -> 4 (UNKNOWN_BASE)
+    base pairs: AU -> 0, CG -> 1, GC -> 2, UA -> 3, GU -> 4, UG -> 5, anything else -> 6 (UNKNOWN_PAIR)
+
+Every base axis has NUM_BASES+1 entries and every pair axis has NUM_PAIRS+1 entries so the unknown codes can be used as
+indices. The unknown rows and columns are always NaN.
+
+Temperature:
+    The tables compiled at import are the 37 ºC free energies. energyTables(temperature) returns the set of tables for any
+    temperature in Kelvin, using dG(T) = dH - T*dS with dS = (dH - dG37)/310.15 for the tables that have an enthalpy table in
+    the parameters package(currently the stacking energies). Parameters without a shipped enthalpy keep their 37 ºC value. The
+    table sets are cached per temperature, so each temperature is only built once.
+'''
+
+## Module Imports ##
+import numpy as np
+from functools import lru_cache
+from collections import namedtuple
+
+## Free Energy Parameter Imports ##
+from parameters.LoopInitiationEnergy import InternalLoopInit, BulgeInit, HairpinInit
+from parameters.StackingEnergies import StackingEnergies
+from parameters.StackingEnthalpy import stackingEnthalpy
+from parameters.InnerLoop_1x1_Energies import InnerLoop_1x1_Energies
+from parameters.InnerLoop_1x2_Energies import InnerLoop_1x2_Energies
+from parameters.InnerLoop_2x2_Energies import InnerLoop_2x2_Energies
+from parameters.InnerLoopMismatches import InnerLoopMismatches_2x3, OtherInnerLoopMismtaches
+from parameters.StackTerminalMismatches import StackTerminalMismatches
+from parameters.SpecialHairpins import SpecialHairpins
+
+## Free Energy Parameter Constants ##
+R = 0.001987204258 #source: https://en.wikipedia.org/wiki/Gas_constant
+T37 = 310.15 #37 ºC in Kelvin, the temperature of the free energy parameters
+T = T37 #default temperature used for energy calculations
+
+#loop lengths used to extrapolate initiation energies for loops longer than the tabulated values
+HAIRPIN_EXTRAPOLATION_LENGTH = 9
+BULGE_EXTRAPOLATION_LENGTH = 6
+INTERNAL_LOOP_EXTRAPOLATION_LENGTH = 6
+INTERNAL_LOOP_EXTRAPOLATION_COEFFICIENT = 1.08
+
+## Encodings ##
+BASES = ('A', 'C', 'G', 'U')
+BASE_PAIRS = (('A', 'U'), ('C', 'G'), ('G', 'C'), ('U', 'A'), ('G', 'U'), ('U', 'G'))
+NUM_BASES = len(BASES)
+NUM_PAIRS = len(BASE_PAIRS)
+UNKNOWN_BASE = NUM_BASES
+UNKNOWN_PAIR = NUM_PAIRS
+
+BASE_CODES = {base: code for code, base in enumerate(BASES)}
+PAIR_CODES = {pair: code for code, pair in enumerate(BASE_PAIRS)}
+
+#lookup table from ascii byte to base code used to encode whole sequences at once
+_BASE_CODE_LOOKUP = np.full(256, UNKNOWN_BASE, dtype=np.int8)
+for _base, _code in BASE_CODES.items():
+    _BASE_CODE_LOOKUP[ord(_base)] = _code
+
+#lookup table from a pair of base codes to a pair code
+PAIR_CODE_LOOKUP = np.full((NUM_BASES+1, NUM_BASES+1), UNKNOWN_PAIR, dtype=np.int8)
+for (_base5p, _base3p), _code in PAIR_CODES.items():
+    PAIR_CODE_LOOKUP[BASE_CODES[_base5p], BASE_CODES[_base3p]] = _code
+
+
+'''
+Function Name: encodeBase(base)
+Description: Function converts a nucleotide into its base code
+Parameters:
+        (base) - str - nucleotide
+Return Type:
+        int - base code, or UNKNOWN_BASE if the nucleotide is not A, C, G, or U
+'''
+def encodeBase(base):
+    return BASE_CODES.get(base, UNKNOWN_BASE)
+
+
+'''
+Function Name: encodePair(pair)
+Description: Function converts a base pair into its pair code
+Parameters:
+        (pair) - (str, str) - base pair
+Return Type:
+        int - pair code, or UNKNOWN_PAIR if the pair is not a canonical base pair
+'''
+def encodePair(pair):
+    return PAIR_CODES.get(pair, UNKNOWN_PAIR)
+
+
+'''
+Function Name: encodeSequence(sequence)
+Description: Function converts a sequence into an array of base codes
+Parameters:
+        (sequence) - str - nucleotide sequence
+Return Type:
+        numpy array of int8
+'''
+def encodeSequence(sequence):
+    return _BASE_CODE_LOOKUP[np.frombuffer(sequence.encode('ascii', 'replace'), dtype=np.uint8)]
+
+
+'''
+Function Name: encodeBytes(data)
+Description: Function converts an array of ascii bytes, for example a StructureBinary sequence buffer, into an array of base codes
+Parameters:
+        (data) - numpy array of uint8 - ascii nucleotides
+Return Type:
+        numpy array of int8
+'''
+def encodeBytes(data):
+    return _BASE_CODE_LOOKUP[np.asarray(data, dtype=np.uint8)]
+
+
+'''
+Function Name: encodePairs(bases5p, bases3p)
+Description: Function converts arrays of base codes into an array of pair codes
+Parameters:
+        (bases5p) - numpy array of int - base codes for the 5' side of each pair
+        (bases3p) - numpy array of int - base codes for the 3' side of each pair
+Return Type:
+        numpy array of int8
+'''
+def encodePairs(bases5p, bases3p):
+    return PAIR_CODE_LOOKUP[bases5p, bases3p]
+
+
+#############################
+###### TABLE BUILDERS #######
+#############################
+
+'''
+Function Name: _emptyTable(shape)
+Description: Internal function that creates a parameter table filled with NaN
+Parameters:
+        (shape) - tuple - shape of the table
+Return Type:
+        numpy array of float64
+'''
+def _emptyTable(shape):
+    return np.full(shape, np.nan, dtype=np.float64)
+
+
+'''
+Function Name: _buildInitTable(initDict)
+Description: Internal function that converts a loop initiation dictionary into an array indexed by loop length
+Parameters:
+        (initDict) - dict - loop length : initiation energy
+Return Type:
+        numpy array of float64
+'''
+def _buildInitTable(initDict):
+    table = _emptyTable(max(initDict) + 1)
+    for length, energy in initDict.items():
+        if energy is not None:
+            table[length] = energy
+    return table
+
+
+'''
+Function Name: _buildStackTable(stackDict)
+Description: Internal function that builds a stacking table indexed by [5' pair, 3' pair]
+Parameters:
+        (stackDict) - dict - 5' pair : {3' pair : value}, for example StackingEnergies or stackingEnthalpy
+Return Type:
+        numpy array of float64
+'''
+def _buildStackTable(stackDict):
+    table = _emptyTable((NUM_PAIRS+1, NUM_PAIRS+1))
+    for pair5p, stacks in stackDict.items():
+        for pair3p, energy in stacks.items():
+            table[encodePair(pair5p), encodePair(pair3p)] = energy
+    return table
+
+
+'''
+Function Name: _buildTerminalMismatchTable()
+Description: Internal function that builds the terminal mismatch table indexed by [closing pair, 5' mismatch base, 3' mismatch base]
+Parameters: None
+Return Type:
+        numpy array of float64
+'''
+def _buildTerminalMismatchTable():
+    table = _emptyTable((NUM_PAIRS+1, NUM_BASES+1, NUM_BASES+1))
+    for closingPair, mismatches in StackTerminalMismatches.items():
+        for (base5p, base3p), energy in mismatches.items():
+            table[encodePair(closingPair), encodeBase(base5p), encodeBase(base3p)] = energy
+    return table
+
+
+'''
+Function Name: _build1x1Table()
+Description: Internal function that builds the 1x1 internal loop table indexed by [5' closing pair, 3' closing pair, 5' base, 3' base]
+Parameters: None
+Return Type:
+        numpy array of float64
+'''
+def _build1x1Table():
+    table = _emptyTable((NUM_PAIRS+1, NUM_PAIRS+1, NUM_BASES+1, NUM_BASES+1))
+    for (closingPair5p, closingPair3p, base5p, base3p), energy in InnerLoop_1x1_Energies.items():
+        table[encodePair(closingPair5p), encodePair(closingPair3p), encodeBase(base5p), encodeBase(base3p)] = energy
+    return table
+
+
+'''
+Function Name: _build1x2Table()
+Description: Internal function that builds the 1x2 internal loop table indexed by
+[5' closing pair, 3' closing pair, 5' base, first 3' base, second 3' base] in the key order of InnerLoop_1x2_Energies
+Parameters: None
+Return Type:
+        numpy array of float64
+'''
+def _build1x2Table():
+    table = _emptyTable((NUM_PAIRS+1, NUM_PAIRS+1, NUM_BASES+1, NUM_BASES+1, NUM_BASES+1))
+    for (closingPair5p, closingPair3p, base5p, base3p1, base3p2), energy in InnerLoop_1x2_Energies.items():
+        table[encodePair(closingPair5p), encodePair(closingPair3p), encodeBase(base5p), encodeBase(base3p1), encodeBase(base3p2)] = energy
+    return table
+
+
+'''
+Function Name: _build2x2Table()
+Description: Internal function that builds the 2x2 internal loop table indexed by
+[5' closing pair, 3' closing pair, first mismatch 5' base, first mismatch 3' base, second mismatch 5' base, second mismatch 3' base]
+Parameters: None
+Return Type:
+        numpy array of float64
+'''
+def _build2x2Table():
+    table = _emptyTable((NUM_PAIRS+1, NUM_PAIRS+1, NUM_BASES+1, NUM_BASES+1, NUM_BASES+1, NUM_BASES+1))
+    for (closingPair5p, closingPair3p, mismatch1, mismatch2), energy in InnerLoop_2x2_Energies.items():
+        table[encodePair(closingPair5p), encodePair(closingPair3p), encodeBase(mismatch1[0]), encodeBase(mismatch1[1]),
+              encodeBase(mismatch2[0]), encodeBase(mismatch2[1])] = energy
+    return table
+
+
+'''
+Function Name: _buildMismatch2x3Table()
+Description: Internal function that builds the 2x3 internal loop mismatch table. The closing pairs in InnerLoopMismatches_2x3
+include non-canonical pairs, so the table is indexed by bases: [closing 5' base, closing 3' base, mismatch 5' base, mismatch 3' base]
+Parameters: None
+Return Type:
+        numpy array of float64
+'''
+def _buildMismatch2x3Table():
+    table = _emptyTable((NUM_BASES+1, NUM_BASES+1, NUM_BASES+1, NUM_BASES+1))
+    for ((closing5p, closing3p), (mismatch5p, mismatch3p)), energy in InnerLoopMismatches_2x3.items():
+        table[encodeBase(closing5p), encodeBase(closing3p), encodeBase(mismatch5p), encodeBase(mismatch3p)] = energy
+    return table
+
+
+'''
+Function Name: _buildMismatchOtherTable()
+Description: Internal function that builds the mismatch table for other internal loops indexed by [mismatch 5' base, mismatch 3' base]
+Parameters: None
+Return Type:
+        numpy array of float64
+'''
+def _buildMismatchOtherTable():
+    table = _emptyTable((NUM_BASES+1, NUM_BASES+1))
+    for (mismatch5p, mismatch3p), energy in OtherInnerLoopMismtaches.items():
+        table[encodeBase(mismatch5p), encodeBase(mismatch3p)] = energy
+    return table
+
+
+## Compiled Parameter Tables ##
+HAIRPIN_INIT = _buildInitTable(HairpinInit)
+BULGE_INIT = _buildInitTable(BulgeInit)
+INTERNAL_LOOP_INIT = _buildInitTable(InternalLoopInit)
+STACK = _buildStackTable(StackingEnergies)
+STACK_ENTHALPY = _buildStackTable(stackingEnthalpy)
+TERMINAL_MISMATCH = _buildTerminalMismatchTable()
+INTERNAL_LOOP_1x1 = _build1x1Table()
+INTERNAL_LOOP_1x2 = _build1x2Table()
+INTERNAL_LOOP_2x2 = _build2x2Table()
+MISMATCH_2x3 = _buildMismatch2x3Table()
+MISMATCH_OTHER = _buildMismatchOtherTable()
+
+#special hairpins flattened into a single hash table keyed by (closing pair, loop sequence)
+SPECIAL_HAIRPINS = {(closingPair, sequence): energy for closingPair, hairpins in SpecialHairpins.items() for sequence, energy in hairpins.items()}
+SPECIAL_HAIRPIN_LENGTHS = frozenset(len(sequence) for closingPair, sequence in SPECIAL_HAIRPINS) #only loops of these lengths can be special
+
+
+#################################
+###### TEMPERATURE TABLES #######
+#################################
+
+#identifies the current parameter set. Energies memoized by the StructureComponents are keyed by this value
+_parameterSetId = 0
+
+#set of parameter tables for a single temperature
+EnergyTableSet = namedtuple('EnergyTableSet', ['temperature', 'hairpinInit', 'bulgeInit', 'internalLoopInit', 'stack', 'terminalMismatch',
+                                               'internalLoop1x1', 'internalLoop1x2', 'internalLoop2x2', 'mismatch2x3', 'mismatchOther', 'specialHairpins'])
+
+
+'''
+Function Name: adjustFreeEnergy(freeEnergy, enthalpy, temperature)
+Description: Function converts a 37 ºC free energy to another temperature with dG(T) = dH - T*dS, where dS = (dH - dG37)/310.15
+Parameters:
+        (freeEnergy) - float or numpy array - free energy at 37 ºC
+        (enthalpy) - float or numpy array - enthalpy
+        (temperature) - float - temperature in Kelvin
+Return Type:
+        float or numpy array - free energy at the given temperature
+'''
+def adjustFreeEnergy(freeEnergy, enthalpy, temperature):
+    return enthalpy - ((temperature / T37) * (enthalpy - freeEnergy))
+
+
+'''
+Function Name: energyTables(temperature=T)
+Description: Function returns the parameter tables for a temperature. The stacking table is adjusted with the stacking enthalpies,
+and the other tables keep their 37 ºC values because no enthalpies are available for them. At 310.15 K the compiled tables are
+returned unchanged. Results are cached, so the tables for a temperature are only built on the first call.
+Parameters:
+        (temperature=T) - float - temperature in Kelvin
+Return Type:
+        EnergyTableSet
+'''
+@lru_cache(maxsize=64)
+def energyTables(temperature=T):
+    temperature = float(temperature)
+    stack = STACK if temperature == T37 else adjustFreeEnergy(STACK, STACK_ENTHALPY, temperature)
+    return EnergyTableSet(temperature, HAIRPIN_INIT, BULGE_INIT, INTERNAL_LOOP_INIT, stack, TERMINAL_MISMATCH,
+                          INTERNAL_LOOP_1x1, INTERNAL_LOOP_1x2, INTERNAL_LOOP_2x2, MISMATCH_2x3, MISMATCH_OTHER, SPECIAL_HAIRPINS)
+
+
+'''
+Function Name: parameterSetId()
+Description: Function returns the id of the current parameter set. The id changes every time clearEnergyTables() is called
+Parameters: None
+Return Type:
+        int
+'''
+def parameterSetId():
+    return _parameterSetId
+
+
+'''
+Function Name: clearEnergyTables()
+Description: Function clears the cached temperature tables and starts a new parameter set. It should be called after the
+compiled tables are modified so that the tables are rebuilt and energies memoized by the StructureComponents are recalculated.
+Parameters: None
+Return Type:
+        int - id of the new parameter set
+'''
+def clearEnergyTables():
+    global _parameterSetId
+    energyTables.cache_clear()
+    _parameterSetId += 1
+    return _parameterSetId
+
+
+######################
+###### ACCESSORS #####
+######################
+
+'''
+Function Name: _value(energy)
+Description: Internal function that converts a table entry into a float, or None if the entry is missing
+Parameters:
+        (energy) - numpy float - table entry
+Return Type:
+        float or None
+'''
+def _value(energy):
+    return None if np.isnan(energy) else float(energy)
+
+
+'''
+Function Name: _tableInit(table, length)
+Description: Internal function that gets a loop initiation energy from a table, or None if it is not tabulated
+Parameters:
+        (table) - numpy array - initiation table indexed by loop length
+        (length) - int - loop length
+Return Type:
+        float or None
+'''
+def _tableInit(table, length):
+    if 0 <= length < len(table):
+        return _value(table[length])
+    return None
+
+
+'''
+Function Name: hairpinInitEnergy(length, temperature=T)
+Description: Function gets the hairpin initiation energy. Lengths missing from the table are extrapolated from the 9 nucleotide value.
+Parameters:
+        (length) - int - number of unpaired nucleotides in the hairpin
+        (temperature=T) - float - temperature in Kelvin
+Return Type:
+        float
+'''
+def hairpinInitEnergy(length, temperature=T):
+    table = energyTables(temperature).hairpinInit
+    init = _tableInit(table, length)
+    if init is None and length not in HairpinInit: #lengths listed as None in the dictionary are not extrapolated
+        init = float(table[HAIRPIN_EXTRAPOLATION_LENGTH]) + (1.75 * R * temperature * np.log(float(length/float(HAIRPIN_EXTRAPOLATION_LENGTH))))
+    return init
+
+
+'''
+Function Name: bulgeInitEnergy(length, temperature=T)
+Description: Function gets the bulge initiation energy. Lengths missing from the table are extrapolated from the 6 nucleotide value.
+Parameters:
+        (length) - int - number of unpaired nucleotides in the bulge
+        (temperature=T) - float - temperature in Kelvin
+Return Type:
+        float
+'''
+def bulgeInitEnergy(length, temperature=T):
+    table = energyTables(temperature).bulgeInit
+    init = _tableInit(table, length)
+    if init is None:
+        init = float(table[BULGE_EXTRAPOLATION_LENGTH]) + (1.75 * R * temperature * np.log(float(length/float(BULGE_EXTRAPOLATION_LENGTH))))
+    return init
+
+
+'''
+Function Name: internalLoopInitEnergy(length, temperature=T)
+Description: Function gets the internal loop initiation energy. Lengths missing from the table are extrapolated from the 6 nucleotide value.
+Parameters:
+        (length) - int - total number of unpaired nucleotides in the internal loop
+        (temperature=T) - float - temperature in Kelvin
+Return Type:
+        float
+'''
+def internalLoopInitEnergy(length, temperature=T):
+    table = energyTables(temperature).internalLoopInit
+    init = _tableInit(table, length)
+    if init is None:
+        init = float(table[INTERNAL_LOOP_EXTRAPOLATION_LENGTH]) + (INTERNAL_LOOP_EXTRAPOLATION_COEFFICIENT * np.log(float(length)/float(INTERNAL_LOOP_EXTRAPOLATION_LENGTH)))
+    return init
+
+
+'''
+Function Name: stackEnergy(pair5p, pair3p, temperature=T)
+Description: Function gets the stacking energy of two adjacent base pairs
+Parameters:
+        (pair5p) - (str, str) - 5' base pair
+        (pair3p) - (str, str) - 3' base pair
+        (temperature=T) - float - temperature in Kelvin
+Return Type:
+        float, or None if the parameter is missing
+'''
+def stackEnergy(pair5p, pair3p, temperature=T):
+    return _value(energyTables(temperature).stack[encodePair(pair5p), encodePair(pair3p)])
+
+
+'''
+Function Name: terminalMismatchEnergy(closingPair, mismatch, temperature=T)
+Description: Function gets the terminal mismatch energy for a hairpin closing pair and its first mismatch
+Parameters:
+        (closingPair) - (str, str) - closing base pair
+        (mismatch) - (str, str) - first and last unpaired bases of the loop
+        (temperature=T) - float - temperature in Kelvin
+Return Type:
+        float, or None if the parameter is missing
+'''
+def terminalMismatchEnergy(closingPair, mismatch, temperature=T):
+    return _value(energyTables(temperature).terminalMismatch[encodePair(closingPair), encodeBase(mismatch[0]), encodeBase(mismatch[1])])
+
+
+'''
+Function Name: specialHairpinEnergy(closingPair, sequence, temperature=T)
+Description: Function gets the tabulated energy of a special hairpin
+Parameters:
+        (closingPair) - (str, str) - closing base pair
+        (sequence) - str - hairpin loop sequence
+        (temperature=T) - float - temperature in Kelvin
+Return Type:
+        float, or None if the hairpin is not a special hairpin
+'''
+def specialHairpinEnergy(closingPair, sequence, temperature=T):
+    return energyTables(temperature).specialHairpins.get((closingPair, sequence))
+
+
+'''
+Function Name: internalLoop1x1Energy(closingPair5p, closingPair3p, base5p, base3p, temperature=T)
+Description: Function gets the energy of a 1x1 internal loop
+Parameters:
+        (closingPair5p) - (str, str) - 5' closing pair
+        (closingPair3p) - (str, str) - 3' closing pair
+        (base5p) - str - unpaired base on the 5' side
+        (base3p) - str - unpaired base on the 3' side
+        (temperature=T) - float - temperature in Kelvin
+Return Type:
+        float, or None if the parameter is missing
+'''
+def internalLoop1x1Energy(closingPair5p, closingPair3p, base5p, base3p, temperature=T):
+    return _value(energyTables(temperature).internalLoop1x1[encodePair(closingPair5p), encodePair(closingPair3p), encodeBase(base5p), encodeBase(base3p)])
+
+
+'''
+Function Name: internalLoop1x2Energy(closingPair5p, closingPair3p, base5p, base3p1, base3p2, temperature=T)
+Description: Function gets the energy of a 1x2 internal loop using the key order of InnerLoop_1x2_Energies
+Parameters:
+        (closingPair5p) - (str, str) - 5' closing pair
+        (closingPair3p) - (str, str) - 3' closing pair
+        (base5p) - str - unpaired base on the 5' side
+        (base3p1) - str - first key base on the 3' side
+        (base3p2) - str - second key base on the 3' side
+        (temperature=T) - float - temperature in Kelvin
+Return Type:
+        float, or None if the parameter is missing
+'''
+def internalLoop1x2Energy(closingPair5p, closingPair3p, base5p, base3p1, base3p2, temperature=T):
+    return _value(energyTables(temperature).internalLoop1x2[encodePair(closingPair5p), encodePair(closingPair3p), encodeBase(base5p), encodeBase(base3p1), encodeBase(base3p2)])
+
+
+'''
+Function Name: internalLoop2x2Energy(closingPair5p, closingPair3p, mismatch1, mismatch2, temperature=T)
+Description: Function gets the energy of a 2x2 internal loop
+Parameters:
+        (closingPair5p) - (str, str) - 5' closing pair
+        (closingPair3p) - (str, str) - 3' closing pair
+        (mismatch1) - (str, str) - first unpaired base of the 5' loop and last unpaired base of the 3' loop
+        (mismatch2) - (str, str) - second unpaired base of the 5' loop and first unpaired base of the 3' loop
+        (temperature=T) - float - temperature in Kelvin
+Return Type:
+        float, or None if the parameter is missing
+'''
+def internalLoop2x2Energy(closingPair5p, closingPair3p, mismatch1, mismatch2, temperature=T):
+    return _value(energyTables(temperature).internalLoop2x2[encodePair(closingPair5p), encodePair(closingPair3p), encodeBase(mismatch1[0]), encodeBase(mismatch1[1]),
+                                                                    encodeBase(mismatch2[0]), encodeBase(mismatch2[1])])
+
+
+'''
+Function Name: mismatch2x3Energy(closingPair, mismatch, temperature=T)
+Description: Function gets the mismatch energy for a 2x3 internal loop closing pair
+Parameters:
+        (closingPair) - (str, str) - closing pair
+        (mismatch) - (str, str) - mismatched bases next to the closing pair
+        (temperature=T) - float - temperature in Kelvin
+Return Type:
+        float, or None if the parameter is missing
+'''
+def mismatch2x3Energy(closingPair, mismatch, temperature=T):
+    return _value(energyTables(temperature).mismatch2x3[encodeBase(closingPair[0]), encodeBase(closingPair[1]), encodeBase(mismatch[0]), encodeBase(mismatch[1])])
+
+
+'''
+Function Name: mismatchOtherEnergy(mismatch, temperature=T)
+Description: Function gets the mismatch energy for internal loops that are not 1xn, 2x2, or 2x3 loops
+Parameters:
+        (mismatch) - (str, str) - mismatched bases next to a closing pair
+        (temperature=T) - float - temperature in Kelvin
+Return Type:
+        float, or None if the parameter is missing
+'''
+def mismatchOtherEnergy(mismatch, temperature=T):
+    return _value(energyTables(temperature).mismatchOther[encodeBase(mismatch[0]), encodeBase(mismatch[1])])
@@ -0,0 +1,577 @@
+'''
+Filename: Folding.py
+Author: Michael Hathaway
+
+Description: The Folding module predicts the minimum free energy(MFE) secondary structure of an RNA sequence with a Zuker style
+dynamic programming algorithm. The folding energy model is the energy model of the Structure object in non-strict mode: every
+loop is scored with the BatchEnergy array functions, which match the energy() methods of the StructureComponent classes, so the
+free energy of a folded structure is the same whether it is read from the fold or from Structure.energy(strict=False).
+
+Because the stem energy of the Structure object depends on the whole stem(the symmetry penalty compares both strands, and
+the terminal AU/GU penalty depends on the loop next to each end), the recursions are written over maximal stems instead of
+single stacked pairs:
+
+    C(i, j) - lowest energy of the bases i..j, where (i, j) is the innermost pair of a stem and closes a hairpin, bulge,
+              internal loop, or multiloop
+    P(i, j) - lowest energy of the bases i..j, where (i, j) is the outermost pair of a stem of at least 2 pairs
+    WM(i, j) - lowest energy of the bases i..j as part of a multiloop with at least one branch
+
+The terminal AU/GU penalty of each stem end is added by the loop next to it, and is left out next to bulges of length 1 in the
+same way as Stem.energy(). Isolated base pairs are not allowed(stems of length 1 have no energy), hairpins have at least
+MIN_HAIRPIN_LENGTH unpaired nucleotides, and bulges and internal loops have at most maxLoop unpaired nucleotides.
+Pseudoknots, dangling ends, and coaxial stacking are not part of the energy model.
+
+Long transcripts are folded locally by localFold(), which only allows base pairs that span at most maxSpan bases. The matrices
+are filled in blocks of maxSpan rows from the 3' end, each with the energy tables of a window of 2*maxSpan bases, and the rows
+shared by two windows are copied into the next window instead of being recalculated, so memory is O(maxSpan^2) plus O(L) for the
+exterior loop. Locally stable domains are reported while the scan moves towards the 5' end.
+
+Usage:
+    structure = fold('GGGAAAUCCCGCGAAAGCGC', name='example')
+    structure.dotBracket(), structure.energy(strict=False)
+'''
+
+## Module Imports ##
+import numpy as np
+
+## Energy Imports ##
+from EnergyTables import T, energyTables, encodeSequence, specialHairpinEnergy, PAIR_CODE_LOOKUP, BASE_CODES, UNKNOWN_PAIR, SPECIAL_HAIRPIN_LENGTHS
+from BatchEnergy import batchHairpinEnergyArrays, batchBulgeEnergyArrays, batchInternalLoopEnergyArrays, END_PENALTY_PAIRS
+from StructureComponents import STEM_SYMMETRY_PENALTY, STEM_AU_END_PENALTY, MULTILOOP_A, MULTILOOP_BRANCH, MULTILOOP_UNPAIRED
+
+## Structure Import ##
+from Structure import Structure
+
+## Folding Constants ##
+MIN_HAIRPIN_LENGTH = 3 #hairpins shorter than 3 nucleotides have no energy
+MAX_LOOP = 30 #default maximum number of unpaired nucleotides in a bulge or internal loop
+MAX_SPAN = 150 #default maximum number of bases spanned by a base pair in local folding
+TOLERANCE = 1e-9 #tolerance used to match energies during the traceback
+
+
+'''
+Class: EnergyModel
+Description: The EnergyModel object holds the per sequence tables used by the folding algorithms: the encoded sequence, the pair
+code of every pair of bases, and the energies of every hairpin, stacking step, and stem end. Bulges and internal loops are
+enumerated one row at a time by interiorLoops(), because there are too many of them to keep for long sequences.
+
+Member variable -- data type -- description:
+self._sequence -- str -- upper case RNA sequence(T is read as U)
+self._length -- int -- length of the sequence
+self._bases -- numpy array of int64 -- base codes of the sequence
+self._pairs -- numpy array of int64 -- (L, L) pair code of bases i and j
+self._canPair -- numpy array of bool -- (L, L) True where i < j form a canonical pair that can close a hairpin
+self._hairpin -- numpy array of float64 -- (L, L) hairpin energy plus the terminal penalty of the closing pair, inf if not allowed
+self._stack -- numpy array of float64 -- (L, L) stacking energy of pair (i, j) on pair (i+1, j-1)
+self._penalty -- numpy array of float64 -- (L, L) terminal AU/GU penalty of pair (i, j)
+self._commonPrefix -- numpy array of int32 -- (L+1, L+1) length of the longest common prefix of the suffixes at x and y
+self._maxLoop -- int -- maximum number of unpaired nucleotides in a bulge or internal loop
+self._maxSpan -- int -- maximum number of bases from i to j of a base pair (i, j), None for no limit
+self._temperature -- float -- temperature in Kelvin
+self._loopSizes -- (numpy array, numpy array) -- 5' and 3' sizes of every allowed bulge and internal loop
+'''
+class EnergyModel:
+    #__init__() method for the EnergyModel object
+    def __init__(self, sequence, maxLoop=MAX_LOOP, temperature=T, maxSpan=None):
+        self._sequence = sequence.upper().replace('T', 'U')
+        self._length = len(self._sequence)
+        self._maxLoop = maxLoop
+        self._maxSpan = maxSpan
+        self._temperature = temperature
+        self._bases = encodeSequence(self._sequence).astype(np.int64)
+
+        length = self._length
+        index = np.arange(length)
+        self._pairs = PAIR_CODE_LOOKUP[self._bases[:, None], self._bases[None, :]].astype(np.int64)
+        self._canPair = (self._pairs != UNKNOWN_PAIR) & ((index[None, :] - index[:, None] - 1) >= MIN_HAIRPIN_LENGTH)
+        if maxSpan is not None:
+            self._canPair &= (index[None, :] - index[:, None] + 1) <= maxSpan
+        self._penalty = np.where(np.isin(self._pairs, END_PENALTY_PAIRS), STEM_AU_END_PENALTY, 0.0)
+
+        #stacking step of every pair onto the pair inside it. Missing steps count as 0 in non-strict mode
+        self._stack = np.zeros((length, length), dtype=np.float64)
+        if length > 2:
+            steps = energyTables(temperature).stack[self._pairs[:-1, 1:], self._pairs[1:, :-1]]
+            self._stack[:-1, 1:] = np.where(np.isnan(steps), 0.0, steps)
+
+        #longest common prefix of every two suffixes, used to find symmetric stems
+        self._commonPrefix = np.zeros((length + 1, length + 1), dtype=np.int32)
+        for x in range(length - 1, -1, -1):
+            self._commonPrefix[x, :length] = np.where(self._bases[x] == self._bases, self._commonPrefix[x + 1, 1:] + 1, 0)
+
+        self._hairpin = self._hairpinEnergies()
+
+        #5' and 3' sizes of every bulge and internal loop up to maxLoop unpaired nucleotides
+        sizes = [(a, b) for a in range(maxLoop + 1) for b in range(maxLoop + 1 - a) if a + b > 0]
+        self._loopSizes = (np.array([a for a, b in sizes], dtype=np.int64), np.array([b for a, b in sizes], dtype=np.int64))
+
+    #define len function for the EnergyModel object
+    def __len__(self):
+        return self._length
+
+
+    '''
+    Function Name: _hairpinEnergies()
+    Description: Internal method that calculates the energy of every allowed hairpin with BatchEnergy.batchHairpinEnergyArrays()
+    Parameters: None
+    Return Type:
+            numpy array of float64 - (L, L) hairpin energy plus the terminal penalty of the closing pair, inf where (i, j) cannot close a hairpin
+    '''
+    def _hairpinEnergies(self):
+        hairpin = np.full((self._length, self._length), np.inf)
+        i, j = np.nonzero(self._canPair)
+        if len(i) == 0:
+            return hairpin
+
+        lengths = j - i - 1
+        cTotals = np.concatenate(([0], np.cumsum(self._bases == BASE_CODES['C'])))
+        allC = (cTotals[j] - cTotals[i + 1]) == lengths
+        special = np.full(len(i), np.nan)
+        for n in np.flatnonzero(np.isin(lengths, list(SPECIAL_HAIRPIN_LENGTHS))):
+            energy = specialHairpinEnergy((self._sequence[i[n]], self._sequence[j[n]]), self._sequence[i[n] + 1:j[n]], self._temperature)
+            if energy is not None:
+                special[n] = energy
+
+        energies, missing = batchHairpinEnergyArrays(lengths, self._bases[i + 1], self._bases[j - 1], allC, self._pairs[i, j], special,
+                                                     strict=False, temperature=self._temperature)
+        hairpin[i, j] = np.where(missing, np.inf, energies + self._penalty[i, j])
+        return hairpin
+
+
+    '''
+    Function Name: sequence()
+    Description: Function returns the sequence used by the model
+    Parameters: None
+    Return Type:
+            str
+    '''
+    def sequence(self):
+        return self._sequence
+
+
+    '''
+    Function Name: interiorLoops(i, js, inner=None)
+    Description: Function enumerates the bulges and internal loops closed by the pairs (i, j) for every j in js, and calculates
+    their energies with the BatchEnergy array functions. The closing pairs are ordered in the same way as the StructureAnnotation
+    module orders them, so the energies match Bulge.energy() and InternalLoop.energy() of the annotated structure. The terminal
+    AU/GU penalties of both stem ends are included except next to bulges of length 1.
+    Parameters:
+            (i) - int - 0-based index of the 5' base of the closing pairs
+            (js) - numpy array of int - 0-based indices of the 3' bases of the closing pairs
+            (inner=None) - numpy array of bool - (L, L) mask of inner pairs to consider. All pairs that can close a hairpin by default
+    Return Type:
+            (numpy array of int, numpy array of int, numpy array of int, numpy array of float64) - position in js, 0-based inner
+            pair (k, l), and energy of every loop
+    '''
+    def interiorLoops(self, i, js, inner=None):
+        inner = self._canPair if inner is None else inner
+        sizes5p, sizes3p = self._loopSizes
+        rows = np.repeat(np.arange(len(js)), len(sizes5p))
+        a = np.tile(sizes5p, len(js))
+        b = np.tile(sizes3p, len(js))
+        j = np.asarray(js, dtype=np.int64)[rows]
+        k = i + a + 1
+        l = j - b - 1
+        valid = (l - k - 1 >= MIN_HAIRPIN_LENGTH)
+        valid[valid] = inner[k[valid], l[valid]]
+        rows, a, b, j, k, l = rows[valid], a[valid], b[valid], j[valid], k[valid], l[valid]
+        energies = np.full(len(rows), np.inf)
+        bases = self._bases
+        penalties = self._penalty[i, j] + self._penalty[k, l]
+
+        #bulges. The 3' closing pair of a bulge on the 3' strand is read from the bulge side
+        bulge = (a == 0) | (b == 0)
+        if bulge.any():
+            bi, bj, bk, bl, size5p = i, j[bulge], k[bulge], l[bulge], a[bulge]
+            lengths = size5p + b[bulge]
+            on5p = size5p > 0
+            closing5p = np.stack((np.where(on5p, bases[bi], bases[bk]), np.where(on5p, bases[bj], bases[bl])), axis=1)
+            closing3p = np.stack((np.where(on5p, bases[bk], bases[bj]), np.where(on5p, bases[bl], bases[bi])), axis=1)
+            singleC = (lengths == 1) & (bases[np.where(on5p, bi + 1, bj - 1)] == BASE_CODES['C'])
+            bulgeEnergies, missing = batchBulgeEnergyArrays(lengths, singleC, closing5p, closing3p, strict=False, temperature=self._temperature)
+            bulgeEnergies = bulgeEnergies + np.where(lengths == 1, 0.0, penalties[bulge])
+            energies[bulge] = np.where(missing, np.inf, bulgeEnergies)
+
+        #internal loops
+        internal = ~bulge
+        if internal.any():
+            ij, ik, il = j[internal], k[internal], l[internal]
+            loopBases5p = np.stack((np.full(len(ij), bases[i + 1]), bases[np.minimum(i + 2, ik)], bases[ik - 1]), axis=1)
+            loopBases3p = np.stack((bases[il + 1], bases[np.minimum(il + 2, ij)], bases[ij - 1]), axis=1)
+            closing5p = np.stack((np.full(len(ij), bases[i]), bases[ij]), axis=1)
+            closing3p = np.stack((bases[ik], bases[il]), axis=1)
+            loopEnergies, missing = batchInternalLoopEnergyArrays(a[internal], b[internal], loopBases5p, loopBases3p, closing5p, closing3p,
+                                                                  strict=False, temperature=self._temperature)
+            energies[internal] = np.where(missing, np.inf, loopEnergies + penalties[internal])
+
+        return rows, k, l, energies
+
+
+    '''
+    Function Name: stems(i)
+    Description: Generator that enumerates the stems whose outermost pair starts at base i, one stem length at a time. Stem n
+    of a pair (i, j) has the pairs (i, j), (i+1, j-1), ..., (i+n-1, j-n+1). The stem energy is the stacking energy and the
+    symmetry penalty of Stem.energy(). The terminal penalties are added by the loops next to the stem ends.
+    Parameters:
+            (i) - int - 0-based index of the 5' base of the outermost pair
+    Return Type:
+            generator of (int, numpy array of int, numpy array of float64) - stem length n, the 3' bases j of the outermost
+            pairs that have a stem of length n, and the energy of each of those stems
+    '''
+    def stems(self, i):
+        length = self._length
+        js = np.arange(length)
+        valid = self._canPair[i].copy()
+        stack = np.zeros(length, dtype=np.float64)
+        n = 1
+        while valid.any() and i + n < length:
+            n += 1
+            innerJ = js - n + 1
+            valid &= innerJ > i + n - 1
+            valid[valid] = self._canPair[i + n - 1, innerJ[valid]]
+            if not valid.any():
+                break
+            stack[valid] += self._stack[i + n - 2, innerJ[valid] + 1]
+            symmetric = self._commonPrefix[i, innerJ[valid]] >= n
+            yield n, js[valid], stack[valid] + np.where(symmetric, STEM_SYMMETRY_PENALTY, 0.0)
+
+
+'''
+Class: _MinimumFreeEnergy
+Description: Internal class that fills and traces back the MFE matrices of an EnergyModel
+
+Member variable -- data type -- description:
+self._model -- EnergyModel -- energy tables of the sequence
+self._C -- numpy array of float64 -- (L, L) energy when (i, j) is the innermost pair of a stem
+self._P -- numpy array of float64 -- (L, L) energy when (i, j) is the outermost pair of a stem
+self._WM -- numpy array of float64 -- (L+1, L) energy of i..j inside a multiloop with at least one branch
+self._hasStem -- numpy array of bool -- (L, L) True where P(i, j) is finite
+self._F -- numpy array of float64 -- (L+1) energy of the first j bases
+'''
+class _MinimumFreeEnergy:
+    #__init__() method for the _MinimumFreeEnergy object. With fill=False the matrices are left for the caller to fill with _fillRow()
+    def __init__(self, model, fill=True):
+        self._model = model
+        length = len(model)
+        self._C = np.full((length, length), np.inf)
+        self._P = np.full((length, length), np.inf)
+        self._WM = np.full((length + 1, length), np.inf)
+        self._hasStem = np.zeros((length, length), dtype=bool)
+        self._F = np.zeros(length + 1)
+        if fill:
+            self._fill()
+
+
+    '''
+    Function Name: _branches(i)
+    Description: Internal method that returns the energies of the multiloop branches that start at base i: the stem energy, the
+    branch penalty, and the terminal penalty of the outer pair of the stem
+    Parameters:
+            (i) - int - 0-based index
+    Return Type:
+            numpy array of float64 - energy of the branch (i, j) for every j
+    '''
+    def _branches(self, i):
+        return self._P[i] + MULTILOOP_BRANCH + self._model._penalty[i]
+
+
+    '''
+    Function Name: _multiloops(i)
+    Description: Internal method that returns the energies of the multiloops closed by (i, j) for every j, excluding the
+    multiloop initiation, closing branch, and closing pair penalty
+    Parameters:
+            (i) - int - 0-based index of the 5' base of the closing pair
+    Return Type:
+            numpy array of float64 - split energy for every j, indexed by j-1
+    '''
+    def _multiloops(self, i):
+        length = len(self._model)
+        split = np.full(length, np.inf)
+        if i + 1 >= length:
+            return split
+        us = np.flatnonzero(np.isfinite(self._WM[i + 1]))
+        if len(us):
+            split = (self._WM[i + 1, us, None] + self._WM[us + 1, :]).min(axis=0)
+        return split
+
+
+    '''
+    Function Name: _fill()
+    Description: Internal method that fills the matrices one row at a time from the 3' end, so every row only uses rows below it
+    Parameters: None
+    Return Type: None
+    '''
+    def _fill(self):
+        model = self._model
+        length = len(model)
+        for i in range(length - 1, -1, -1):
+            self._fillRow(i)
+
+        #exterior loop
+        for j in range(1, length + 1):
+            ks = np.arange(j - 1)
+            outer = self._F[ks] + self._P[ks, j - 1] + model._penalty[ks, j - 1]
+            self._F[j] = min(self._F[j - 1], outer.min()) if len(ks) else self._F[j - 1]
+
+
+    '''
+    Function Name: _fillRow(i)
+    Description: Internal method that fills row i of the C, P, and WM matrices from the rows below it
+    Parameters:
+            (i) - int - 0-based index of the row
+    Return Type: None
+    '''
+    def _fillRow(self, i):
+        model = self._model
+        length = len(model)
+        js = np.flatnonzero(model._canPair[i])
+        if len(js):
+            #hairpins
+            C = model._hairpin[i].copy()
+
+            #bulges and internal loops closed by (i, j), with a stem starting at the inner pair
+            rows, k, l, energies = model.interiorLoops(i, js, self._hasStem)
+            if len(rows):
+                best = np.full(len(js), np.inf)
+                np.minimum.at(best, rows, energies + self._P[k, l])
+                C[js] = np.minimum(C[js], best)
+
+            #multiloops closed by (i, j)
+            split = self._multiloops(i)
+            C[js] = np.minimum(C[js], MULTILOOP_A + MULTILOOP_BRANCH + model._penalty[i, js] + split[js - 1])
+            self._C[i, js] = C[js]
+
+            #stems whose outermost pair is (i, j)
+            for n, ends, energies in model.stems(i):
+                self._P[i, ends] = np.minimum(self._P[i, ends], energies + self._C[i + n - 1, ends - n + 1])
+            self._hasStem[i] = np.isfinite(self._P[i])
+
+        #multiloop segments starting at i: a branch (i, l) followed by unpaired bases, or a branch followed by more segments
+        columns = np.arange(length)
+        branches = self._branches(i)
+        single = np.minimum.accumulate(branches - MULTILOOP_UNPAIRED * columns) + MULTILOOP_UNPAIRED * columns
+        ms = np.flatnonzero(np.isfinite(branches[:length - 1]))
+        if len(ms):
+            single = np.minimum(single, (branches[ms, None] + self._WM[ms + 1, :]).min(axis=0))
+        self._WM[i] = np.minimum(single, self._WM[i + 1] + MULTILOOP_UNPAIRED)
+        self._WM[i, :i] = np.inf
+
+
+    '''
+    Function Name: energy()
+    Description: Function returns the minimum free energy of the sequence
+    Parameters: None
+    Return Type:
+            float
+    '''
+    def energy(self):
+        return float(self._F[len(self._model)])
+
+
+    '''
+    Function Name: traceback(pair=None)
+    Description: Function traces back the minimum free energy structure
+    Parameters:
+            (pair=None) - (int, int) - 0-based outermost pair (i, j) of a stem. The lowest energy structure of the bases i..j with
+            (i, j) as its outermost pair is traced back instead of the MFE structure of the whole sequence
+    Return Type:
+            str - dot-bracket string of the MFE structure. Only bases i..j are paired when a pair is given
+    '''
+    def traceback(self, pair=None):
+        model = self._model
+        length = len(model)
+        dbn = ['.'] * length
+        close = lambda value, target: abs(value - target) <= TOLERANCE * max(1.0, abs(target))
+        tasks = [('F', length)] if pair is None else [('P', *pair)]
+
+        while tasks:
+            task = tasks.pop()
+            if task[0] == 'F':
+                j = task[1]
+                if j == 0:
+                    continue
+                if close(self._F[j - 1], self._F[j]):
+                    tasks.append(('F', j - 1))
+                    continue
+                for k in range(j - 1):
+                    if close(self._F[k] + self._P[k, j - 1] + model._penalty[k, j - 1], self._F[j]):
+                        tasks.extend([('F', k), ('P', k, j - 1)])
+                        break
+
+            elif task[0] == 'P':
+                i, j = task[1], task[2]
+                for n, ends, energies in model.stems(i):
+                    position = np.searchsorted(ends, j)
+                    if position < len(ends) and ends[position] == j and close(energies[position] + self._C[i + n - 1, j - n + 1], self._P[i, j]):
+                        for t in range(n):
+                            dbn[i + t], dbn[j - t] = '(', ')'
+                        tasks.append(('C', i + n - 1, j - n + 1))
+                        break
+
+            elif task[0] == 'C':
+                i, j = task[1], task[2]
+                target = self._C[i, j]
+                if close(model._hairpin[i, j], target):
+                    continue
+                rows, k, l, energies = model.interiorLoops(i, np.array([j]), self._hasStem)
+                match = np.flatnonzero(np.abs(energies + self._P[k, l] - target) <= TOLERANCE * max(1.0, abs(target)))
+                if len(match):
+                    tasks.append(('P', int(k[match[0]]), int(l[match[0]])))
+                    continue
+                remainder = target - (MULTILOOP_A + MULTILOOP_BRANCH + model._penalty[i, j])
+                for u in range(i + 1, j - 1):
+                    if close(self._WM[i + 1, u] + self._WM[u + 1, j - 1], remainder):
+                        tasks.extend([('WM', i + 1, u), ('WM', u + 1, j - 1)])
+                        break
+
+            elif task[0] == 'WM':
+                i, j = task[1], task[2]
+                target = self._WM[i, j]
+                if i < j and close(self._WM[i + 1, j] + MULTILOOP_UNPAIRED, target):
+                    tasks.append(('WM', i + 1, j))
+                    continue
+                branches = self._branches(i)
+                found = False
+                for l in range(i + 1, j + 1):
+                    if close(branches[l] + MULTILOOP_UNPAIRED * (j - l), target):
+                        tasks.append(('P', i, l))
+                        found = True
+                        break
+                if found:
+                    continue
+                for m in range(i + 1, j):
+                    if close(branches[m] + self._WM[m + 1, j], target):
+                        tasks.extend([('P', i, m), ('WM', m + 1, j)])
+                        break
+
+        return ''.join(dbn)
+
+
+'''
+Function Name: foldDotBracket(sequence, maxLoop=MAX_LOOP, temperature=T)
+Description: Function predicts the minimum free energy secondary structure of a sequence
+Parameters:
+        (sequence) - str - RNA sequence. Lower case letters are read as upper case and T as U
+        (maxLoop=MAX_LOOP) - int - maximum number of unpaired nucleotides in a bulge or internal loop
+        (temperature=T) - float - temperature in Kelvin
+Return Type:
+        (str, float) - dot-bracket string of the MFE structure and its free energy in Kcal/mol
+'''
+def foldDotBracket(sequence, maxLoop=MAX_LOOP, temperature=T):
+    mfe = _MinimumFreeEnergy(EnergyModel(sequence, maxLoop, temperature))
+    return mfe.traceback(), mfe.energy()
+
+
+'''
+Function Name: fold(sequence, name='', maxLoop=MAX_LOOP, temperature=T)
+Description: Function predicts the minimum free energy secondary structure of a sequence and annotates it as a Structure object
+with Structure.fromDotBracket(). Structure.energy(strict=False, temperature=temperature) of the result is the minimum free energy.
+Parameters:
+        (sequence) - str - RNA sequence. Lower case letters are read as upper case and T as U
+        (name='') - str - name of the Structure
+        (maxLoop=MAX_LOOP) - int - maximum number of unpaired nucleotides in a bulge or internal loop
+        (temperature=T) - float - temperature in Kelvin
+Return Type:
+        Structure object
+'''
+def fold(sequence, name='', maxLoop=MAX_LOOP, temperature=T):
+    model = EnergyModel(sequence, maxLoop, temperature)
+    dbn = _MinimumFreeEnergy(model).traceback()
+    return Structure.fromDotBracket(model.sequence(), dbn, name)
+
+
+'''
+Function Name: localFoldDotBrackets(sequence, maxSpan=MAX_SPAN, maxLoop=MAX_LOOP, temperature=T, threshold=0.0)
+Description: Generator that folds a long sequence with base pairs that span at most maxSpan bases and reports its locally stable
+domains. The sequence is scanned from the 3' end. At every base i, the lowest energy structure of bases i..L-1 is found from the
+rows filled so far, and if base i is paired in it, the domain closed by that pair is a candidate. A candidate replaces the
+previous one when it encloses it, and the previous candidate is reported otherwise, or as soon as no pair within maxSpan can
+enclose it. Domains can overlap when they are alternative structures of the same bases.
+Parameters:
+        (sequence) - str - RNA sequence. Lower case letters are read as upper case and T as U
+        (maxSpan=MAX_SPAN) - int - maximum number of bases from i to j of a base pair (i, j)
+        (maxLoop=MAX_LOOP) - int - maximum number of unpaired nucleotides in a bulge or internal loop
+        (temperature=T) - float - temperature in Kelvin
+        (threshold=0.0) - float - only domains with an energy below the threshold are reported
+Return Type:
+        generator of (int, int, str, float) - 1-based first and last base of the domain, its dot-bracket string, and its free
+        energy in Kcal/mol, in order from the 3' end of the sequence
+'''
+def localFoldDotBrackets(sequence, maxSpan=MAX_SPAN, maxLoop=MAX_LOOP, temperature=T, threshold=0.0):
+    sequence = sequence.upper().replace('T', 'U')
+    length = len(sequence)
+    suffix = np.zeros(length + 1) #lowest energy of bases i..L-1
+    pending = None #[i, j, energy, dot-bracket or None] of the last candidate domain
+    mfe = None
+
+    stop = length
+    while stop > 0:
+        start = max(stop - maxSpan, 0)
+        end = min(start + 2 * maxSpan, length)
+        model = EnergyModel(sequence[start:end], maxLoop, temperature, maxSpan)
+        previous, mfe = mfe, _MinimumFreeEnergy(model, fill=False)
+
+        #rows stop..end-1 were filled in the previous window, which starts at base stop
+        if previous is not None:
+            size, offset = end - stop, stop - start
+            for matrix in ('_C', '_P', '_WM', '_hasStem'):
+                getattr(mfe, matrix)[offset:offset + size, offset:offset + size] = getattr(previous, matrix)[:size, :size]
+            if pending is not None and pending[3] is None:
+                pending[3] = previous.traceback((pending[0] - stop, pending[1] - stop))[pending[0] - stop:pending[1] - stop + 1]
+
+        for i in range(stop - 1, start - 1, -1):
+            local = i - start
+            mfe._fillRow(local)
+
+            #the pending domain is reported once no pair (i, j) with j - i < maxSpan can enclose it
+            if pending is not None and pending[1] >= i + maxSpan:
+                if pending[3] is None:
+                    pending[3] = mfe.traceback((pending[0] - start, pending[1] - start))[pending[0] - start:pending[1] - start + 1]
+                yield pending[0] + 1, pending[1] + 1, pending[3], pending[2]
+                pending = None
+
+            suffix[i] = suffix[i + 1]
+            ends = np.flatnonzero(mfe._hasStem[local])
+            if len(ends):
+                domains = mfe._P[local, ends] + model._penalty[local, ends]
+                totals = domains + suffix[start + ends + 1]
+                best = int(np.argmin(totals))
+                if totals[best] < suffix[i + 1]:
+                    suffix[i] = totals[best]
+                    j = start + int(ends[best])
+                    if domains[best] < threshold:
+                        if pending is not None and j < pending[1]:
+                            if pending[3] is None:
+                                pending[3] = mfe.traceback((pending[0] - start, pending[1] - start))[pending[0] - start:pending[1] - start + 1]
+                            yield pending[0] + 1, pending[1] + 1, pending[3], pending[2]
+                        pending = [i, j, float(domains[best]), None]
+        stop = start
+
+    if pending is not None:
+        if pending[3] is None:
+            pending[3] = mfe.traceback((pending[0], pending[1]))[pending[0]:pending[1] + 1]
+        yield pending[0] + 1, pending[1] + 1, pending[3], pending[2]
+
+
+'''
+Function Name: localFold(sequence, name='', maxSpan=MAX_SPAN, maxLoop=MAX_LOOP, temperature=T, threshold=0.0)
+Description: Generator that folds a long sequence locally with localFoldDotBrackets() and annotates every locally stable domain
+as a Structure object. The spans of the components of a domain and the positions of its componentArray() are 1-based positions
+in the domain, so a span (a, b) of a domain that starts at base start is (a + start - 1, b + start - 1) in the sequence, and
+componentArray()[k] describes base start + k of the sequence.
+Parameters:
+        (sequence) - str - RNA sequence. Lower case letters are read as upper case and T as U
+        (name='') - str - name of the sequence. Domains are named name:start-stop
+        (maxSpan=MAX_SPAN) - int - maximum number of bases from i to j of a base pair (i, j)
+        (maxLoop=MAX_LOOP) - int - maximum number of unpaired nucleotides in a bulge or internal loop
+        (temperature=T) - float - temperature in Kelvin
+        (threshold=0.0) - float - only domains with an energy below the threshold are reported
+Return Type:
+        generator of (int, Structure object) - 1-based first base of the domain in the sequence and the domain, in order from
+        the 3' end of the sequence
+'''
+def localFold(sequence, name='', maxSpan=MAX_SPAN, maxLoop=MAX_LOOP, temperature=T, threshold=0.0):
+    sequence = sequence.upper().replace('T', 'U')
+    for start, stop, dbn, energy in localFoldDotBrackets(sequence, maxSpan, maxLoop, temperature, threshold):
+        label = f'{name}:{start}-{stop}' if name else f'{start}-{stop}'
+        yield start, Structure.fromDotBracket(sequence[start - 1:stop], dbn, label)
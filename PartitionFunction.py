@@ -0,0 +1,536 @@
+'''
+Filename: PartitionFunction.py
+Author: Michael Hathaway
+
+Description: The PartitionFunction module calculates the McCaskill partition function of an RNA sequence: the ensemble free
+energy and the probability of every base pair over all the secondary structures of the sequence. The energy model is the
+Folding.EnergyModel, so every structure is weighted by exp(-E/RT) with E the energy of Structure.energy(strict=False), the
+same energy model that Folding.fold() minimizes.
+
+The inside recursions follow the maximal stem decomposition of the Folding module. Every structure has exactly one
+decomposition, which is needed to count each structure once:
+
+    ZC(i, j) - bases i..j, where (i, j) is the innermost pair of a stem and closes a hairpin, bulge, internal loop, or multiloop
+    ZP(i, j) - bases i..j, where (i, j) is the outermost pair of a stem of at least 2 pairs
+    ZWM(i, j) - bases i..j as part of a multiloop with at least one branch, where the first branch starts anywhere
+    ZWM2(i, j) - bases i..j as part of a multiloop with at least two branches
+    ZF(j) - the first j bases in the exterior loop
+
+A multiloop closed by (i, j) is ZWM2(i+1, j-1), and both multiloop matrices are built from the first base of the segment:
+it is either unpaired or starts a branch. The outside recursions run over the same terms in reverse, and the probability of a
+base pair is the sum of the probabilities of the stems that contain it.
+
+Every entry of the matrices is scaled by s^-(number of bases it covers), where s is the per base Boltzmann factor of the
+minimum free energy, exp(-MFE / (R*T*L)). The scaling is applied in the exponent of every Boltzmann weight, so the scaled values
+stay close to 1 for long sequences, where the unscaled partition function overflows float64.
+
+Structures are sampled from the Boltzmann ensemble with a stochastic traceback of the inside matrices: every step chooses one of
+the terms of a matrix entry with probability proportional to its weight. The terms of every entry that is visited are kept, so
+drawing many samples does not repeat the work of the first ones.
+
+Usage:
+    pf = PartitionFunction('GGGAAAUCCCGCGAAAGCGC')
+    pf.energy(), pf.probabilities()
+    for structure in pf.sampleStructures(1000): ...
+'''
+
+## Module Imports ##
+import numpy as np
+
+## Energy Imports ##
+from EnergyTables import T, R
+from StructureComponents import MULTILOOP_A, MULTILOOP_BRANCH, MULTILOOP_UNPAIRED
+
+## Folding Imports ##
+from Folding import EnergyModel, _MinimumFreeEnergy, MAX_LOOP
+
+## Structure Import ##
+from Structure import Structure
+
+#component types counted by PartitionFunction.componentFrequencies(), in the order of its columns. The letters are the
+#structure array letters of the StructureAnnotation module
+COMPONENT_TYPES = 'SHBIMXE'
+
+
+'''
+Class: PartitionFunction
+Description: The PartitionFunction object fills the inside and outside matrices of a sequence and provides the ensemble free
+energy and the base pair probability matrix
+
+Member variable -- data type -- description:
+self._model -- EnergyModel -- energy tables of the sequence
+self._kT -- float -- R*T in Kcal/mol
+self._logScale -- float -- natural logarithm of the per base scaling factor s
+self._ZC -- numpy array of float64 -- (L, L) scaled partition function when (i, j) is the innermost pair of a stem
+self._ZP -- numpy array of float64 -- (L, L) scaled partition function when (i, j) is the outermost pair of a stem
+self._ZWM -- numpy array of float64 -- (L+1, L) scaled partition function of i..j inside a multiloop with at least one branch
+self._ZWM2 -- numpy array of float64 -- (L+1, L) scaled partition function of i..j inside a multiloop with at least two branches
+self._ZF -- numpy array of float64 -- (L+1) scaled partition function of the first j bases
+self._unpaired -- float -- scaled weight of one unpaired multiloop base
+self._runs -- numpy array of float64 -- (L, L) scaled weight of the unpaired multiloop bases m+1..j at [m, j], 0 where j < m
+self._probabilities -- numpy array of float64 -- (L, L) base pair probabilities, calculated on first use
+self._decompositions -- dictionary -- (matrix, i, j) : (cumulative weights, terms) of every entry visited by the sampler
+'''
+class PartitionFunction:
+    #__init__() method for the PartitionFunction object
+    def __init__(self, sequence, maxLoop=MAX_LOOP, temperature=T):
+        self._model = EnergyModel(sequence, maxLoop, temperature)
+        length = len(self._model)
+        self._kT = R * temperature
+        mfe = _MinimumFreeEnergy(self._model).energy() if length else 0.0
+        self._logScale = -mfe / (self._kT * length) if length else 0.0
+
+        self._ZC = np.zeros((length, length))
+        self._ZP = np.zeros((length, length))
+        self._ZWM = np.zeros((length + 1, length))
+        self._ZWM2 = np.zeros((length + 1, length))
+        self._ZF = np.zeros(length + 1)
+        self._unpaired, self._runs = self._unpairedWeights() #used by the inside and outside fills and by the sampler
+        self._probabilities = None
+        self._decompositions = {}
+        self._fillInside()
+
+    #define len function for the PartitionFunction object
+    def __len__(self):
+        return len(self._model)
+
+
+    '''
+    Function Name: _weight(energies, bases=0)
+    Description: Internal method that converts free energies into scaled Boltzmann weights. The scaling is applied in the
+    exponent, so long stems do not overflow before they are scaled. Infinite energies have weight 0
+    Parameters:
+            (energies) - numpy array of float64 - free energies in Kcal/mol
+            (bases=0) - int or numpy array of int - number of bases covered by each weight
+    Return Type:
+            numpy array of float64
+    '''
+    def _weight(self, energies, bases=0):
+        return np.exp(-np.asarray(energies) / self._kT - np.asarray(bases) * self._logScale)
+
+
+    '''
+    Function Name: _unpairedWeights()
+    Description: Internal method that returns the scaled weights of runs of unpaired multiloop bases
+    Parameters: None
+    Return Type:
+            (float, numpy array of float64) - weight of one unpaired base, and an (L, L) matrix with the weight of the unpaired
+            bases m+1..j at [m, j], 0 where j < m
+    '''
+    def _unpairedWeights(self):
+        length = len(self._model)
+        unpaired = float(self._weight(MULTILOOP_UNPAIRED, 1))
+        runs = np.arange(length)[None, :] - np.arange(length)[:, None]
+        return unpaired, np.where(runs >= 0, unpaired ** np.maximum(runs, 0), 0.0)
+
+
+    '''
+    Function Name: _branchWeights(i)
+    Description: Internal method that returns the scaled weights of the multiloop branches that start at base i: the stem, the
+    branch penalty, and the terminal penalty of the outer pair of the stem
+    Parameters:
+            (i) - int - 0-based index
+    Return Type:
+            (numpy array of float64, numpy array of float64) - weight of the branch (i, j) for every j, and the weight of the
+            branch and terminal penalties alone
+    '''
+    def _branchWeights(self, i):
+        penalties = self._weight(MULTILOOP_BRANCH + self._model._penalty[i])
+        return self._ZP[i] * penalties, penalties
+
+
+    '''
+    Function Name: _closingWeights(i, js)
+    Description: Internal method that returns the scaled weights of the multiloop initiation, closing branch, and closing pair
+    penalty of the multiloops closed by (i, j), including the scaling of the two closing bases
+    Parameters:
+            (i) - int - 0-based index of the 5' base of the closing pairs
+            (js) - numpy array of int - 0-based indices of the 3' bases of the closing pairs
+    Return Type:
+            numpy array of float64
+    '''
+    def _closingWeights(self, i, js):
+        return self._weight(MULTILOOP_A + MULTILOOP_BRANCH + self._model._penalty[i, js], 2)
+
+
+    '''
+    Function Name: _fillInside()
+    Description: Internal method that fills the inside matrices one row at a time from the 3' end, so every row only uses rows below it
+    Parameters: None
+    Return Type: None
+    '''
+    def _fillInside(self):
+        model = self._model
+        length = len(model)
+        unpaired, runs = self._unpaired, self._runs
+        hasStem = np.zeros((length, length), dtype=bool)
+
+        for i in range(length - 1, -1, -1):
+            js = np.flatnonzero(model._canPair[i])
+            if len(js):
+                #hairpins
+                C = self._weight(model._hairpin[i, js], js - i + 1)
+
+                #bulges and internal loops closed by (i, j), with a stem starting at the inner pair
+                rows, k, l, energies = model.interiorLoops(i, js, hasStem)
+                if len(rows):
+                    loops = self._weight(energies, (k - i) + (js[rows] - l)) * self._ZP[k, l]
+                    C += np.bincount(rows, weights=loops, minlength=len(js))
+
+                #multiloops closed by (i, j)
+                C += self._closingWeights(i, js) * self._ZWM2[i + 1, js - 1]
+                self._ZC[i, js] = C
+
+                #stems whose outermost pair is (i, j)
+                for n, ends, energies in model.stems(i):
+                    self._ZP[i, ends] += self._weight(energies, 2 * (n - 1)) * self._ZC[i + n - 1, ends - n + 1]
+                hasStem[i] = self._ZP[i] > 0
+
+            #multiloop segments starting at i: i is unpaired, or a branch (i, m) is followed by unpaired bases or more branches
+            branches, _ = self._branchWeights(i)
+            ms = np.flatnonzero(branches)
+            self._ZWM[i] = self._ZWM[i + 1] * unpaired
+            self._ZWM2[i] = self._ZWM2[i + 1] * unpaired
+            if len(ms):
+                self._ZWM[i] += branches[ms] @ (runs[ms] + self._ZWM[ms + 1])
+                self._ZWM2[i] += branches[ms] @ self._ZWM[ms + 1]
+
+        #exterior loop
+        self._ZF[0] = 1.0
+        exterior = self._weight(model._penalty)
+        unpairedExterior = float(self._weight(0.0, 1))
+        for j in range(1, length + 1):
+            ks = np.arange(j - 1)
+            self._ZF[j] = self._ZF[j - 1] * unpairedExterior + self._ZF[ks] @ (self._ZP[ks, j - 1] * exterior[ks, j - 1])
+
+
+    '''
+    Function Name: _fillOutside()
+    Description: Internal method that runs the inside recursions in reverse, from the exterior loop inwards, and sums the
+    probabilities of the stems that contain every base pair
+    Parameters: None
+    Return Type:
+            numpy array of float64 - (L, L) base pair probabilities for i < j
+    '''
+    def _fillOutside(self):
+        model = self._model
+        length = len(model)
+        unpaired, runs = self._unpaired, self._runs
+        hasStem = self._ZP > 0
+        outsideC = np.zeros((length, length))
+        outsideP = np.zeros((length, length))
+        outsideWM = np.zeros((length + 1, length))
+        outsideWM2 = np.zeros((length + 1, length))
+        outsideF = np.zeros(length + 1)
+        probabilities = np.zeros((length, length))
+
+        #exterior loop
+        outsideF[length] = 1.0
+        exterior = self._weight(model._penalty)
+        unpairedExterior = float(self._weight(0.0, 1))
+        for j in range(length, 0, -1):
+            ks = np.arange(j - 1)
+            outsideF[j - 1] += outsideF[j] * unpairedExterior
+            outsideF[ks] += outsideF[j] * self._ZP[ks, j - 1] * exterior[ks, j - 1]
+            outsideP[ks, j - 1] += outsideF[j] * self._ZF[ks] * exterior[ks, j - 1]
+
+        #every row only passes weight to rows below it, and row i is complete once the rows above it are done
+        for i in range(length):
+            js = np.flatnonzero(outsideC[i] > 0)
+            if len(js):
+                #bulges and internal loops closed by (i, j)
+                rows, k, l, energies = model.interiorLoops(i, js, hasStem)
+                if len(rows):
+                    loops = self._weight(energies, (k - i) + (js[rows] - l)) * outsideC[i, js[rows]]
+                    np.add.at(outsideP, (k, l), loops)
+
+                #multiloops closed by (i, j)
+                outsideWM2[i + 1, js - 1] += outsideC[i, js] * self._closingWeights(i, js)
+
+            #multiloop segments starting at i
+            outsideWM[i + 1] += outsideWM[i] * unpaired
+            outsideWM2[i + 1] += outsideWM2[i] * unpaired
+            branches, penalties = self._branchWeights(i)
+            ms = np.flatnonzero(branches)
+            if len(ms):
+                outsideBranches = (runs[ms] + self._ZWM[ms + 1]) @ outsideWM[i] + self._ZWM[ms + 1] @ outsideWM2[i]
+                outsideWM[ms + 1] += branches[ms, None] * (outsideWM[i] + outsideWM2[i])[None, :]
+                outsideP[i, ms] += outsideBranches * penalties[ms]
+
+            #stems whose outermost pair is (i, j), and the base pairs in them
+            if outsideP[i].any():
+                for n, ends, energies in model.stems(i):
+                    stem = outsideP[i, ends] * self._weight(energies, 2 * (n - 1))
+                    outsideC[i + n - 1, ends - n + 1] += stem
+                    stem = stem * self._ZC[i + n - 1, ends - n + 1]
+                    for t in range(n):
+                        probabilities[i + t, ends - t] += stem
+
+        return probabilities / self._ZF[length]
+
+
+    '''
+    Function Name: sequence()
+    Description: Function returns the sequence used by the partition function
+    Parameters: None
+    Return Type:
+            str
+    '''
+    def sequence(self):
+        return self._model.sequence()
+
+
+    '''
+    Function Name: partitionFunction()
+    Description: Function returns the natural logarithm of the partition function. The partition function itself overflows
+    float64 for long sequences
+    Parameters: None
+    Return Type:
+            float
+    '''
+    def partitionFunction(self):
+        length = len(self._model)
+        return float(np.log(self._ZF[length]) + length * self._logScale)
+
+
+    '''
+    Function Name: energy()
+    Description: Function returns the ensemble free energy, -RT ln(Z)
+    Parameters: None
+    Return Type:
+            float - ensemble free energy in Kcal/mol
+    '''
+    def energy(self):
+        return -self._kT * self.partitionFunction()
+
+
+    '''
+    Function Name: probabilities()
+    Description: Function returns the base pair probability matrix. The outside matrices are filled on the first call
+    Parameters: None
+    Return Type:
+            numpy array of float64 - symmetric (L, L) matrix with the probability that bases i and j(0-based) pair
+    '''
+    def probabilities(self):
+        if self._probabilities is None:
+            upper = self._fillOutside()
+            self._probabilities = upper + upper.T
+        return self._probabilities
+
+
+
+    '''
+    Function Name: _decompose(matrix, i, j)
+    Description: Internal method that lists the terms of an entry of the inside matrices with their weights. The terms are
+    (matrix, i, j) entries to trace back next and (type code, start, stop) runs of bases that belong to a loop. Runs of stem
+    bases also carry their dot-bracket character
+    Parameters:
+            (matrix) - str - 'F', 'P', 'C', 'WM', or 'WM2'
+            (i) - int - 0-based index of the first base of the entry. Not used for 'F'
+            (j) - int - 0-based index of the last base of the entry, or the number of bases for 'F'
+    Return Type:
+            (numpy array of float64, list) - cumulative weights of the terms, and the list of the entries and runs of each term
+    '''
+    def _decompose(self, matrix, i, j):
+        key = (matrix, i, j)
+        if key in self._decompositions:
+            return self._decompositions[key]
+
+        model = self._model
+        weights, terms = [], []
+        if matrix == 'F':
+            weights.append(self._ZF[j - 1] * float(self._weight(0.0, 1)))
+            terms.append([('F', 0, j - 1)])
+            ks = np.flatnonzero(self._ZP[:max(j - 1, 0), j - 1])
+            weights.extend(self._ZF[ks] * self._ZP[ks, j - 1] * self._weight(model._penalty[ks, j - 1]))
+            terms.extend([('F', 0, int(k)), ('P', int(k), j - 1)] for k in ks)
+
+        elif matrix == 'P':
+            for n, ends, energies in model.stems(i):
+                position = np.searchsorted(ends, j)
+                if position < len(ends) and ends[position] == j:
+                    weights.append(self._weight(energies[position], 2 * (n - 1)) * self._ZC[i + n - 1, j - n + 1])
+                    terms.append([(0, i, i + n - 1, '('), (0, j - n + 1, j, ')'), ('C', i + n - 1, j - n + 1)])
+
+        elif matrix == 'C':
+            weights.append(self._weight(model._hairpin[i, j], j - i + 1))
+            terms.append([(1, i + 1, j - 1)])
+            rows, k, l, energies = model.interiorLoops(i, np.array([j]), self._ZP > 0)
+            weights.extend(self._weight(energies, (k - i) + (j - l)) * self._ZP[k, l])
+            for k, l in zip(k.tolist(), l.tolist()):
+                code = 2 if k == i + 1 or l == j - 1 else 3
+                terms.append([(code, i + 1, k - 1), (code, l + 1, j - 1), ('P', k, l)])
+            weights.append(self._closingWeights(i, np.array([j]))[0] * self._ZWM2[i + 1, j - 1])
+            terms.append([('WM2', i + 1, j - 1)])
+
+        else:
+            unpaired, runs = self._unpaired, self._runs
+            inner = self._ZWM2 if matrix == 'WM2' else self._ZWM
+            weights.append(inner[i + 1, j] * unpaired)
+            terms.append([(4, i, i), (matrix, i + 1, j)])
+            branches, _ = self._branchWeights(i)
+            ms = np.flatnonzero(branches[:j + 1])
+            if matrix == 'WM':
+                weights.extend(branches[ms] * runs[ms, j])
+                terms.extend([('P', i, int(m)), (4, int(m) + 1, j)] for m in ms)
+            weights.extend(branches[ms] * self._ZWM[ms + 1, j])
+            terms.extend([('P', i, int(m)), ('WM', int(m) + 1, j)] for m in ms)
+
+        decomposition = (np.cumsum(np.asarray(weights, dtype=np.float64)), terms)
+        self._decompositions[key] = decomposition
+        return decomposition
+
+
+    '''
+    Function Name: _sample(random)
+    Description: Internal method that draws one structure from the ensemble with a stochastic traceback
+    Parameters:
+            (random) - numpy Generator - random number generator
+    Return Type:
+            (list of str, numpy array of int8) - dot-bracket characters, and the index in COMPONENT_TYPES of the component type
+            of every base
+    '''
+    def _sample(self, random):
+        length = len(self._model)
+        dbn = ['.'] * length
+        types = np.full(length, -1, dtype=np.int8)
+        exteriorPairs = []
+        tasks = [('F', 0, length)]
+
+        while tasks:
+            matrix, i, j = tasks.pop()
+            if matrix == 'F' and j == 0:
+                continue
+            cumulative, terms = self._decompose(matrix, i, j)
+            term = terms[min(int(np.searchsorted(cumulative, random.random() * cumulative[-1], side='right')), len(terms) - 1)]
+            for part in term:
+                if isinstance(part[0], str):
+                    tasks.append(part)
+                    if matrix == 'F' and part[0] == 'P':
+                        exteriorPairs.append(part[1:])
+                else:
+                    code, start, stop = part[:3]
+                    types[start:stop + 1] = code
+                    if len(part) == 4:
+                        dbn[start:stop + 1] = part[3] * (stop - start + 1)
+
+        #unpaired exterior bases are ends before the first and after the last stem, and external loops between stems
+        unassigned = types < 0
+        if exteriorPairs:
+            positions = np.arange(length)
+            first = min(k for k, l in exteriorPairs)
+            last = max(l for k, l in exteriorPairs)
+            types[unassigned & (positions > first) & (positions < last)] = COMPONENT_TYPES.index('X')
+            unassigned = types < 0
+        types[unassigned] = COMPONENT_TYPES.index('E')
+        return dbn, types
+
+
+    '''
+    Function Name: sampleDotBrackets(n, seed=None)
+    Description: Function draws structures from the Boltzmann ensemble of the sequence
+    Parameters:
+            (n) - int - number of structures
+            (seed=None) - int or numpy Generator - seed of the random number generator
+    Return Type:
+            list of str - dot-bracket strings of the sampled structures
+    '''
+    def sampleDotBrackets(self, n, seed=None):
+        random = np.random.default_rng(seed)
+        return [''.join(self._sample(random)[0]) for _ in range(n)]
+
+
+    '''
+    Function Name: sampleStructures(n, name='', seed=None)
+    Description: Generator that draws structures from the Boltzmann ensemble and annotates each of them as a Structure object
+    with Structure.fromDotBracket()
+    Parameters:
+            (n) - int - number of structures
+            (name='') - str - name of the structures. Samples are named name:1, name:2, ...
+            (seed=None) - int or numpy Generator - seed of the random number generator
+    Return Type:
+            generator of Structure objects
+    '''
+    def sampleStructures(self, n, name='', seed=None):
+        random = np.random.default_rng(seed)
+        for sample in range(1, n + 1):
+            yield Structure.fromDotBracket(self._model.sequence(), ''.join(self._sample(random)[0]), f'{name}:{sample}' if name else str(sample))
+
+
+    '''
+    Function Name: componentFrequencies(n, seed=None)
+    Description: Function draws structures from the Boltzmann ensemble and counts the component type of every base, without
+    annotating the structures
+    Parameters:
+            (n) - int - number of structures
+            (seed=None) - int or numpy Generator - seed of the random number generator
+    Return Type:
+            numpy array of float64 - (L, len(COMPONENT_TYPES)) fraction of the samples in which each base is part of a stem,
+            hairpin, bulge, internal loop, multiloop, external loop, or end, in the order of COMPONENT_TYPES
+    '''
+    def componentFrequencies(self, n, seed=None):
+        random = np.random.default_rng(seed)
+        length = len(self._model)
+        counts = np.zeros((length, len(COMPONENT_TYPES)), dtype=np.int64)
+        positions = np.arange(length)
+        for _ in range(n):
+            counts[positions, self._sample(random)[1]] += 1
+        return counts / max(n, 1)
+
+
+    '''
+    Function Name: structureProbability(dbn)
+    Description: Function returns the probability of a structure in the ensemble
+    Parameters:
+            (dbn) - str - dot-bracket string of the structure
+    Return Type:
+            float - exp(-(E - G)/RT), where E is Structure.energy(strict=False) of the structure and G the ensemble free
+            energy. None if the dot-bracket is not valid
+    '''
+    def structureProbability(self, dbn):
+        structure = Structure.fromDotBracket(self._model.sequence(), dbn)
+        if structure is None:
+            return None
+        energy = structure.energy(strict=False, temperature=self._model._temperature)
+        return float(np.exp(-(energy - self.energy()) / self._kT))
+
+
+'''
+Function Name: partitionFunction(sequence, maxLoop=MAX_LOOP, temperature=T)
+Description: Function calculates the ensemble free energy and the base pair probability matrix of a sequence
+Parameters:
+        (sequence) - str - RNA sequence. Lower case letters are read as upper case and T as U
+        (maxLoop=MAX_LOOP) - int - maximum number of unpaired nucleotides in a bulge or internal loop
+        (temperature=T) - float - temperature in Kelvin
+Return Type:
+        (float, numpy array of float64) - ensemble free energy in Kcal/mol and the symmetric (L, L) base pair probability matrix
+'''
+def partitionFunction(sequence, maxLoop=MAX_LOOP, temperature=T):
+    pf = PartitionFunction(sequence, maxLoop, temperature)
+    return pf.energy(), pf.probabilities()
+
+
+'''
+Function Name: stemPairProbabilities(structure, probabilities=None, maxLoop=MAX_LOOP, temperature=T)
+Description: Function annotates the stems of a Structure with the probability of each of their base pairs in the ensemble of
+the structure's sequence
+Parameters:
+        (structure) - Structure object
+        (probabilities=None) - numpy array of float64 - (L, L) base pair probability matrix. Calculated from the sequence of the
+        structure by default
+        (maxLoop=MAX_LOOP) - int - maximum number of unpaired nucleotides in a bulge or internal loop
+        (temperature=T) - float - temperature in Kelvin
+Return Type:
+        dictionary - stem label : numpy array of float64 with the probability of every pair of the stem, from the outermost
+        pair to the innermost pair
+'''
+def stemPairProbabilities(structure, probabilities=None, maxLoop=MAX_LOOP, temperature=T):
+    if probabilities is None:
+        probabilities = PartitionFunction(structure.sequence(), maxLoop, temperature).probabilities()
+    stems = {}
+    for stem in structure.stems():
+        start5p = stem.sequence5pSpan()[0] - 1
+        stop3p = stem.sequence3pSpan()[1] - 1
+        offsets = np.arange(len(stem))
+        stems[stem.label()] = probabilities[start5p + offsets, stop3p - offsets]
+    return stems
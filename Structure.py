@@ -10,11 +10,23 @@ RNA structure type files in the python programming language.
 ## Module Imports ##
 import numpy as np
 import sys
-import re
+
+## Energy Table Imports ##
+from EnergyTables import T, parameterSetId #default temperature for energy calculations and the current parameter set
 
 ## Structure Type Component Imports ##
 from StructureComponents import Stem, Hairpin, Bulge, InternalLoop, ExternalLoop, MultiLoop, PseudoKnot, End, NCBP
 
+## Binary Cache Imports ##
+from StructureBinary import BinaryCorpus, writeBinaryCorpus
+from ComponentStore import ComponentStore, LazyComponentDict, COMPONENT_CLASSES
+
+## Dot-Bracket Annotation Imports ##
+from StructureAnnotation import annotateDotBracket, structureFingerprint
+
+## Structure Type Tokenizer Imports ##
+from StructureTokenizer import tokenizeStem, tokenizeHairpin, tokenizeBulge, tokenizeInternalLoop, tokenizeMultiLoop, tokenizeExternalLoop, tokenizeNCBP, tokenizeEnd
+
 '''
 ## About the structure object ##
 The Structure object is a python object-oriented representation of the information contained within an RNA Structure Type file.
@@ -23,7 +35,7 @@ functionality for calculating the energy associated with certain RNA secondary s
 '''
 class Structure:
     #__init__() method for the Structure object
-    def __init__(self, filename=None):
+    def __init__(self, filename=None, lazy=False):
         #RNA Molecule basic info
         #all values are stored as strings
         self._name = None
@@ -58,16 +70,41 @@ class Structure:
 
         '''
         Component Array
-        The component array is a numpy array of the same length as the molecule where each index
-        contains the label for the secondary structure tha that index is a part of.
-        the component array is initialized as None. When the length of the molecule is
+        The component array is an int32 numpy array of the same length as the molecule where each index
+        contains the id of the secondary structure that index is a part of. Indices that are not part of
+        any secondary structure contain -1. The label table maps ids to labels(_componentLabels) and labels
+        to ids(_componentIds). The component array is initialized as None. When the length of the molecule is
         parsed from the .st file, a numpy array of that length is generated
         '''
         self._componentArray = None
+        self._componentLabels = []
+        self._componentIds = {}
+
+        '''
+        Adjacency Index
+        The adjacency index maps the label of every component in the component array to the labels of its
+        5' and 3' neighbors. It is built once when the Structure is loaded and is used by neighbors().
+        '''
+        self._adjacency = {}
+
+        '''
+        Component Store
+        When the components are kept in a ComponentStore(see compactComponents()), the component dictionaries above are
+        LazyComponentDict objects that create each StructureComponent object from the store the first time it is accessed.
+        '''
+        self._componentStore = None
+
+        #feature lines of a lazily loaded structure that have not been parsed yet. See _deferFeatures()
+        self._lazyFeatures = None
+
+        #cached list of the StructureComponents that contribute to the free energy. Built on the first call to energy()
+        self._energyComponents = None
+        self._energyIndex = {} #id(component) : position in the energy component list
+        self._energyTotals = {} #(strict, temperature, parameter set id) : [component energies, total energy, set of changed positions]
 
         #load data from file if file is specified by user
         if filename != None:
-            self._loadFile(filename)
+            self._loadFile(filename, lazy)
 
 
     #define string representation of the molecule
@@ -78,6 +115,14 @@ class Structure:
     def __len__(self):
         return self._length
 
+    #the component array, label table, and adjacency index of a lazily loaded structure are not set until its feature lines
+    #are parsed. Looking one of them up parses the feature lines first. See _deferFeatures()
+    def __getattr__(self, name):
+        if name in Structure._DEFERRED_ATTRIBUTES and self.__dict__.get('_lazyFeatures') is not None:
+            self._parseDeferredFeatures()
+            return getattr(self, name)
+        raise AttributeError(f"'Structure' object has no attribute '{name}'")
+
 
 ####################################################
 ###### Load File and Associated Functions ##########
@@ -103,45 +148,92 @@ class Structure:
         self._structureArray = None
         self._varna = None
 
-        #reset all StructureComponent dictionaries
-        self._stems.clear()
-        self._hairpins.clear()
-        self._bulges.clear()
-        self._internalLoops.clear()
-        self._multiLoops.clear()
-        self._externalLoops.clear()
-        self._pk.clear()
-        self._ncbp.clear()
-        self._ends.clear()
-
-        #reset component array
+        #reset all StructureComponent dictionaries. New dictionaries replace the LazyComponentDicts of a compact Structure
+        self._stems = {}
+        self._hairpins = {}
+        self._bulges = {}
+        self._internalLoops = {}
+        self._multiLoops = {}
+        self._externalLoops = {}
+        self._pk = {}
+        self._ncbp = {}
+        self._ends = {}
+
+        #reset component array, label table, adjacency index, and component store
         self._componentArray = None
+        self._componentLabels = []
+        self._componentIds = {}
+        self._adjacency = {}
+        self._componentStore = None
+        self._lazyFeatures = None
+
+        #reset cached energy components
+        self._resetEnergyCache()
 
 
     '''
-    Function Name: loadFile(filename)
+    Function Name: loadFile(filename, lazy=False)
     Description: user accessible function that can be used to load data from a structure type file into
     the Structureobject if no file is provided at object instantiation.
     Parameters:
             (filename) - str - name of the structure type file to be loaded into the object
+            (lazy=False) - bool - when true, only the header and structural representation lines are parsed. The feature lines
+                           are indexed by type and byte offset and parsed the first time a component is accessed. See _deferFeatures()
     Return Type:
             None
     '''
-    def loadFile(self, filename):
-        self._loadFile(filename)
+    def loadFile(self, filename, lazy=False):
+        self._loadFile(filename, lazy)
+
+
+    '''
+    Function Name: loadDotBracket(sequence, dbn, name='')
+    Description: Function annotates the structural components of a molecule from its sequence and dot-bracket string and loads
+    them into the Structureobject, using the labels and spans that bpRNA writes to structure type files. See the StructureAnnotation module
+    Parameters:
+            (sequence) - str - sequence of the molecule
+            (dbn) - str - dot-bracket string of the molecule
+            (name='') - str - name of the molecule
+    Return Type:
+            bool - True if the structure was loaded, False if the dot-bracket is not valid
+    '''
+    def loadDotBracket(self, sequence, dbn, name=''):
+        annotation = annotateDotBracket(sequence, dbn, name)
+        if annotation is None:
+            self._resetStructure()
+            return False
+        self._deserialize(annotation)
+        return True
 
 
     '''
-    Function Name: _loadFile(filename)
+    Function Name: fromDotBracket(sequence, dbn, name='')
+    Description: Function creates a Structure object from a sequence and dot-bracket string. See loadDotBracket()
+    Parameters:
+            (sequence) - str - sequence of the molecule
+            (dbn) - str - dot-bracket string of the molecule
+            (name='') - str - name of the molecule
+    Return Type:
+            Structure object, or None if the dot-bracket is not valid
+    '''
+    @classmethod
+    def fromDotBracket(cls, sequence, dbn, name=''):
+        structure = cls()
+        return structure if structure.loadDotBracket(sequence, dbn, name) else None
+
+
+    '''
+    Function Name: _loadFile(filename, lazy=False)
     Description: Internal method to parse the data in an RNA structure tyoe file into a Structureobject
     Parameters:
             (filename) - str, name of the file to be parsed
+            (lazy=False) - bool - when true, parsing of the feature lines is deferred. See loadFile()
     Return Type:
             Structure object
 
     #Note: At this point, the data for segments and pseudoknots is not parsed from the .st file. Multiloop data is parsed, but the multiloop object is incomplete.
     '''
-    def _loadFile(self, filename):
+    def _loadFile(self, filename, lazy=False):
 
         # check that file is valid structure type
         if filename[-3::] != '.st':
@@ -150,7 +242,7 @@ class Structure:
 
         #try to open the provided file + error handling
         try:
-            f = open(filename, 'r')
+            f = open(filename, 'rb' if lazy else 'r') #lazy loading reads bytes to record the offsets of the feature lines
         except OSError: #error finding or opening file
             print('An error ocurred when trying to access the file. Check to make sure that the file exists and that the correct filepath was provided.')
             return
@@ -158,15 +250,93 @@ class Structure:
             print('Something unexpected ocurred when accessing the file')
             return
 
+        if lazy:
+            self._loadFileLazy(f, filename) #parse the header and index the feature lines
+        else:
+            self._loadLines(f, filename) #parse the file contents into the Structure object
+        f.close() #close the file
+
+
+    '''
+    Function Name: _loadLines(lines, source=None, lazy=False)
+    Description: Internal method to parse the lines of a single structure type record into the Structure object. Used by
+    _loadFile() and by the StructureCorpus module to load records that are streamed from multi-record files and archives.
+    Parameters:
+            (lines) - iterable of str - lines of a single structure type record
+            (source=None) - str - name of the file or archive member the lines came from. Used for error messages
+            (lazy=False) - bool - when true, the feature lines are kept and only parsed when a component is accessed
+    Return Type:
+            bool - True if the record was parsed, False if the record was not proper .st format
+    '''
+    def _loadLines(self, lines, source=None, lazy=False):
+        lines = iter(lines)
+        if not self._parseHeaderLines(lines):
+            print(f'File: {source} is not proper .st format')
+            self._resetStructure() #reset the Structure object
+            return False
+
+        #when all identifying data has been parsed, parse the StructureComponents from the remaining lines
+        features = [line.rstrip('\r\n') for line in lines]
+        features = [line for line in features if line] #drop blank lines
+        if lazy:
+            self._deferFeatures(self._indexFeatureLines(enumerate(features)), features)
+        else:
+            self._parseFeatureLines(features)
+        return True
+
+
+    '''
+    Function Name: _loadFileLazy(f, filename)
+    Description: Internal method that parses the header and structural representation lines of a structure type file and
+    indexes its feature lines by type and byte offset without parsing them
+    Parameters:
+            (f) - file object - structure type file opened in binary mode
+            (filename) - str - name of the file. The file is opened again to parse the feature lines when they are needed
+    Return Type:
+            bool - True if the header was parsed, False if the file is not proper .st format
+    '''
+    def _loadFileLazy(self, f, filename):
+        position = 0 #byte offset of the next line
+        offsets = [] #byte offset of every line read so far
+
+        def decodedLines():
+            nonlocal position
+            for line in f:
+                offsets.append(position)
+                position += len(line)
+                yield line.decode('utf-8')
+
+        lines = decodedLines()
+        if not self._parseHeaderLines(lines):
+            print(f'File: {filename} is not proper .st format')
+            self._resetStructure() #reset the Structure object
+            return False
 
+        featureStart = position
+        index = self._indexFeatureLines((offsets[-1], line.rstrip('\r\n')) for line in lines)
+        self._deferFeatures(index, (filename, featureStart))
+        return True
+
+
+    '''
+    Function Name: _parseHeaderLines(lines)
+    Description: Internal method that parses the header lines(name, length, and page number) and the four structural
+    representation lines of a record. Lines are read from the iterator up to and including the VARNA line, so the
+    iterator is left at the first feature line.
+    Parameters:
+            (lines) - iterator of str - lines of a single structure type record
+    Return Type:
+            bool - True if all of the lines were found
+    '''
+    def _parseHeaderLines(self, lines):
         #Variables to validate all features have been read
         sequenceRead = False
         dotBracketRead = False
         structureArrayRead = False
         varnaRead = False
 
-        #iterate through all of the lines in the file
-        for line in f:
+        #iterate through the header and structural representation lines of the record
+        for line in lines:
 
             if line[0] == '#':
                 #get name of RNA molecule
@@ -176,7 +346,7 @@ class Structure:
                 #get length of the RNA sequence
                 elif line[0:8] == '#Length:':
                     self._length = int(line[8:].strip().strip(','))
-                    self._componentArray = np.empty(self._length, dtype=object)
+                    self._componentArray = np.full(self._length, -1, dtype=np.int32)
 
                 #get page number for molecule
                 elif line[0:12] == '#PageNumber:':
@@ -204,42 +374,46 @@ class Structure:
             elif (varnaRead == False):
                     self._varna = line.strip() #drop the newline characters
                     varnaRead = True
+                    break
 
-                    if (sequenceRead and dotBracketRead and structureArrayRead and varnaRead):
-                        #when all identifying data has been parsed, parse the StructureComponents
-                        features = f.read() #read the rest of the file into features variable
-                        break
-                    else:
-                        print(f'File: {filename} is not proper .st format')
-                        self._resetStructure() #reset the Structure object
+        return (sequenceRead and dotBracketRead and structureArrayRead and varnaRead) and self._componentArray is not None
 
 
-        features = features.split('\n')[:-1] #split rest of file contents into a list of strings and drop last line(empty string)
+    '''
+    Function Name: _parseFeatureLines(features)
+    Description: Internal method that parses the feature lines of a record into StructureComponent objects, and adds the
+    neighbor information once every component is in the component array
+    Parameters:
+            (features) - list of str - non-blank feature lines of the record without line endings
+    Return Type:
+            None
+    '''
+    def _parseFeatureLines(self, features):
         i = 0 #while loop allows for indexing multiple file lines ahead of current. Used for Multiloops and Internal Loops that have multiple components
         while i < (len(features)): #iterate through the individual string
 
             ##stems##
             if features[i][0] == 'S' and features[i][1].isdigit():
-                self._parseStemData(features[i].strip().split(' '))
+                self._parseStemData(features[i])
 
             ##Hairpins##
             elif features[i][0] == 'H':
-                self._parseHairpinData(features[i].split(' '))
+                self._parseHairpinData(features[i])
 
             ##Bulges##
             elif features[i][0] == 'B':
-                self._parseBulgeData(features[i].split(' '))
+                self._parseBulgeData(features[i])
 
             ##Inner Loops##
-            elif features[i][0] == 'I' and re.search('I\d{1,3}.1', features[i]):
-                self._parseInternalLoopData(features[i].split(' '), features[i+1].split(' ')) #pass both inner loop components
+            elif features[i][0] == 'I' and features[i].split(' ', 1)[0].endswith('.1'):
+                self._parseInternalLoopData(features[i], features[i+1]) #pass both inner loop components
 
             ##MultiLoops##
             elif features[i][0] == 'M':
                 parentLabel = self._getMultiloopParentLabel(features[i]) #get parent label of the multiloop
                 subcomponents = [] #array to temporarily store multiloop subcomponents
-                while self._getMultiloopParentLabel(features[i]) == parentLabel: #linear probe for other multiloop subcomponents
-                    subcomponents.append(features[i].split(' ')) #append each subcomponent to the subcomponents list
+                while i < len(features) and self._getMultiloopParentLabel(features[i]) == parentLabel: #linear probe for other multiloop subcomponents
+                    subcomponents.append(features[i]) #append each subcomponent to the subcomponents list
                     i += 1
 
                 self._parseMultiLoopData(subcomponents) #parse the entire multiloop subcomponent list
@@ -247,15 +421,15 @@ class Structure:
 
             ##external loops##
             elif features[i][0] == 'X':
-                self._parseExternalLoopData(features[i].split(' '))
+                self._parseExternalLoopData(features[i])
 
             ##NCBP##
             elif features[i][0:4] == 'NCBP':
-                self._parseNCBPData(features[i].split(' '))
+                self._parseNCBPData(features[i])
 
             ##Ends##
             elif features[i][0] == 'E':
-                self._parseEndData(features[i].strip().split(' '))
+                self._parseEndData(features[i])
 
             i += 1 #increment counter
 
@@ -264,7 +438,110 @@ class Structure:
         #add stem neighboring bulge boolean controls
         self._addStemBulgeNeighborBooleans()
 
-        f.close() #close the file
+
+    '''
+    Function Name: _featureTable(line)
+    Description: Internal method that returns the component dictionary that a feature line is parsed into, using the same
+    checks as _parseFeatureLines()
+    Parameters:
+            (line) - str - feature line
+    Return Type:
+            str - ComponentStore table name, or None for lines that are not parsed into a component(for example segments or
+            the second line of an internal loop)
+    '''
+    def _featureTable(self, line):
+        if line[0] == 'S' and line[1:2].isdigit():
+            return 'stems'
+        elif line[0] == 'H':
+            return 'hairpins'
+        elif line[0] == 'B':
+            return 'bulges'
+        elif line[0] == 'I':
+            return 'internalLoops' if line.split(' ', 1)[0].endswith('.1') else None
+        elif line[0] == 'M':
+            return 'multiLoops'
+        elif line[0] == 'X':
+            return 'externalLoops'
+        elif line[0:4] == 'NCBP':
+            return 'ncbps'
+        elif line[0] == 'E':
+            return 'ends'
+        return None
+
+
+    '''
+    Function Name: _indexFeatureLines(lines)
+    Description: Internal method that indexes feature lines by component type without parsing them
+    Parameters:
+            (lines) - iterable of (int, str) tuples - (offset, line) for every feature line. Blank lines are skipped
+    Return Type:
+            dict - ComponentStore table name : {component label : offset of its first line}
+    '''
+    def _indexFeatureLines(self, lines):
+        index = {table: {} for table in self._STORE_DICTIONARIES}
+        for offset, line in lines:
+            table = self._featureTable(line) if line else None
+            if table is not None:
+                label = line.split(' ', 1)[0]
+                if table in ('internalLoops', 'multiLoops'):
+                    label = label.partition('.')[0] #parent label of the internal loop or multiloop
+                index[table].setdefault(label, offset)
+        return index
+
+
+    '''
+    Function Name: _deferFeatures(index, source)
+    Description: Internal method used by lazy loading. The component dictionaries are replaced by LazyComponentDicts that know
+    the labels in the feature index, so the numbers and labels of the components are available without parsing. The component
+    array, label table, and adjacency index are removed until the feature lines are parsed. The first access to a component or
+    to one of the removed attributes parses every feature line, because the neighbors of each component depend on the spans of
+    all of the others.
+    Parameters:
+            (index) - dict - result of _indexFeatureLines()
+            (source) - list of str or (str, int) tuple - the feature lines, or the file name and byte offset of the first feature line
+    Return Type:
+            None
+    '''
+    def _deferFeatures(self, index, source):
+        self._lazyFeatures = source
+        for table, attribute in self._STORE_DICTIONARIES.items():
+            setattr(self, attribute, LazyComponentDict(index[table], lambda label, attribute=attribute: self._parseDeferredFeatures(attribute, label)))
+        for attribute in self._DEFERRED_ATTRIBUTES:
+            self.__dict__.pop(attribute, None)
+
+
+    '''
+    Function Name: _parseDeferredFeatures(attribute=None, label=None)
+    Description: Internal method that parses the feature lines deferred by _deferFeatures() into the Structure object
+    Parameters:
+            (attribute=None) - str - name of a component dictionary
+            (label=None) - str - label of a component in that dictionary
+    Return Type:
+            StructureComponent object - the component with the given label, or None if no label is given
+    '''
+    def _parseDeferredFeatures(self, attribute=None, label=None):
+        if self._lazyFeatures is not None:
+            source = self._lazyFeatures
+            self._lazyFeatures = None
+            if isinstance(source, tuple): #re-read the feature lines from the file
+                filename, featureStart = source
+                with open(filename, 'rb') as f:
+                    f.seek(featureStart)
+                    features = [line.decode('utf-8').rstrip('\r\n') for line in f]
+                features = [line for line in features if line] #drop blank lines
+            else:
+                features = source
+
+            for dictionary in self._STORE_DICTIONARIES.values():
+                setattr(self, dictionary, {})
+            self._componentArray = np.full(self._length, -1, dtype=np.int32)
+            self._componentLabels = []
+            self._componentIds = {}
+            self._adjacency = {}
+            self._parseFeatureLines(features)
+
+        if attribute is not None:
+            return getattr(self, attribute)[label]
 
 
 
@@ -273,64 +550,15 @@ class Structure:
     Description: Internal method used by _loadFile() to parse all the stem information in the
     structure type file into the Structureobject
     Parameters:
-            (stemData) - list - list of data from a line in the structure type file describing a stem
+            (stemData) - str - line from the structure type file describing a stem
     Return Type:
             None
     '''
     def _parseStemData(self, stemData):
-        #get stem Label
-        stemLabel = stemData[0]
-
-        #get start of first segment
-        part5p_start = ''
-        for char in stemData[1]:
-            if char.isnumeric():
-                part5p_start += char
-            else:
-                break
-        part5p_start = int(part5p_start)
-
-        #get stop of first segment
-        part5p_stop = ''
-        for char in reversed(stemData[1]):
-            if char.isnumeric():
-                part5p_stop += char
-            else:
-                break
-        part5p_stop = int(part5p_stop[::-1])
-
-        #get sequence for first segment
-        part5p_seq = ''
-        for char in stemData[2]:
-            if char.isalpha():
-                part5p_seq += char
-
-        #get start of second segment
-        part3p_start = ''
-        for char in stemData[3]:
-            if char.isnumeric():
-                part3p_start += char
-            else:
-                break
-        part3p_start = int(part3p_start)
-
-        #get stop of second segment
-        part3p_stop = ''
-        for char in reversed(stemData[3]):
-            if char.isnumeric():
-                part3p_stop += char
-            else:
-                break
-        part3p_stop = int(part3p_stop[::-1])
-
-        #get sequence for second segment
-        part3p_seq = ''
-        for char in stemData[4]:
-            if char.isalpha():
-                part3p_seq += char
+        stemLabel, part5p_seq, part3p_seq, part5p_span, part3p_span = tokenizeStem(stemData)
 
         #add data to the stems dictionary
-        newStem = Stem(stemLabel, part5p_seq, part3p_seq, (part5p_start, part5p_stop), (part3p_start, part3p_stop))
+        newStem = Stem(stemLabel, part5p_seq, part3p_seq, part5p_span, part3p_span)
         self._addStemToComponentArray(newStem)
         self.addStem(stemLabel, newStem)
 
@@ -341,68 +569,14 @@ class Structure:
     Description: Internal method used by _loadFile() to parse all the hairpin information in the
     structure type file into the Structureobject
     Parameters:
-            (hairpinData) - list - list of data from a line in the structure type file describing a hairpin
+            (hairpinData) - str - line from the structure type file describing a hairpin
     Return Type:
             None
     '''
     def _parseHairpinData(self, hairpinData):
-        #get hairpin label
-        hairpinLabel = hairpinData[0]
-
-        #get index of start of hairpin
-        hairpin_start = ''
-        for char in hairpinData[1]:
-            if char.isnumeric():
-                hairpin_start += char
-            else:
-                break
-        hairpin_start = int(hairpin_start)
-
-        #get index of end of hairpin
-        hairpin_stop = ''
-        for char in reversed(hairpinData[1]):
-            if char.isnumeric():
-                hairpin_stop += char
-            else:
-                break
-        hairpin_stop = int(hairpin_stop[::-1])
-
-        #get sequence of hairpin
-        hairpin_seq = ''
-        for char in hairpinData[2]:
-            if char.isalpha():
-                hairpin_seq += char
-
-        #get index of 5' closing base
-        close_5_prime_index = ''
-        for char in hairpinData[3]:
-            if char.isnumeric():
-                close_5_prime_index += char
-            elif char == ',':
-                break
-        close_5_prime_index = int(close_5_prime_index)
-
-        #get index of 3' closing base
-        close_3_prime_index = ''
-        for char in reversed(hairpinData[3]):
-            if char.isnumeric():
-                close_3_prime_index += char
-            elif char == ',':
-                break
-        close_3_prime_index = int(close_3_prime_index[::-1])
-
-        close_5_prime_base = hairpinData[4][0] #get 5' closing base
-        close_3_prime_base = hairpinData[4][2] #get 3' closing base
-
-        #get pk info
-        if hairpinData[5] != '':
-            pk = hairpinData[5][3]
-        else:
-            pk = None
-
+        hairpinLabel, hairpin_seq, hairpin_span, closingPair, closingPairSpan, pk = tokenizeHairpin(hairpinData)
 
-        newHairpin = Hairpin(hairpinLabel, hairpin_seq, (hairpin_start, hairpin_stop),
-            (close_5_prime_base, close_3_prime_base), (close_5_prime_index, close_3_prime_index), pk)
+        newHairpin = Hairpin(hairpinLabel, hairpin_seq, hairpin_span, closingPair, closingPairSpan, pk)
         self._addHairpinToComponentArray(newHairpin)
         self.addHairpin(hairpinLabel, newHairpin)
 
@@ -413,102 +587,22 @@ class Structure:
     Description: Internal method used by _loadFile() to parse all the bulge information in the
     structure type file into the Structureobject
     Parameters:
-            (bulgeData) - list - list of data from a line in the structure type file describing a bulge
+            (bulgeData) - str - line from the structure type file describing a bulge
     Return Type:
             None
     '''
     def _parseBulgeData(self, bulgeData):
-        #get bulge label
-        bulgeLabel = bulgeData[0]
-
-        #get start index of bulge
-        bulge_start = ''
-        for char in bulgeData[1]:
-            if char.isnumeric():
-                bulge_start += char
-            else:
-                break
-        bulge_start = int(bulge_start)
-
-        #get stop index of bulge
-        bulge_stop = ''
-        for char in reversed(bulgeData[1]):
-            if char.isnumeric():
-                bulge_stop += char
-            else:
-                break
-        bulge_stop = int(bulge_stop[::-1])
-
-        #get bulge sequence
-        bulge_seq = ''
-        for char in bulgeData[2]:
-            if char.isalpha():
-                bulge_seq += char
-
-        #get index of 5' base in preceding pair
-        precedingPair5pIndex = ''
-        for char in bulgeData[3]:
-            if char.isnumeric():
-                precedingPair5pIndex += char
-            elif char == ',':
-                break
-        precedingPair5pIndex = int(precedingPair5pIndex)
-
-        #get index of 3' base in preceding pair
-        precedingPair3pIndex = ''
-        for char in reversed(bulgeData[3]):
-            if char.isnumeric():
-                precedingPair3pIndex += char
-            elif char == ',':
-                break
-        precedingPair3pIndex = int(precedingPair3pIndex[::-1])
-
-        #get 5' base of preceding pair
-        precedingPair5pBase = bulgeData[4][0]
-
-        #get 3' base in preceding pair
-        precedingPair3pBase = bulgeData[4][2]
-
-        #get index of 5' base in trailing pair
-        trailingPair5pIndex = ''
-        for char in bulgeData[5]:
-            if char.isnumeric():
-                trailingPair5pIndex += char
-            elif char == ',':
-                break
-        trailingPair5pIndex = int(trailingPair5pIndex)
-
-        #get index of 3' base in trailing pair
-        trailingPair3pIndex = ''
-        for char in reversed(bulgeData[5]):
-            if char.isnumeric():
-                trailingPair3pIndex += char
-            elif char == ',':
-                break
-        trailingPair3pIndex = int(trailingPair3pIndex[::-1])
-
-        #get 5' and 3' bases of trailing pair
-        trailingPair5pBase = bulgeData[6][0]
-        trailingPair3pBase = bulgeData[6][2]
+        (bulgeLabel, bulge_seq, bulge_span, precedingBasePair, precedingBasePairIndex,
+            trailingBasePair, trailingBasePairIndex, pk) = tokenizeBulge(bulgeData)
 
         #need to make sure trailing pair is ordered correctly
-        if(abs(bulge_stop - trailingPair5pIndex) > abs(bulge_stop - trailingPair3pIndex)):
-            trailingBasePair = (trailingPair3pBase, trailingPair5pBase)
-            trailingBasePairIndex = (trailingPair3pIndex, trailingPair5pBase)
-        else:
-            trailingBasePair = (trailingPair5pBase, trailingPair3pBase)
-            trailingBasePairIndex = (trailingPair5pIndex, trailingPair3pIndex)
+        bulge_stop = bulge_span[1]
+        if(abs(bulge_stop - trailingBasePairIndex[0]) > abs(bulge_stop - trailingBasePairIndex[1])):
+            trailingBasePair = (trailingBasePair[1], trailingBasePair[0])
+            trailingBasePairIndex = (trailingBasePairIndex[1], trailingBasePairIndex[0])
 
-        #get pk info
-        if bulgeData[7] != '':
-            pk = bulgeData[7][3]
-        else:
-            pk = None
-
-
-        newBulge = Bulge(bulgeLabel, bulge_seq, (bulge_start, bulge_stop), (precedingPair5pBase, precedingPair3pBase),
-                        (precedingPair5pIndex, precedingPair3pIndex), trailingBasePair,
-                        trailingBasePairIndex, pk)
+        newBulge = Bulge(bulgeLabel, bulge_seq, bulge_span, precedingBasePair, precedingBasePairIndex,
+                        trailingBasePair, trailingBasePairIndex, pk)
         self._addBulgeToComponentArray(newBulge)
         self.addBulge(bulgeLabel, newBulge)
 
@@ -520,112 +614,21 @@ class Structure:
     Description: Internal method used by _loadFile() to parse all the inner loop information in the
     structure type file into the Structureobject
     Parameters:
-            (loop1) - list - list of data from a line in the structure type file describing the 5' loop of an Internal Loop
-            (loop2) - list - list of data from a line in the structure type file describing the 3' loop of an Internal Loop
+            (loop1) - str - line from the structure type file describing the 5' loop of an Internal Loop
+            (loop2) - str - line from the structure type file describing the 3' loop of an Internal Loop
     Return Type:
             None
     '''
     def _parseInternalLoopData(self, loop1, loop2):
-        #get Inner Loop parent Label
-        parentLabel = ''
-        for char in loop1[0]:
-            if char == '.':
-                break
-            else:
-                parentLabel += char
-
-        #get inner loop subunit label
-        loop1SubunitLabel = loop1[0][-1]
+        parentLabel, loop1SubunitLabel, loop1Seq, loop1Span, loop1ClosingPair, loop1ClosingPairSpan = tokenizeInternalLoop(loop1)
+        _, loop2SubunitLabel, loop2Seq, loop2Span, loop2ClosingPair, loop2ClosingPairSpan = tokenizeInternalLoop(loop2)
 
-        loop2SubunitLabel = loop2[0][-1]
+        #store closing pair as a tuple. The 3' closing pair is stored from the perspective of the loop
+        closingPairs = (loop1ClosingPair, (loop2ClosingPair[1], loop2ClosingPair[0]))
+        closingPairsSpan = (loop1ClosingPairSpan, (loop2ClosingPairSpan[1], loop2ClosingPairSpan[0]))
 
-        #get start index of loop subunit
-        loop1StartIndex = ''
-        for char in loop1[1]:
-            if char.isnumeric():
-                loop1StartIndex += char
-            else:
-                break
-        loop1StartIndex = int(loop1StartIndex)
-
-        #get stop index of loop subunit
-        loop1StopIndex = ''
-        for char in reversed(loop1[1]):
-            if char.isnumeric():
-                loop1StopIndex += char
-            else:
-                break
-        loop1StopIndex = int(loop1StopIndex[::-1])
-
-        loop1Seq = ''
-        for char in loop1[2]:
-            if char.isalpha():
-                loop1Seq += char
-
-        #get start index of loop subunit
-        loop2StartIndex = ''
-        for char in loop2[1]:
-            if char.isnumeric():
-                loop2StartIndex += char
-            else:
-                break
-        loop2StartIndex = int(loop2StartIndex)
-
-        #get stop index of loop subunit
-        loop2StopIndex = ''
-        for char in reversed(loop2[1]):
-            if char.isnumeric():
-                loop2StopIndex += char
-            else:
-                break
-        loop2StopIndex = int(loop2StopIndex[::-1])
-
-        loop2Seq = ''
-        for char in loop2[2]:
-            if char.isalpha():
-                loop2Seq += char
-
-        #get index of first base in closing pair
-        loop1ClosingPairStart = ''
-        for char in loop1[3]:
-            if char.isnumeric():
-                loop1ClosingPairStart += char
-            elif char == ',':
-                break
-        loop1ClosingPairStart = int(loop1ClosingPairStart)
-
-        #get index of second base in closing pair
-        loop1ClosingPairEnd = ''
-        for char in reversed(loop1[3]):
-            if char.isnumeric():
-                loop1ClosingPairEnd += char
-            elif char == ',':
-                break
-        loop1ClosingPairEnd = int(loop1ClosingPairEnd[::-1])
-
-        #get index of first base in closing pair
-        loop2ClosingPairStart = ''
-        for char in loop2[3]:
-            if char.isnumeric():
-                loop2ClosingPairStart += char
-            elif char == ',':
-                break
-        loop2ClosingPairStart = int(loop2ClosingPairStart)
-
-        #get index of second base in closing pair
-        loop2ClosingPairEnd = ''
-        for char in reversed(loop2[3]):
-            if char.isnumeric():
-                loop2ClosingPairEnd += char
-            elif char == ',':
-                break
-        loop2ClosingPairEnd = int(loop2ClosingPairEnd[::-1])
-
-        #store closing pair as a tuple
-        closingPairs = ((loop1[4][0], loop1[4][2]), (loop2[4][2], loop2[4][0]))
-
-        newInternalLoop = InternalLoop(parentLabel, loop1SubunitLabel, loop2SubunitLabel, loop1Seq, loop2Seq, (loop1StartIndex, loop1StopIndex),
-                                (loop2StartIndex, loop2StopIndex), closingPairs,((loop1ClosingPairStart, loop1ClosingPairEnd), (loop2ClosingPairEnd, loop2ClosingPairStart)))
+        newInternalLoop = InternalLoop(parentLabel, loop1SubunitLabel, loop2SubunitLabel, loop1Seq, loop2Seq, loop1Span,
+                                loop2Span, closingPairs, closingPairsSpan)
         self._addInternalLoopToComponentArray(newInternalLoop)
         self.addInternalLoop(parentLabel, newInternalLoop)
 
@@ -636,100 +639,29 @@ class Structure:
     Description: Internal method used by _loadFile() to parse all the external loop information in the
     structure type file into the Structureobject
     Parameters:
-            (externalLoopData) - list - list of data from a line in the structure type file describing an external loop
+            (externalLoopData) - str - line from the structure type file describing an external loop
     Return Type:
             None
     '''
     def _parseExternalLoopData(self, externalLoopData):
-        #get label for external loop
-        externalLoopLabel = externalLoopData[0]
-
-        #get start index of loop subunit
-        startIndex = ''
-        for char in externalLoopData[1]:
-            if char.isnumeric():
-                startIndex += char
-            else:
-                break
-        startIndex = int(startIndex)
-
-        #get stop index of loop subunit
-        stopIndex = ''
-        for char in reversed(externalLoopData[1]):
-            if char.isnumeric():
-                stopIndex += char
-            else:
-                break
-        stopIndex = int(stopIndex[::-1])
-
-        #get multiloop sequence
-        seq = ''
-        for char in externalLoopData[2]:
-            if char.isalpha():
-                seq += char
-
-        #get index of first base in 5' closing pair
-        closingPair5pStart = ''
-        for char in externalLoopData[3]:
-            if char.isnumeric():
-                closingPair5pStart += char
-            elif char == ',':
-                break
-        closingPair5pStart = int(closingPair5pStart)
-
-        #get index of second base in 5' closing pair
-        closingPair5pEnd = ''
-        for char in reversed(externalLoopData[3]):
-            if char.isnumeric():
-                closingPair5pEnd += char
-            elif char == ',':
-                break
-        closingPair5pEnd = int(closingPair5pEnd[::-1])
-
-        #store closing pair as a tuple
-        closingPair5p = (externalLoopData[4][0], externalLoopData[4][2])
-
-        #get index of first base in 3' closing pair
-        closingPair3pStart = ''
-        for char in externalLoopData[5]:
-            if char.isnumeric():
-                closingPair3pStart += char
-            elif char == ',':
-                break
-        closingPair3pStart = int(closingPair3pStart)
-
-        #get index of second base in 3' closing pair
-        closingPair3pEnd = ''
-        for char in reversed(externalLoopData[5]):
-            if char.isnumeric():
-                closingPair3pEnd += char
-            elif char == ',':
-                break
-        closingPair3pEnd = int(closingPair3pEnd[::-1])
-
-        #store closing pair as a tuple
-        closingPair3p = (externalLoopData[6][0], externalLoopData[6][2])
-
-        newExternalLoop = ExternalLoop(externalLoopLabel, seq, (startIndex, stopIndex), closingPair5p,
-                                     (closingPair5pStart, closingPair5pEnd), closingPair3p, (closingPair3pStart, closingPair3pEnd))
+        (externalLoopLabel, seq, span, closingPair5p, closingPair5pSpan,
+            closingPair3p, closingPair3pSpan) = tokenizeExternalLoop(externalLoopData)
+
+        newExternalLoop = ExternalLoop(externalLoopLabel, seq, span, closingPair5p, closingPair5pSpan, closingPair3p, closingPair3pSpan)
         self._addExternalLoopToComponentArray(newExternalLoop)
         self.addExternalLoop(externalLoopLabel, newExternalLoop)
 
 
     '''
     Function Name: _getMultiloopParentLabel(self, multiloopString)
-    Description:
+    Description: Internal method that returns the parent label of a multiloop line. Ex: 'M1.2 ...' -> 'M1'
     parameters:
-    Return value
+            (multiloopString) - str - line from the structure type file describing a multiloop subunit
+    Return value:
+            str
     '''
     def _getMultiloopParentLabel(self, multiloopString):
-        parentLabel = ''
-        for char in multiloopString:
-            if char == '.':
-                break
-            parentLabel += char
-
-        return parentLabel
+        return multiloopString.partition('.')[0]
 
 
     '''
@@ -737,14 +669,12 @@ class Structure:
     Description: Internal method used by _loadFile() to parse all the multiloop information in the
     structure type file into the Structureobject
     Parameters:
-            (multiloopData) - list - list of data from a line in the structure type file describing an MultiLoop
+            (multiloopComponents) - list - lines from the structure type file describing the subunits of a MultiLoop
     Return Type:
             None
     '''
     def _parseMultiLoopData(self, multiloopComponents):
-        #get parent label for all multiloop components
-        parentLabel = self._getMultiloopParentLabel(multiloopComponents[0][0])
-
+        parentLabel = None #parent label for all multiloop components
         subunitLabels = [] #list to store all subunit labels
         sequences = {} #dictionary to store all sequences
         spans = {} #dictionary to store all sequence spans
@@ -752,89 +682,12 @@ class Structure:
         closingPairsSpan = {} #dictionary to store closing pairs spans for multiloop segments
 
         for multiloopData in multiloopComponents: #iterate through subcomponents
+            (parentLabel, subunitLabel, seq, span, closingPair5p, closingPair5pSpan,
+                closingPair3p, closingPair3pSpan) = tokenizeMultiLoop(multiloopData)
 
-            #get inner loop subunit label and append to subunits list
-            subunitLabel = multiloopData[0][-1]
             subunitLabels.append(subunitLabel)
-
-            #get start index of loop subunit
-            startIndex = ''
-            for char in multiloopData[1]:
-                if char.isnumeric():
-                    startIndex += char
-                else:
-                    break
-            startIndex = int(startIndex)
-
-            #get stop index of loop subunit
-            stopIndex = ''
-            for char in reversed(multiloopData[1]):
-                if char.isnumeric():
-                    stopIndex += char
-                else:
-                    break
-            stopIndex = int(stopIndex[::-1])
-
-            #add start and stop as tuple to spans dictionary
-            spans[subunitLabel] = (startIndex, stopIndex)
-
-            #get multiloop sequence and add to sequences dictionary
-            seq = ''
-            for char in multiloopData[2]:
-                if char.isalpha():
-                    seq += char
-
-            sequences[subunitLabel] = seq #add sequence to dictionary
-
-            #get index of first base in 5' closing pair
-            closingPair5pStart = ''
-            for char in multiloopData[3]:
-                if char.isnumeric():
-                    closingPair5pStart += char
-                elif char == ',':
-                    break
-            closingPair5pStart = int(closingPair5pStart)
-
-            #get index of second base in 5' closing pair
-            closingPair5pEnd = ''
-            for char in reversed(multiloopData[3]):
-                if char.isnumeric():
-                    closingPair5pEnd += char
-                elif char == ',':
-                    break
-            closingPair5pEnd = int(closingPair5pEnd[::-1])
-
-            #get whole 5' closing pair
-            closingPair5pSpan = (closingPair5pStart, closingPair5pEnd)
-
-            #store closing pair as a tuple
-            closingPair5p = (multiloopData[4][0], multiloopData[4][2])
-
-            #get index of first base in 3' closing pair
-            closingPair3pStart = ''
-            for char in multiloopData[5]:
-                if char.isnumeric():
-                    closingPair3pStart += char
-                elif char == ',':
-                    break
-            closingPair3pStart = int(closingPair3pStart)
-
-            #get index of second base in 3' closing pair
-            closingPair3pEnd = ''
-            for char in reversed(multiloopData[5]):
-                if char.isnumeric():
-                    closingPair3pEnd += char
-                elif char == ',':
-                    break
-            closingPair3pEnd = int(closingPair3pEnd[::-1])
-
-            #store whole 3' closing pair span
-            closingPair3pSpan = (closingPair3pStart, closingPair3pEnd)
-
-            #store closing pair as a tuple
-            closingPair3p = (multiloopData[6][0], multiloopData[6][2])
-
-            #add closing pairs and closing pair spans to dictionaries
+            sequences[subunitLabel] = seq
+            spans[subunitLabel] = span
             closingPairs[subunitLabel] = (closingPair5p, closingPair3p)
             closingPairsSpan[subunitLabel] = (closingPair5pSpan, closingPair3pSpan)
 
@@ -849,34 +702,14 @@ class Structure:
     Description: Internal method used by _loadFile() to parse all the NCBP information in the
     structure type file into the Structureobject
     Parameters:
-            (ncbpData) - list - list of data from a line in the structure type file describing an NCBP
+            (ncbpData) - str - line from the structure type file describing an NCBP
     Return Type:
             None
     '''
     def _parseNCBPData(self, ncbpData):
-        #get label for ncbp
-        ncbpLabel = ncbpData[0]
-
-        #get index of 5' base
-        base1Span = int(ncbpData[1])
-
-        #get 5' base
-        base1 = ncbpData[2]
-
-        #get index 3' base
-        base2Span = int(ncbpData[3])
-
-        #get 3' base
-        base2 = ncbpData[4]
-
-        #get location of NCBP in other secondary structure
-        if ncbpData[5] == '':
-            loc = None
-        else:
-            loc = ncbpData[5]
+        ncbpLabel, basePair, basePairSpan, loc = tokenizeNCBP(ncbpData)
 
-
-        newNCBP = NCBP(ncbpLabel, (base1, base2), (base1Span, base2Span), loc)
+        newNCBP = NCBP(ncbpLabel, basePair, basePairSpan, loc)
         self.addNCBP(ncbpLabel, newNCBP)
 
 
@@ -887,40 +720,14 @@ class Structure:
     Description: Internal method used by _loadFile() to parse all the End information in the
     structure type file into the Structureobject
     Parameters:
-            (endData) - list - list of data from a line in the structure type file describing an end
+            (endData) - str - line from the structure type file describing an end
     Return Type:
             None
     '''
     def _parseEndData(self, endData):
-        #get label for End
-        endLabel = endData[0]
-
-        #get start index
-        startIndex = ''
-        for char in endData[1]:
-            if char.isnumeric():
-                startIndex += char
-            else:
-                break
-        startIndex = int(startIndex)
-
-        #get stop index
-        stopIndex = ''
-        for char in reversed(endData[1]):
-            if char.isnumeric():
-                stopIndex += char
-            else:
-                break
-        stopIndex = int(stopIndex[::-1])
-
-        #get sequence
-        seq = ''
-        for char in endData[2]:
-            if char.isalpha():
-                seq += char
+        endLabel, seq, span = tokenizeEnd(endData)
 
-
-        newEnd = End(endLabel, seq, (startIndex, stopIndex))
+        newEnd = End(endLabel, seq, span)
         self._addEndToComponentArray(newEnd)
         self.addEnd(endLabel, newEnd)
 
@@ -948,34 +755,286 @@ class Structure:
         pass
 
 
+###########################
+###### SERIALIZATION ######
+###########################
+
+    '''
+    Function Name: _serialize()
+    Description: Internal method that converts the Structure object into a compact tuple of strings, integers, and tuples.
+    The tuple holds the constructor arguments for every StructureComponent instead of the objects themselves, so it is cheap
+    to send between processes and can be turned back into a Structure object with _deserialize().
+    Parameters:
+            None
+    Return Type:
+            tuple
+    '''
+    def _serialize(self):
+        stems = [(s._label, s._sequence5p, s._sequence3p, s._sequence5pSpan, s._sequence3pSpan) for s in self._stems.values()]
+        hairpins = [(h._label, h._sequence, h._span, h._closingPair, h._closingPairSpan, h._pk) for h in self._hairpins.values()]
+        bulges = [(b._label, b._sequence, b._span, b._closingPair5p, b._closingPair5pSpan, b._closingPair3p, b._closingPair3pSpan, b._pk) for b in self._bulges.values()]
+        internalLoops = [(il._parentLabel, il._5pLabel, il._3pLabel, il._5pLoop, il._3pLoop, il._span5p, il._span3p, il._closingPairs, il._closingPairsSpan) for il in self._internalLoops.values()]
+        multiLoops = [(ml._parentLabel, ml._subunitLabels, ml._sequences, ml._spans, ml._closingPairs, ml._closingPairsSpan) for ml in self._multiLoops.values()]
+        externalLoops = [(el._label, el._sequence, el._span, el._closingPair5p, el._closingPair5pSpan, el._closingPair3p, el._closingPair3pSpan) for el in self._externalLoops.values()]
+        ncbps = [(n._label, n._basePair, n._basePairSpan, n._parentUnit) for n in self._ncbp.values()]
+        ends = [(e._label, e._sequence, e._span) for e in self._ends.values()]
+
+        return (self._name, self._length, self._pageNum, self._sequence, self._DBN, self._structureArray, self._varna,
+                stems, hairpins, bulges, internalLoops, multiLoops, externalLoops, ncbps, ends)
+
+
+    '''
+    Function Name: _deserialize(data)
+    Description: Internal method that loads a tuple produced by _serialize() into the Structure object. The StructureComponent
+    objects, component array, and neighbor information are rebuilt without re-parsing any structure type text.
+    Parameters:
+            (data) - tuple - serialized Structure produced by _serialize()
+    Return Type:
+            None
+    '''
+    def _deserialize(self, data):
+        self._resetStructure()
+        (self._name, self._length, self._pageNum, self._sequence, self._DBN, self._structureArray, self._varna,
+            stems, hairpins, bulges, internalLoops, multiLoops, externalLoops, ncbps, ends) = data
+        self._componentArray = np.full(self._length, -1, dtype=np.int32)
+
+        for args in stems:
+            newStem = Stem(*args)
+            self._addStemToComponentArray(newStem)
+            self.addStem(newStem.label(), newStem)
+
+        for args in hairpins:
+            newHairpin = Hairpin(*args)
+            self._addHairpinToComponentArray(newHairpin)
+            self.addHairpin(newHairpin.label(), newHairpin)
+
+        for args in bulges:
+            newBulge = Bulge(*args)
+            self._addBulgeToComponentArray(newBulge)
+            self.addBulge(newBulge.label(), newBulge)
+
+        for args in internalLoops:
+            newInternalLoop = InternalLoop(*args)
+            self._addInternalLoopToComponentArray(newInternalLoop)
+            self.addInternalLoop(newInternalLoop.label(), newInternalLoop)
+
+        for args in multiLoops:
+            newMultiLoop = MultiLoop(*args)
+            self._addMultiLoopToComponentArray(newMultiLoop)
+            self.addMultiLoop(newMultiLoop.label(), newMultiLoop)
+
+        for args in externalLoops:
+            newExternalLoop = ExternalLoop(*args)
+            self._addExternalLoopToComponentArray(newExternalLoop)
+            self.addExternalLoop(newExternalLoop.label(), newExternalLoop)
+
+        for args in ncbps:
+            newNCBP = NCBP(*args)
+            self.addNCBP(newNCBP.label(), newNCBP)
+
+        for args in ends:
+            newEnd = End(*args)
+            self._addEndToComponentArray(newEnd)
+            self.addEnd(newEnd.label(), newEnd)
+
+        #add neighbors and stem neighboring bulge boolean controls
+        self._addStructureComponentNeighbors()
+        self._addStemBulgeNeighborBooleans()
+
+
+    '''
+    Function Name: saveBinary(directory)
+    Description: Function saves the Structure object as a one record binary corpus(see the StructureBinary module). The
+    binary corpus can be loaded with loadBinary() without re-parsing the structure type file
+    Parameters:
+            (directory) - str - directory to write the .npy files to. It is created if it does not exist
+    Return Type:
+            None
+    '''
+    def saveBinary(self, directory):
+        writeBinaryCorpus([self], directory)
+
+
+    '''
+    Function Name: loadBinary(source, index=0, views=False, compact=False)
+    Description: Function loads a structure from a binary corpus into the Structure object. The corpus columns are memory
+    mapped, so only the columns of the requested record are read
+    Parameters:
+            (source) - str or StructureBinary.BinaryCorpus - binary corpus directory or an open binary corpus
+            (index=0) - int - index of the structure in the corpus
+            (views=False) - bool - when true, the sequences and annotations of the structure and its components are
+                            StructureBinary.BufferView objects that decode their text from the memory mapped corpus on demand
+            (compact=False) - bool - when true, the components are kept in a ComponentStore of the corpus tables and component
+                              objects are only created when they are accessed. See compactComponents()
+    Return Type:
+            None
+    '''
+    def loadBinary(self, source, index=0, views=False, compact=False):
+        corpus = source if isinstance(source, BinaryCorpus) else BinaryCorpus(source)
+        if not compact:
+            self._deserialize(corpus.record(index, views=views))
+            return
+
+        self._resetStructure()
+        self._name, self._length, self._pageNum, self._sequence, self._DBN, self._structureArray, self._varna = corpus.header(index, views)
+        store = ComponentStore.fromBinaryCorpus(corpus, index)
+        self._componentArray = np.array(store.componentArray(), dtype=np.int32) #writable copy of the memory mapped array
+        self._componentLabels = store.componentLabels()
+        self._componentIds = {label: componentId for componentId, label in enumerate(self._componentLabels)}
+        self._useComponentStore(store)
+        self._buildAdjacencyIndex()
+
+
 ##############################################
 ###### Add StructureComponent Neighbors ######
 ##############################################
 
     '''
     Function Name: _addStructureComponentNeighbors()
-    Description: Function fills in the neighboring structure information for each of the StructureComponent objects contained in the Structure object
+    Description: Function builds the adjacency index and fills in the neighboring structure information for each of the StructureComponent
+    objects contained in the Structure object
     Parameters:
             None
     Return Value:
             None
     '''
     def _addStructureComponentNeighbors(self):
-        allStructureComponentLabels = self.features() #get all labels for StructureComponents in Structure
-
-        for feature in allStructureComponentLabels: #iterate through all labels
-            try:
-                structureComponent = self.component(feature) #get the StructureComponent object for a given label
-                neighbors = self.neighbors(feature) #get neighbors of the feature
-                structureComponent._addNeighbors(neighbors[0], neighbors[1]) #add neighbors to StructureComponent object
-            except: #will skip NCBPs and MultiLoops
-                continue
+        self._buildAdjacencyIndex()
+
+        for label, adjacentFeatures in self._adjacency.items():
+            structureComponent = self.component(label)
+            if isinstance(adjacentFeatures, dict): #multiloops store the neighbors of every subunit
+                structureComponent._addNeighbors(adjacentFeatures)
+            else:
+                structureComponent._addNeighbors(adjacentFeatures[0], adjacentFeatures[1])
+
+
+    '''
+    Function Name: _segmentNeighbors(span)
+    Description: Internal method that gets the labels of the components directly 5' and 3' of a contiguous segment of the molecule
+    Parameters:
+            (span) - tuple - (start, stop) 1-indexed span of the segment
+    Return Type:
+            tuple - (5' neighbor label, 3' neighbor label). Locations past either end of the molecule are labeled 'EOM'
+    '''
+    def _segmentNeighbors(self, span):
+        index5p = span[0] - 2 #0-indexed location of the base before the segment
+        index3p = span[1] #0-indexed location of the base after the segment
+        neighbor5p = self._componentLabelAt(index5p) if index5p >= 0 else 'EOM' # 'End of Molecule'
+        neighbor3p = self._componentLabelAt(index3p) if index3p < self._length else 'EOM'
+        return (neighbor5p, neighbor3p)
+
+
+    '''
+    Function Name: _buildAdjacencyIndex()
+    Description: Internal method that builds the adjacency index used by neighbors(). The index maps the label of every component in the
+    component array to the labels of its 5' and 3' neighbors, including the neighbors of each multiloop and external loop branch.
+    Parameters:
+            None
+    Return Type:
+            None
+    '''
+    def _buildAdjacencyIndex(self):
+        self._adjacency = {}
+
+        for label in self._componentLabels:
+            span = self._componentSpan(label)
+
+            if isinstance(span, dict): #multiloop spans are stored per subunit
+                self._adjacency[label] = {subunit: self._segmentNeighbors(subunitSpan) for subunit, subunitSpan in span.items()}
+
+            elif all(type(i) is int for i in span): #tuple only containes integer index locations(example: bulge location)
+                self._adjacency[label] = self._segmentNeighbors(span)
+
+            else: #tuple containes other tuples within it(example: InternalLoop locations)
+                seq1_neighbor5p, seq1_neighbor3p = self._segmentNeighbors(span[0])
+                seq2_neighbor5p, seq2_neighbor3p = self._segmentNeighbors(span[1])
+                self._adjacency[label] = ((seq1_neighbor5p, seq2_neighbor3p), (seq2_neighbor5p, seq1_neighbor3p))
+
+
+    '''
+    Function Name: adjacencyEdges()
+    Description: Function returns the component adjacency graph as an edge list. Each edge connects two components that are
+    directly next to each other along the backbone of the molecule, ordered 5' to 3'.
+    Parameters:
+            None
+    Return Type:
+            list of tuples - (5' component label, 3' component label) for every edge in order of the 5' component's location
+    '''
+    def adjacencyEdges(self):
+        edges = []
+        seen = set()
+        for label, neighbor3p in self._backboneSteps():
+            if (label, neighbor3p) not in seen:
+                seen.add((label, neighbor3p))
+                edges.append((label, neighbor3p))
+        return edges
+
+
+    '''
+    Function Name: adjacencyMatrix(directed=False)
+    Description: Function returns the component adjacency graph as a matrix. Rows and columns are in the order of the component
+    ids used by componentIdArray(), so the label for row i is componentLabel(i).
+    Parameters:
+            (directed=False) - bool - when True, matrix[i, j] is 1 only if component j directly follows component i in the 5' to 3'
+                               direction. When False, the matrix is symmetric.
+    Return Type:
+            numpy array of int8 - square matrix with one row for every component in the component array
+    '''
+    def adjacencyMatrix(self, directed=False):
+        numComponents = len(self._componentLabels)
+        matrix = np.zeros((numComponents, numComponents), dtype=np.int8)
+        for label, neighbor3p in self._backboneSteps():
+            matrix[self._componentIds[label], self._componentIds[neighbor3p]] = 1
+            if not directed:
+                matrix[self._componentIds[neighbor3p], self._componentIds[label]] = 1
+        return matrix
+
+
+    '''
+    Function Name: _backboneSteps()
+    Description: Internal generator over the places where the backbone moves from one component to the next
+    Parameters:
+            None
+    Return Type:
+            generator of tuples - (5' component label, 3' component label)
+    '''
+    def _backboneSteps(self):
+        if self._componentArray is None:
+            return
+        ids = self._componentArray
+        for index in np.flatnonzero(ids[1:] != ids[:-1]) + 1: #0-indexed first location of every new component
+            label5p, label3p = self._componentLabelAt(index - 1), self._componentLabelAt(index)
+            if label5p is not None and label3p is not None: #unassigned locations are not part of the graph
+                yield (label5p, label3p)
 
 
 #############################
 ###### COMPONENT ARRAY ######
 #############################
 
+    '''
+    Function Name: _addSpanToComponentArray(label, span)
+    Description: Internal method that marks every index in a span of the component array with the id of a component. The
+    label is added to the label table the first time one of its indices is marked.
+    Parameters:
+            (label) - str - label of the component
+            (span) - tuple - (start, stop) 1-indexed span of the component
+    Return Type:
+            None
+    '''
+    def _addSpanToComponentArray(self, label, span):
+        if span[1] < span[0]: #zero length spans do not cover any index
+            return
+
+        componentId = self._componentIds.get(label)
+        if componentId is None: #add new label to the label table
+            componentId = len(self._componentLabels)
+            self._componentIds[label] = componentId
+            self._componentLabels.append(label)
+
+        self._componentArray[span[0]-1:span[1]] = componentId
+
     '''
     Function Name: _addStemToComponentArray(stem)
     Description: Internal method used in _loadFile() that adds a given stem to the component array
@@ -985,11 +1044,8 @@ class Structure:
             None
     '''
     def _addStemToComponentArray(self, stem):
-        for i in range(stem.sequence5pSpan()[0]-1, stem.sequence5pSpan()[1]):
-            self._componentArray[i] = stem.label()
-
-        for i in range(stem.sequence3pSpan()[0]-1, stem.sequence3pSpan()[1]):
-            self._componentArray[i] = stem.label()
+        self._addSpanToComponentArray(stem.label(), stem.sequence5pSpan())
+        self._addSpanToComponentArray(stem.label(), stem.sequence3pSpan())
 
     '''
     Function Name: _addBulgeToComponentArray(bulge)
@@ -1000,8 +1056,7 @@ class Structure:
             None
     '''
     def _addBulgeToComponentArray(self, bulge):
-        for i in range(bulge.span()[0]-1, bulge.span()[1]):
-            self._componentArray[i] = bulge.label()
+        self._addSpanToComponentArray(bulge.label(), bulge.span())
 
     '''
     Function Name: _addHairpinToComponentArray(hairpin)
@@ -1012,8 +1067,7 @@ class Structure:
             None
     '''
     def _addHairpinToComponentArray(self, hairpin):
-        for i in range(hairpin.span()[0]-1, hairpin.span()[1]):
-            self._componentArray[i] = hairpin.label()
+        self._addSpanToComponentArray(hairpin.label(), hairpin.span())
 
     '''
     Function Name: _addEndToComponentArray(end)
@@ -1024,8 +1078,7 @@ class Structure:
             None
     '''
     def _addEndToComponentArray(self, end):
-        for i in range(end.span()[0]-1, end.span()[1],):
-            self._componentArray[i] = end.label()
+        self._addSpanToComponentArray(end.label(), end.span())
 
     '''
     Function Name: _addInternalLoopToComponentArray(InternalLoop)
@@ -1037,8 +1090,7 @@ class Structure:
     '''
     def _addInternalLoopToComponentArray(self, internalLoop):
         for pair in internalLoop.span():
-            for i in range(pair[0]-1, pair[1]):
-                self._componentArray[i] = internalLoop.label()
+            self._addSpanToComponentArray(internalLoop.label(), pair)
 
     '''
     Function Name: _addExternalLoopToComponentArray(el)
@@ -1049,8 +1101,7 @@ class Structure:
             None
     '''
     def _addExternalLoopToComponentArray(self, el):
-        for i in range(el.span()[0]-1, el.span()[1]):
-            self._componentArray[i] = el.label()
+        self._addSpanToComponentArray(el.label(), el.span())
 
     '''
     Function Name: _addMultiLoopToComponentArray(multiloop)
@@ -1062,24 +1113,203 @@ class Structure:
     '''
     def _addMultiLoopToComponentArray(self, multiloop):
         for subunit in multiloop._subunitLabels: #iterate through subunit labels
-            span = multiloop._spans[subunit] #get span for particular subunit
-            for i in range(span[0]-1, span[1]):
-                self._componentArray[i] = multiloop._parentLabel
+            self._addSpanToComponentArray(multiloop._parentLabel, multiloop._spans[subunit])
+
+    '''
+    Function Name: _componentLabelAt(index)
+    Description: Internal method that gets the label of the component at a 0-indexed location of the component array
+    Parameters:
+            (index) - int - 0-indexed location in the component array
+    Return Type:
+            str - label of the component, or None if the index is not part of any component
+    '''
+    def _componentLabelAt(self, index):
+        componentId = self._componentArray[index]
+        return self._componentLabels[componentId] if componentId >= 0 else None
 
     '''
     Function Name: componentArray()
-    Description: function that returns the _componentArray for the Structureobject
+    Description: function that returns the component array for the Structure object with the component labels decoded from
+    the label table. Indices that are not part of any component contain None.
     Parameters:
             None
     Return Type:
-            numpy array
+            numpy array of str
     '''
     def componentArray(self):
+        if self._componentArray is None:
+            return None
+        labels = np.array(self._componentLabels + [None], dtype=object) #id -1 indexes the trailing None
+        return labels[self._componentArray]
+
+    '''
+    Function Name: componentIdArray()
+    Description: function that returns the integer coded component array. Each index contains the id of the component at that
+    location, or -1 if the location is not part of any component. Ids can be converted to labels with componentLabel().
+    Parameters:
+            None
+    Return Type:
+            numpy array of int32
+    '''
+    def componentIdArray(self):
         return self._componentArray
 
+    '''
+    Function Name: componentId(label)
+    Description: function that returns the id used for a component in the component id array
+    Parameters:
+            (label) - str - label of the component
+    Return Type:
+            int - id of the component, or None if the component is not in the component array
+    '''
+    def componentId(self, label):
+        return self._componentIds.get(label)
+
+    '''
+    Function Name: componentLabel(componentId)
+    Description: function that returns the label of a component from its id in the component id array
+    Parameters:
+            (componentId) - int - id of the component
+    Return Type:
+            str - label of the component, or None if the id is -1 or not in the label table
+    '''
+    def componentLabel(self, componentId):
+        if 0 <= componentId < len(self._componentLabels):
+            return self._componentLabels[componentId]
+        return None
+
+    '''
+    Function Name: componentMask(componentType)
+    Description: function that returns a boolean mask of the indices in the molecule that belong to a type of component
+    Parameters:
+            (componentType) - str - label prefix of the component type. 'S' for stems, 'H' for hairpins, 'B' for bulges,
+                              'I' for internal loops, 'M' for multiloops, 'X' for external loops, and 'E' for ends
+    Return Type:
+            numpy array of bool
+    '''
+    def componentMask(self, componentType):
+        typeIds = [i for i, label in enumerate(self._componentLabels) if label.startswith(componentType)]
+        return np.isin(self._componentArray, typeIds)
+
+    '''
+    Function Name: componentRuns()
+    Description: function that splits the component array into runs of consecutive indices that belong to the same component
+    Parameters:
+            None
+    Return Type:
+            list of tuples - (label, start, stop) for every run using 1-indexed inclusive locations. Unassigned runs have the label None
+    '''
+    def componentRuns(self):
+        if self._componentArray is None or len(self._componentArray) == 0:
+            return []
+        boundaries = np.flatnonzero(np.diff(self._componentArray)) + 1 #first index of every run after the first
+        starts = np.concatenate(([0], boundaries))
+        stops = np.concatenate((boundaries, [len(self._componentArray)]))
+        return [(self._componentLabelAt(start), int(start)+1, int(stop)) for start, stop in zip(starts, stops)]
+
+
+
+
+
+
+#############################
+###### COMPONENT STORE ######
+#############################
+
+    #attributes that are removed from a lazily loaded Structure until its feature lines are parsed
+    _DEFERRED_ATTRIBUTES = ('_componentArray', '_componentLabels', '_componentIds', '_adjacency')
+
+    #StructureComponent dictionary of each ComponentStore table
+    _STORE_DICTIONARIES = {'stems': '_stems', 'hairpins': '_hairpins', 'bulges': '_bulges', 'internalLoops': '_internalLoops',
+                           'multiLoops': '_multiLoops', 'externalLoops': '_externalLoops', 'ncbps': '_ncbp', 'ends': '_ends'}
+
+    '''
+    Function Name: componentStore()
+    Description: Function returns the components of the structure as a ComponentStore, with one table per component type for
+    vectorized filters and batch energies. For a compact Structure this is the store that holds the components. Otherwise a new
+    store is packed from the current components
+    Parameters:
+            None
+    Return Type:
+            ComponentStore
+    '''
+    def componentStore(self):
+        if self._componentStore is not None:
+            return self._componentStore
+        return ComponentStore.fromStructure(self)
+
+
+    '''
+    Function Name: compactComponents()
+    Description: Function moves the components of the structure into a ComponentStore and releases the StructureComponent
+    objects. The component accessors(stems(), hairpins(), component(label), ...) create the objects again the first time each
+    one is accessed, and keep them. Changes made through the setters of created objects are not written back to the store
+    Parameters:
+            None
+    Return Type:
+            ComponentStore - the store that holds the components
+    '''
+    def compactComponents(self):
+        if self._componentStore is None:
+            self._useComponentStore(ComponentStore.fromStructure(self))
+        return self._componentStore
+
 
+    '''
+    Function Name: _useComponentStore(store)
+    Description: Internal method that replaces the component dictionaries with LazyComponentDicts backed by a ComponentStore
+    Parameters:
+            (store) - ComponentStore - store that holds the components of the structure
+    Return Type:
+            None
+    '''
+    def _useComponentStore(self, store):
+        self._componentStore = store
+        for table, attribute in self._STORE_DICTIONARIES.items():
+            setattr(self, attribute, LazyComponentDict(store.labels(table), lambda label, table=table: self._materializeComponent(table, label)))
+        self._resetEnergyCache()
 
 
+    '''
+    Function Name: _materializeComponent(table, label)
+    Description: Internal method that creates a StructureComponent object from the ComponentStore and fills in the neighbor
+    information that _addStructureComponentNeighbors() and _addStemBulgeNeighborBooleans() add to parsed components
+    Parameters:
+            (table) - str - ComponentStore table name
+            (label) - str - component label
+    Return Type:
+            StructureComponent object
+    '''
+    def _materializeComponent(self, table, label):
+        newComponent = COMPONENT_CLASSES[table](*self._componentStore.arguments(table, label))
+
+        adjacentFeatures = self._adjacency.get(label)
+        if isinstance(adjacentFeatures, dict): #multiloops store the neighbors of every subunit
+            newComponent._addNeighbors(adjacentFeatures)
+        elif adjacentFeatures is not None:
+            newComponent._addNeighbors(adjacentFeatures[0], adjacentFeatures[1])
+
+        if table == 'stems':
+            row = self._componentStore._rows['stems'][label]
+            newComponent._addAdjacentBulgeBoolean(*self._componentStore.adjacentBulges()[row].tolist())
+        if hasattr(newComponent, '_setStructure'):
+            newComponent._setStructure(self)
+        return newComponent
+
+
+    '''
+    Function Name: _componentSpan(label)
+    Description: Internal method that returns the span of a component, reading it from the ComponentStore when the component
+    is stored there so that the component object is not created
+    Parameters:
+            (label) - str - component label
+    Return Type:
+            tuple, or dict of subunit label : span for multiloops
+    '''
+    def _componentSpan(self, label):
+        if self._componentStore is not None and label in self._componentStore:
+            return self._componentStore.span(label)
+        return self.component(label).span()
 
 
 ###########################
@@ -1150,6 +1380,22 @@ class Structure:
         return self._DBN
 
 
+    '''
+    Function Name: fingerprint()
+    Description: function that returns a stable 128 bit hash of the sequence and base pair table of the Structure object.
+    Records of the same structure under different names have the same fingerprint. Only the sequence and dot-bracket are used,
+    so the feature lines of a lazily loaded Structure are not parsed
+    Parameters:
+            None
+    Return Type:
+            str - 32 character hexadecimal fingerprint, or None if the dot-bracket is not valid
+    '''
+    def fingerprint(self):
+        if self._sequence is None or self._DBN is None:
+            return None
+        return structureFingerprint(self._sequence, self._DBN)
+
+
     '''
     Function Name: StructureArray()
     Description: Function to get the structure Array for the StructureTyoe object
@@ -1223,6 +1469,8 @@ class Structure:
     '''
     def addStem(self, stemLabel, newStem):
         self._stems[stemLabel] = newStem
+        newStem._setStructure(self)
+        self._resetEnergyCache()
 
 
     '''
@@ -1300,6 +1548,8 @@ class Structure:
     '''
     def addHairpin(self, label, newHairpin):
         self._hairpins[label] = newHairpin
+        newHairpin._setStructure(self)
+        self._resetEnergyCache()
 
 
     '''
@@ -1375,6 +1625,8 @@ class Structure:
     '''
     def addBulge(self, bulgeLabel, newBulge):
         self._bulges[bulgeLabel] = newBulge
+        newBulge._setStructure(self)
+        self._resetEnergyCache()
 
 
     '''
@@ -1447,6 +1699,8 @@ class Structure:
     '''
     def addInternalLoop(self, parentLabel, newInternalLoop):
         self._internalLoops[parentLabel] = newInternalLoop
+        newInternalLoop._setStructure(self)
+        self._resetEnergyCache()
 
 
     '''
@@ -1566,6 +1820,7 @@ class Structure:
     '''
     def addMultiLoop(self, parentLabel, newMultiLoop):
         self._multiLoops[parentLabel] = newMultiLoop
+        self._resetEnergyCache()
 
     '''
     Function Name: numMultiLoops()
@@ -1627,6 +1882,7 @@ class Structure:
     '''
     def addExternalLoop(self, elLabel, newEL):
         self._externalLoops[elLabel] = newEL
+        self._resetEnergyCache()
 
     '''
     Function Name: externalLoopLabels()
@@ -1865,57 +2121,42 @@ class Structure:
 
     '''
     Function Name: neighbors(label, object=False)
-    Description: Function to get the secondary structures adjacent to the feature of interest.
+    Description: Function to get the secondary structures adjacent to the feature of interest. Neighbors are looked up in the
+    adjacency index built when the Structure is loaded, so each lookup takes constant time.
     Parameters:
             (label) - str - label for the feature of interest
             (object) - bool - optional argument that causes the function to return the actual StructureTypeComponent objects instead of just the object label
     Return Type:
-            Returns a tuple containing the labels for the adjacent features in order of 5' to 3' locations
+            Returns a tuple containing the labels for the adjacent features in order of 5' to 3' locations. Stems and internal loops
+            return ((5' neighbor of the 5' strand, 3' neighbor of the 3' strand), (5' neighbor of the 3' strand, 3' neighbor of the 5' strand)).
+            Multiloops return a dictionary of (5' neighbor, 3' neighbor) tuples mapped to their subunit label.
+            Locations past either end of the molecule are labeled 'EOM'. Returns None if the label is not found.
     '''
     def neighbors(self, label, object=False):
-        adjacentFeatures = [] #list to store the adjacent RNA features
-
-        if label in self._componentArray: #check if the feature is valid
-            span = self.component(label).span() #get index locations of the feature
-            if all(type(i) is int for i in span): #tuple only containes integer index locations(example: bulge location)
-                try: #try/except block will handle ends which only have one neighbor and one out of range index
-                    neighbor5p = (self._componentArray[span[0]-2] if not object else self.component(self._componentArray[span[0]-2]))
-                except:
-                    neighbor5p = 'EOM' # 'End of Molecule'
-
-                try: #try/except block will handle ends which only have one neighbor and one out of range index
-                    neighbor3p = (self._componentArray[span[1]] if not object else self.component(self._componentArray[span[1]]))
-                except:
-                    neighbor3p = 'EOM'
-
-                adjacentFeatures = (neighbor5p, neighbor3p)
-
-            else: #tuple containes other tuples within it(example: InternalLoop locations)
-                try: #try/except block will handle ends which only have one neighbor and one out of range index
-                    seq1_neighbor5p = (self._componentArray[span[0][0]-2] if not object else self.component(self._componentArray[span[0][0]-2]))
-                except:
-                    seq1_neighbor5p = 'EOM'
-
-                try: #try/except block will handle ends which only have one neighbor and one out of range index
-                    seq1_neighbor3p = (self._componentArray[span[0][1]] if not object else self.component(self._componentArray[span[0][1]]))
-                except:
-                    seq1_neighbor3p = 'EOM'
+        adjacentFeatures = self._adjacency.get(label)
 
-                try: #try/except block will handle ends which only have one neighbor and one out of range index
-                    seq2_neighbor5p = (self._componentArray[span[1][0]-2] if not object else self.component(self._componentArray[span[1][0]-2]))
-                except:
-                    seq2_neighbor5p = 'EOM'
-
-                try: #try/except block will handle ends which only have one neighbor and one out of range index
-                    seq2_neighbor3p = (self._componentArray[span[1][1]] if not object else self.component(self._componentArray[span[1][1]]))
-                except:
-                    seq2_neighbor3p = 'EOM'
+        if adjacentFeatures is None or not object:
+            return adjacentFeatures
+        return self._neighborObjects(adjacentFeatures)
 
-                adjacentFeatures = ((seq1_neighbor5p, seq2_neighbor3p), (seq2_neighbor5p, seq1_neighbor3p))
 
+    '''
+    Function Name: _neighborObjects(adjacentFeatures)
+    Description: Internal method that replaces the labels in a neighbors() result with their StructureComponent objects
+    Parameters:
+            (adjacentFeatures) - tuple, dict, or str - neighbors() result or part of one
+    Return Type:
+            same shape as adjacentFeatures with labels replaced by StructureComponent objects. 'EOM' and None are kept.
+    '''
+    def _neighborObjects(self, adjacentFeatures):
+        if isinstance(adjacentFeatures, tuple):
+            return tuple(self._neighborObjects(neighbor) for neighbor in adjacentFeatures)
+        elif isinstance(adjacentFeatures, dict):
+            return {subunit: self._neighborObjects(neighbors) for subunit, neighbors in adjacentFeatures.items()}
+        elif adjacentFeatures is None or adjacentFeatures == 'EOM':
             return adjacentFeatures
-        else: #otherwise print error and return None
-            return None
+        else:
+            return self.component(adjacentFeatures)
 
 
     """
@@ -1936,3 +2177,259 @@ class Structure:
         featureLabels.extend(self.internalLoopLabels())
 
         return featureLabels
+
+
+
+################################
+############ ENERGY ############
+################################
+
+    '''
+    Function Name: _resetEnergyCache()
+    Description: Internal method that clears the energy component list and the memoized energy totals. Called when a component is added
+    Parameters:
+            None
+    Return Type:
+            None
+    '''
+    def _resetEnergyCache(self):
+        self._energyComponents = None
+        self._energyIndex = {}
+        self._energyTotals = {}
+
+
+    '''
+    Function Name: _componentChanged(component)
+    Description: Internal method called by a StructureComponent after it is changed. The component is marked as changed in every
+    memoized energy total so that only its energy is recalculated on the next call to energy()
+    Parameters:
+            (component) - StructureComponent - the component that changed
+    Return Type:
+            None
+    '''
+    def _componentChanged(self, component):
+        index = self._energyIndex.get(id(component))
+        if index is not None:
+            for energies, total, changed in self._energyTotals.values():
+                changed.add(index)
+
+
+    '''
+    Function Name: _getEnergyComponents()
+    Description: Internal method that returns the cached list of StructureComponents that contribute to the free energy of the
+    molecule. The list is built on the first call and rebuilt after a component is added.
+    Parameters:
+            None
+    Return Type:
+            list of StructureComponent objects
+    '''
+    def _getEnergyComponents(self):
+        if self._energyComponents is None:
+            #parsing deferred feature lines resets the energy cache, so it is done before the list is built
+            if self._lazyFeatures is not None:
+                self._parseDeferredFeatures()
+            components = []
+            components.extend(self._stems.values())
+            components.extend(self._bulges.values())
+            components.extend(self._hairpins.values())
+            components.extend(self._internalLoops.values())
+            components.extend(self._multiLoops.values())
+            components.extend(self._externalLoops.values())
+            self._energyComponents = components
+            self._energyIndex = {id(component): index for index, component in enumerate(components)}
+        return self._energyComponents
+
+
+    '''
+    Function Name: _sumEnergies(energies, strict)
+    Description: Internal method that adds up component energies in component order
+    Parameters:
+            (energies) - list of float or None - component energies
+            (strict) - bool - when True, the total is None if any energy is None. When False, None values are skipped
+    Return Type:
+            float or None
+    '''
+    def _sumEnergies(self, energies, strict):
+        total = 0.0
+        for componentEnergy in energies:
+            if componentEnergy is None:
+                if strict:
+                    return None
+                continue
+            total += componentEnergy
+        return total
+
+
+    '''
+    Function Name: energy(strict=True, breakdown=False, temperature=T)
+    Description: Function calculates the total nearest neighbor free energy of the molecule by adding up the energies of its
+    stems, bulges, hairpins, internal loops, multiloops, and external loops in a single pass over the cached component list.
+    The component energies and the total are memoized for each (strict, temperature, parameter set). When a component is changed
+    through one of its setters, only that component is recalculated on the next call.
+    Parameters:
+            (strict=True) - bool - when True, the total energy is None if the energy of any component cannot be calculated.
+                            When False, components are evaluated in non-strict mode and components without an energy are skipped.
+            (breakdown=False) - bool - when True, a dictionary of component label : energy is returned instead of the total
+            (temperature=T) - float - temperature in Kelvin
+    Return Type:
+            float - total free energy in Kcal/mol, or None in strict mode if a component energy is missing
+            dict - component label : energy(float or None) when breakdown=True
+    '''
+    def energy(self, strict=True, breakdown=False, temperature=T):
+        components = self._getEnergyComponents()
+        key = (strict, temperature, parameterSetId())
+        memo = self._energyTotals.get(key)
+
+        if memo is None: #first evaluation for these settings
+            energies = [component.energy(strict=strict, temperature=temperature) for component in components]
+            memo = [energies, self._sumEnergies(energies, strict), set()]
+            self._energyTotals[key] = memo
+        elif memo[2]: #only the components that changed since the last evaluation are recalculated
+            energies = memo[0]
+            for index in memo[2]:
+                energies[index] = components[index].energy(strict=strict, temperature=temperature)
+            memo[1] = self._sumEnergies(energies, strict)
+            memo[2].clear()
+
+        if breakdown:
+            return {component.label(): componentEnergy for component, componentEnergy in zip(components, memo[0])}
+        return memo[1]
+
+
+    '''
+    Function Name: _mutationTargets()
+    Description: Internal method that finds the energy components whose energy depends on the base at each location. The component
+    array gives the stem or loop that contains the base, and bases in a closing pair of a hairpin, bulge, or internal loop are also
+    used by that loop, so each base affects one or two components.
+    Parameters:
+            None
+    Return Type:
+            list of lists of int - positions in the energy component list for every 0-indexed location in the molecule
+    '''
+    def _mutationTargets(self):
+        components = self._getEnergyComponents()
+        energyIndex = {component.label(): index for index, component in enumerate(components) if isinstance(component, (Stem, Hairpin, Bulge, InternalLoop))}
+        componentIndex = np.array([energyIndex.get(label, -1) for label in self._componentLabels] + [-1], dtype=np.int64) #id -1 indexes the trailing -1
+        targets = [[index] if index >= 0 else [] for index in componentIndex[self._componentArray].tolist()]
+
+        #closing pairs of the loops
+        for index, component in enumerate(components):
+            if isinstance(component, Hairpin):
+                closingPairSpans = [component.closingPairSpan()]
+            elif isinstance(component, Bulge):
+                closingPairSpans = [component.closingPair5pSpan(), component.closingPair3pSpan()]
+            elif isinstance(component, InternalLoop):
+                closingPairSpans = list(component.closingPairsSpan())
+            else:
+                continue
+            for closingPairSpan in closingPairSpans:
+                for location in closingPairSpan:
+                    if 1 <= location <= len(targets) and index not in targets[location-1]:
+                        targets[location-1].append(index)
+
+        return targets
+
+
+    '''
+    Function Name: _mutationDelta(indices, mutations, wildType, strict, temperature)
+    Description: Internal method that calculates the change in free energy caused by a set of mutations by recalculating only
+    the energies of the affected components
+    Parameters:
+            (indices) - iterable of int - positions of the affected components in the energy component list
+            (mutations) - dict - 1-indexed location : new base
+            (wildType) - list of float or None - energies of the unmutated components
+            (strict) - bool - strict mode used for the energies
+            (temperature) - float - temperature in Kelvin
+    Return Type:
+            float - change in free energy, or NaN in strict mode if a mutant component has no energy
+    '''
+    def _mutationDelta(self, indices, mutations, wildType, strict, temperature):
+        components = self._getEnergyComponents()
+        delta = 0.0
+        for index in indices:
+            mutantEnergy = components[index]._withMutations(mutations).energy(strict=strict, temperature=temperature)
+            if mutantEnergy is None:
+                if strict:
+                    return np.nan
+                mutantEnergy = 0.0 #components without an energy are skipped in non-strict mode
+            delta += mutantEnergy - (wildType[index] if wildType[index] is not None else 0.0)
+        return delta
+
+
+    '''
+    Function Name: scanMutations(positions=None, alphabet='ACGU', strict=False, temperature=T)
+    Description: Function calculates the change in total free energy(ddG) for every single point mutation at a set of locations.
+    Only the nearest neighbor terms of the one or two components that contain each location are recalculated: the stacks, end
+    penalties, and symmetry term of a stem, and the closing pair and mismatch terms of a loop. Each mutation costs a constant
+    number of term updates, so a scan of every location is linear in the length of the molecule. Mutations to the wild type
+    base have a ddG of 0.
+    Parameters:
+            (positions=None) - iterable of int - 1-indexed locations to mutate. Defaults to every location in the molecule
+            (alphabet='ACGU') - str - bases to mutate each location to
+            (strict=False) - bool - strict mode used for the energies. In strict mode, ddG is NaN when the wild type or the mutant
+                             structure has a component without an energy
+            (temperature=T) - float - temperature in Kelvin
+    Return Type:
+            numpy array of float64 - ddG matrix with one row for each location and one column for each base in the alphabet,
+            or None if a location is outside the molecule
+    '''
+    def scanMutations(self, positions=None, alphabet='ACGU', strict=False, temperature=T):
+        positions = list(range(1, len(self._sequence)+1)) if positions is None else list(positions)
+        for position in positions:
+            if not 1 <= position <= len(self._sequence):
+                print(f'Location {position} is outside the molecule.')
+                return None
+
+        ddG = np.zeros((len(positions), len(alphabet)), dtype=np.float64)
+        wildType = [component.energy(strict=strict, temperature=temperature) for component in self._getEnergyComponents()]
+        if strict and None in wildType:
+            ddG[:] = np.nan
+            return ddG
+
+        components = self._getEnergyComponents()
+        targets = self._mutationTargets()
+        states = {} #energy component position : state used for the point mutations of the component, built on first use
+        for row, position in enumerate(positions):
+            for index in targets[position-1]:
+                if index not in states:
+                    states[index] = components[index]._mutationState()
+
+            for column, base in enumerate(alphabet):
+                if base == self._sequence[position-1]:
+                    continue
+                for index in targets[position-1]:
+                    delta = components[index]._pointMutationDelta(position, base, states[index], wildType[index], strict, temperature)
+                    if delta is None: #strict mode and the mutant component has no energy
+                        ddG[row, column] = np.nan
+                        break
+                    ddG[row, column] += delta
+
+        return ddG
+
+
+    '''
+    Function Name: mutationEnergy(mutations, strict=False, temperature=T)
+    Description: Function calculates the change in total free energy(ddG) for a combination of point mutations, for example a
+    double mutant. Components that contain more than one of the mutated locations are evaluated with all of their mutations.
+    Parameters:
+            (mutations) - dict or list of (int, str) - 1-indexed location : new base
+            (strict=False) - bool - strict mode used for the energies
+            (temperature=T) - float - temperature in Kelvin
+    Return Type:
+            float - ddG of the mutant, NaN in strict mode if the wild type or mutant has a component without an energy,
+            or None if a location is outside the molecule
+    '''
+    def mutationEnergy(self, mutations, strict=False, temperature=T):
+        mutations = dict(mutations)
+        for position in mutations:
+            if not 1 <= position <= len(self._sequence):
+                print(f'Location {position} is outside the molecule.')
+                return None
+
+        wildType = [component.energy(strict=strict, temperature=temperature) for component in self._getEnergyComponents()]
+        if strict and None in wildType:
+            return np.nan
+
+        targets = self._mutationTargets()
+        indices = sorted({index for position in mutations for index in targets[position-1]})
+        return self._mutationDelta(indices, mutations, wildType, strict, temperature)
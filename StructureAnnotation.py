@@ -0,0 +1,248 @@
+'''
+Filename: StructureAnnotation.py
+Author: Michael Hathaway
+
+Description: The Structure Annotation module builds the structure type annotation of an RNA molecule directly from its
+sequence and dot-bracket string, without running bpRNA and parsing the .st file it writes. The base pair table is computed
+with a stack in one pass over the dot-bracket, and every loop is found by walking the bases enclosed by its closing pair once,
+so a structure is annotated in O(L) time. The components use the labels, spans, and closing pair conventions of bpRNA:
+
+    stems are maximal runs of stacked base pairs, numbered from the 5' end
+    a loop closed by a stem with no enclosed pairs is a hairpin, with one enclosed pair it is a bulge(one side unpaired) or an
+    internal loop(both sides unpaired), and with two or more enclosed pairs it is a multiloop
+    unpaired bases between top level stems are external loops, and unpaired bases before the first and after the last top
+    level stem are ends
+    base pairs that are not AU, GC, or GU pairs are also listed as NCBPs of the stem they are in
+
+The annotation is returned in the format produced by Structure._serialize(), so Structure.loadDotBracket() and
+Structure.fromDotBracket() create the same StructureComponent objects as loading the equivalent structure type file.
+Only nested dot-brackets are supported. Pseudoknot brackets('[]', '{}', '<>') are reported as errors.
+
+structureFingerprint() hashes a sequence and the base pair table of its dot-bracket, including pseudoknot brackets, so identical
+structures can be found in a corpus without comparing their annotations.
+'''
+
+## Module Imports ##
+import hashlib
+import numpy as np
+
+#characters that mark unpaired bases
+UNPAIRED_CHARACTERS = '.,:-_'
+
+#canonical base pairs. Other pairs are listed as NCBPs
+CANONICAL_PAIRS = {('A', 'U'), ('U', 'A'), ('G', 'C'), ('C', 'G'), ('G', 'U'), ('U', 'G')}
+
+#opening : closing bracket of the pseudoknot brackets used in structure type files, in addition to '(' and ')'
+PSEUDOKNOT_BRACKETS = {'[': ']', '{': '}', '<': '>', **{chr(c): chr(c).lower() for c in range(ord('A'), ord('Z') + 1)}}
+
+FINGERPRINT_SIZE = 16 #size of a structure fingerprint in bytes(128 bits)
+
+
+'''
+Function Name: pairTable(dbn, pseudoknots=False)
+Description: Function computes the base pair table of a dot-bracket string with a stack for every bracket type
+Parameters:
+        (dbn) - str - dot-bracket string
+        (pseudoknots=False) - bool - when true, the pseudoknot brackets of PSEUDOKNOT_BRACKETS are paired as well
+Return Type:
+        numpy array of int32 - 0-based index of the partner of every base, or -1 for unpaired bases. None if the dot-bracket
+        is not balanced or contains characters other than brackets and unpaired characters
+'''
+def pairTable(dbn, pseudoknots=False):
+    brackets = {'(': ')', **PSEUDOKNOT_BRACKETS} if pseudoknots else {'(': ')'}
+    opening = {closing: opening for opening, closing in brackets.items()}
+    table = np.full(len(dbn), -1, dtype=np.int32)
+    stacks = {character: [] for character in brackets}
+    for i, character in enumerate(dbn):
+        if character in brackets:
+            stacks[character].append(i)
+        elif character in opening:
+            stack = stacks[opening[character]]
+            if not stack:
+                print(f'Unbalanced dot-bracket: unmatched "{character}" at position {i + 1}')
+                return None
+            j = stack.pop()
+            table[i] = j
+            table[j] = i
+        elif character not in UNPAIRED_CHARACTERS:
+            print(f'Unsupported dot-bracket character: "{character}" at position {i + 1}')
+            return None
+
+    for character, stack in stacks.items():
+        if stack:
+            print(f'Unbalanced dot-bracket: unmatched "{character}" at position {stack[-1] + 1}')
+            return None
+    return table
+
+
+'''
+Function Name: structureFingerprint(sequence, dbn)
+Description: Function computes a stable 128 bit hash of a structure from its sequence and base pair table. Dot-brackets that
+describe the same base pairs with different bracket or unpaired characters have the same fingerprint. The hash is BLAKE2b, so
+fingerprints are the same across processes and Python versions, unlike hash()
+Parameters:
+        (sequence) - str - sequence of the molecule
+        (dbn) - str - dot-bracket string, which can contain pseudoknot brackets
+Return Type:
+        str - 32 character hexadecimal fingerprint, or None if the dot-bracket is not valid
+'''
+def structureFingerprint(sequence, dbn):
+    table = pairTable(str(dbn), pseudoknots=True)
+    if table is None:
+        return None
+    digest = hashlib.blake2b(digest_size=FINGERPRINT_SIZE)
+    digest.update(str(sequence).encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(table.astype('<i4').tobytes())
+    return digest.hexdigest()
+
+
+'''
+Function Name: _enclosedPairs(table, i, j)
+Description: Internal function that returns the base pairs directly enclosed by the pair (i, j), skipping over the bases
+inside each of them
+Parameters:
+        (table) - list of int - base pair table
+        (i) - int - 0-based index of the 5' base of the closing pair, or -1 for the exterior loop
+        (j) - int - 0-based index of the 3' base of the closing pair, or L for the exterior loop
+Return Type:
+        list of (int, int) tuples - 0-based pairs in 5' to 3' order
+'''
+def _enclosedPairs(table, i, j):
+    pairs = []
+    k = i + 1
+    while k < j:
+        if table[k] > k:
+            pairs.append((k, table[k]))
+            k = table[k] + 1
+        else:
+            k += 1
+    return pairs
+
+
+'''
+Function Name: annotateDotBracket(sequence, dbn, name='')
+Description: Function annotates the structural components of a molecule from its sequence and dot-bracket string
+Parameters:
+        (sequence) - str - sequence of the molecule
+        (dbn) - str - dot-bracket string of the same length as the sequence
+        (name='') - str - name of the molecule
+Return Type:
+        tuple - annotated structure in the format produced by Structure._serialize(), or None if the dot-bracket is not valid
+'''
+def annotateDotBracket(sequence, dbn, name=''):
+    length = len(sequence)
+    if len(dbn) != length:
+        print(f'Dot-bracket length {len(dbn)} does not match sequence length {length} for {name}')
+        return None
+    table = pairTable(dbn)
+    if table is None:
+        return None
+    table = table.tolist() #list indexing is faster than numpy scalar indexing in the loops below
+
+    #1-based helpers matching the structure type file conventions
+    pair = lambda i, j: ((sequence[i], sequence[j]), (i + 1, j + 1))
+    segment = lambda start, stop: (sequence[start:stop + 1], (start + 1, stop + 1))
+    annotation = ['E'] * length
+
+    #stems: maximal runs of stacked pairs, in order of their 5' start
+    stems = []
+    ncbps = []
+    for i in range(length):
+        j = table[i]
+        if j > i and not (i > 0 and table[i - 1] == j + 1):
+            k = 0
+            while i + k < j - k and table[i + k] == j - k:
+                k += 1
+            label = f'S{len(stems) + 1}'
+            stems.append((label, sequence[i:i + k], sequence[j - k + 1:j + 1], (i + 1, i + k), (j - k + 2, j + 1)))
+            for m in range(k):
+                annotation[i + m] = annotation[j - m] = 'S'
+                bases = (sequence[i + m].upper(), sequence[j - m].upper())
+                if bases not in CANONICAL_PAIRS:
+                    ncbps.append((f'NCBP{len(ncbps) + 1}', (sequence[i + m], sequence[j - m]), (i + m + 1, j - m + 1), label))
+
+    #loops closed by the innermost pair of each stem
+    hairpins, bulges, internalLoops, multiLoops = [], [], [], []
+    for stem in stems:
+        i, j = stem[3][1] - 1, stem[4][0] - 1 #innermost pair of the stem
+        enclosed = _enclosedPairs(table, i, j)
+
+        if not enclosed:
+            seq, span = segment(i + 1, j - 1)
+            closingPair, closingPairSpan = pair(i, j)
+            hairpins.append((f'H{len(hairpins) + 1}', seq, span, closingPair, closingPairSpan, None))
+            annotation[i + 1:j] = 'H' * (j - i - 1)
+
+        elif len(enclosed) == 1:
+            k, l = enclosed[0]
+            if k - i > 1 and j - l > 1:
+                seq5p, span5p = segment(i + 1, k - 1)
+                seq3p, span3p = segment(l + 1, j - 1)
+                internalLoops.append([seq5p, seq3p, span5p, span3p, ((sequence[i], sequence[j]), (sequence[k], sequence[l])), ((i + 1, j + 1), (k + 1, l + 1))])
+                annotation[i + 1:k] = 'I' * (k - i - 1)
+                annotation[l + 1:j] = 'I' * (j - l - 1)
+            elif k - i > 1: #5' bulge between i and k
+                seq, span = segment(i + 1, k - 1)
+                bulges.append([seq, span, *pair(i, j), *pair(k, l), None])
+                annotation[i + 1:k] = 'B' * (k - i - 1)
+            elif j - l > 1: #3' bulge between l and j. The trailing pair is ordered from the bulge side
+                seq, span = segment(l + 1, j - 1)
+                bulges.append([seq, span, *pair(k, l), *pair(j, i), None])
+                annotation[l + 1:j] = 'B' * (j - l - 1)
+
+        else:
+            flanking = [(i, j)] + enclosed + [(i, j)]
+            subunitLabels, sequences, spans, closingPairs, closingPairsSpan = [], {}, {}, {}, {}
+            for m in range(len(flanking) - 1):
+                start = (i if m == 0 else flanking[m][1]) + 1
+                stop = (j if m == len(flanking) - 2 else flanking[m + 1][0]) - 1
+                subunit = str(m + 1)
+                pair5p, pair5pSpan = pair(*flanking[m])
+                pair3p, pair3pSpan = pair(*flanking[m + 1])
+                subunitLabels.append(subunit)
+                sequences[subunit], spans[subunit] = segment(start, stop)
+                closingPairs[subunit] = (pair5p, pair3p)
+                closingPairsSpan[subunit] = (pair5pSpan, pair3pSpan)
+                annotation[start:stop + 1] = 'M' * (stop - start + 1)
+            multiLoops.append((f'M{len(multiLoops) + 1}', subunitLabels, sequences, spans, closingPairs, closingPairsSpan))
+
+    #bulges are numbered by the position of their first base
+    bulges.sort(key=lambda bulge: bulge[1][0])
+    bulges = [(f'B{n}', *bulge) for n, bulge in enumerate(bulges, 1)]
+    internalLoops = [(f'I{n}', '1', '2', *loop) for n, loop in enumerate(internalLoops, 1)]
+
+    #external loops between top level stems and ends outside of them
+    externalLoops, ends = [], []
+    exterior = _enclosedPairs(table, -1, length)
+    if not exterior:
+        if length:
+            ends.append(('E1', *segment(0, length - 1)))
+    else:
+        if exterior[0][0] > 0:
+            ends.append((f'E{len(ends) + 1}', *segment(0, exterior[0][0] - 1)))
+        for (k1, l1), (k2, l2) in zip(exterior, exterior[1:]):
+            if k2 - l1 > 1:
+                seq, span = segment(l1 + 1, k2 - 1)
+                externalLoops.append((f'X{len(externalLoops) + 1}', seq, span, *pair(k1, l1), *pair(k2, l2)))
+                annotation[l1 + 1:k2] = 'X' * (k2 - l1 - 1)
+        if exterior[-1][1] < length - 1:
+            ends.append((f'E{len(ends) + 1}', *segment(exterior[-1][1] + 1, length - 1)))
+
+    return (name, length, 1, sequence, dbn, ''.join(annotation), 'N' * length,
+            stems, hairpins, bulges, internalLoops, multiLoops, externalLoops, ncbps, ends)
+
+
+'''
+Function Name: annotateDotBrackets(records)
+Description: Generator that annotates many molecules. Records with an invalid dot-bracket are reported and skipped
+Parameters:
+        (records) - iterable of tuples - (sequence, dbn) or (name, sequence, dbn) for every molecule
+Return Type:
+        generator of tuples - annotated structures in the format produced by Structure._serialize()
+'''
+def annotateDotBrackets(records):
+    for record in records:
+        annotation = annotateDotBracket(*record[-2:], name=record[0] if len(record) == 3 else '')
+        if annotation is not None:
+            yield annotation
@@ -0,0 +1,661 @@
+'''
+Filename: StructureBinary.py
+Author: Michael Hathaway
+
+Description: The Structure Binary module stores parsed Structure objects in a packed columnar format so that a corpus only has to
+be parsed from structure type text once. A binary corpus is a directory of .npy files:
+
+    records.npy -- one row per structure with the offsets and lengths of its text fields and the rows of its components
+    sequence.npy, dbn.npy, structureArray.npy, varna.npy, name.npy -- shared uint8 buffers holding the text of every structure
+    componentArray.npy -- the int32 component arrays of every structure, one after another
+    componentLabels.npy -- the label table of every component array, as indices into strings.npy
+    strings.npy -- fixed width table of the labels and other short strings used by the components
+    stems.npy, hairpins.npy, bulges.npy, internalLoops.npy, multiLoops.npy, externalLoops.npy, ncbps.npy, ends.npy --
+        fixed width component tables. Spans and closing pairs are stored as integer and uint8 columns, and component sequences
+        are stored as offsets and lengths into sequence.npy. multiLoops.npy has one row per multiloop subunit.
+
+Every file is opened with np.load(mmap_mode='r'), so opening a corpus of any size only reads the file headers and the pages of
+the columns that are used. The Structure object reads and writes single records with Structure.loadBinary() and
+Structure.saveBinary(), and StructureCorpus.saveBinaryCorpus() packs a whole corpus.
+
+Structures can also be loaded with views=True. The sequences and annotations of the Structure and its components are then
+BufferView objects, which hold an (offset, length) into the memory mapped buffer and only decode their text when it is used,
+so the text of a large corpus stays in the page cache instead of the Python heap.
+'''
+
+## Module Imports ##
+import os
+import numpy as np
+
+FORMAT_VERSION = 2
+
+#text shorter than this is returned as a str by BinaryCorpus.record(views=True), since a BufferView is larger than a short str
+VIEW_MIN_LENGTH = 16
+
+#component table types in the order they are stored in a serialized Structure
+COMPONENT_TABLES = ('stems', 'hairpins', 'bulges', 'internalLoops', 'multiLoops', 'externalLoops', 'ncbps', 'ends')
+
+#text fields of a structure and their position in a serialized Structure
+TEXT_FIELDS = {'name': 0, 'sequence': 3, 'dbn': 4, 'structureArray': 5, 'varna': 6}
+
+## Column Types ##
+_SPAN = ('2<i4',)
+_PAIR = ('2u1',)
+_PAIRS = ('(2,2)u1',)
+_PAIRS_SPAN = ('(2,2)<i4',)
+
+RECORD_DTYPE = np.dtype(
+    [('length', '<i4'), ('pageNum', '<i4'), ('ascii', 'u1'), ('componentArrayOffset', '<i8'), ('componentLabelOffset', '<i8'), ('componentLabelCount', '<i4')] +
+    [(field + 'Offset', '<i8') for field in TEXT_FIELDS] + [(field + 'Length', '<i8') for field in TEXT_FIELDS] +
+    [(table + 'Row', '<i8') for table in COMPONENT_TABLES] + [(table + 'Count', '<i4') for table in COMPONENT_TABLES])
+
+TABLE_DTYPES = {
+    'stems': np.dtype([('record', '<i4'), ('label', '<i4'), ('sequence5pOffset', '<i8'), ('sequence5pLength', '<i4'),
+                       ('sequence3pOffset', '<i8'), ('sequence3pLength', '<i4'), ('span5p',) + _SPAN, ('span3p',) + _SPAN]),
+    'hairpins': np.dtype([('record', '<i4'), ('label', '<i4'), ('sequenceOffset', '<i8'), ('sequenceLength', '<i4'), ('span',) + _SPAN,
+                          ('closingPair',) + _PAIR, ('closingPairSpan',) + _SPAN, ('pk', '<i4')]),
+    'bulges': np.dtype([('record', '<i4'), ('label', '<i4'), ('sequenceOffset', '<i8'), ('sequenceLength', '<i4'), ('span',) + _SPAN,
+                        ('closingPair5p',) + _PAIR, ('closingPair5pSpan',) + _SPAN, ('closingPair3p',) + _PAIR, ('closingPair3pSpan',) + _SPAN, ('pk', '<i4')]),
+    'internalLoops': np.dtype([('record', '<i4'), ('label', '<i4'), ('label5p', '<i4'), ('label3p', '<i4'), ('loop5pOffset', '<i8'), ('loop5pLength', '<i4'),
+                               ('loop3pOffset', '<i8'), ('loop3pLength', '<i4'), ('span5p',) + _SPAN, ('span3p',) + _SPAN,
+                               ('closingPairs',) + _PAIRS, ('closingPairsSpan',) + _PAIRS_SPAN]),
+    'multiLoops': np.dtype([('record', '<i4'), ('label', '<i4'), ('subunit', '<i4'), ('sequenceOffset', '<i8'), ('sequenceLength', '<i4'),
+                            ('span',) + _SPAN, ('closingPairs',) + _PAIRS, ('closingPairsSpan',) + _PAIRS_SPAN]),
+    'externalLoops': np.dtype([('record', '<i4'), ('label', '<i4'), ('sequenceOffset', '<i8'), ('sequenceLength', '<i4'), ('span',) + _SPAN,
+                               ('closingPair5p',) + _PAIR, ('closingPair5pSpan',) + _SPAN, ('closingPair3p',) + _PAIR, ('closingPair3pSpan',) + _SPAN]),
+    'ncbps': np.dtype([('record', '<i4'), ('label', '<i4'), ('basePair',) + _PAIR, ('basePairSpan',) + _SPAN, ('parentUnit', '<i4')]),
+    'ends': np.dtype([('record', '<i4'), ('label', '<i4'), ('sequenceOffset', '<i8'), ('sequenceLength', '<i4'), ('span',) + _SPAN]),
+}
+
+
+'''
+## BUFFER VIEW OBJECT ##
+The BufferView object is a read only, str-like view of ascii text in a uint8 buffer. The text is only decoded when it is used:
+len(), indexing, slicing, iteration, comparisons, and hashing behave like the equivalent str, and str methods such as count()
+or upper() are run on the decoded text. Slices and str methods return str objects.
+
+Member variable -- data type -- description:
+self._buffer -- numpy array of uint8 -- buffer holding the text, usually a memory mapped BinaryCorpus column
+self._offset -- int -- offset of the text in the buffer
+self._length -- int -- length of the text
+'''
+class BufferView:
+    __slots__ = ('_buffer', '_offset', '_length')
+
+    #__init__() method for the BufferView object
+    def __init__(self, buffer, offset, length):
+        self._buffer = buffer
+        self._offset = offset
+        self._length = length
+
+    #define string representation of the view as the decoded text
+    def __str__(self):
+        return self.tobytes().decode('ascii')
+
+    def __repr__(self):
+        return repr(str(self))
+
+    def __format__(self, formatSpec):
+        return format(str(self), formatSpec)
+
+    #define len function for the view as the length of the text
+    def __len__(self):
+        return self._length
+
+    #indexing returns a single character and slicing returns a str
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._length)
+            if step == 1:
+                return bytes(self._buffer[self._offset + start:self._offset + max(start, stop)]).decode('ascii')
+            return str(self)[key]
+        if key < 0:
+            key += self._length
+        if not 0 <= key < self._length:
+            raise IndexError('BufferView index out of range')
+        return chr(self._buffer[self._offset + key])
+
+    def __iter__(self):
+        return iter(str(self))
+
+    def __contains__(self, item):
+        return str(item) in str(self)
+
+    #views compare and hash like the equivalent str, so they can be used as dictionary keys in place of str
+    def __eq__(self, other):
+        if isinstance(other, (str, BufferView)):
+            return str(self) == str(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __lt__(self, other):
+        return str(self) < str(other)
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __add__(self, other):
+        return str(self) + str(other)
+
+    def __radd__(self, other):
+        return str(other) + str(self)
+
+    #str methods that are not defined by the view are run on the decoded text
+    def __getattr__(self, name):
+        return getattr(str(self), name)
+
+    #pickling a view stores the decoded text, so views can be sent to worker processes
+    def __reduce__(self):
+        return (str, (str(self),))
+
+
+    '''
+    Function Name: tobytes()
+    Description: Function returns the text of the view as bytes without decoding it
+    Parameters: None
+    Return Type:
+            bytes
+    '''
+    def tobytes(self):
+        return bytes(self._buffer[self._offset:self._offset + self._length])
+
+
+    '''
+    Function Name: encode(encoding='utf-8', errors='strict')
+    Description: Function returns the encoded text. The text is ascii, so the bytes in the buffer are returned directly
+    Parameters:
+            (encoding='utf-8') - str - any ascii compatible encoding
+            (errors='strict') - str - unused, accepted for compatibility with str.encode()
+    Return Type:
+            bytes
+    '''
+    def encode(self, encoding='utf-8', errors='strict'):
+        return self.tobytes()
+
+
+'''
+Encoding helpers
+Bases are stored as ascii codes(0 for an empty base), and strings that may be None are stored as indices into the string
+table(-1 for None).
+'''
+def _encodePair(pair):
+    return tuple(ord(base) if base else 0 for base in pair)
+
+def _decodePair(codes):
+    return tuple(chr(code) if code else '' for code in codes)
+
+def _decodePairs(codes):
+    return (_decodePair(codes[0]), _decodePair(codes[1]))
+
+def _spans(spans):
+    return (tuple(spans[0]), tuple(spans[1]))
+
+
+'''
+Function Name: componentArguments(table, rows, strings, sequence)
+Description: Function converts rows of a component table into the StructureComponent constructor arguments stored by
+Structure._serialize()
+Parameters:
+        (table) - str - component table name
+        (rows) - iterable of tuples - table rows as python values, in the column order of TABLE_DTYPES[table]
+        (strings) - list of str - string table
+        (sequence) - function - function(offset, length) that returns a component sequence from the sequence buffer
+Return Type:
+        list of tuples - constructor arguments of each component. Consecutive multiloop subunit rows are grouped into one multiloop
+'''
+def componentArguments(table, rows, strings, sequence):
+    string = lambda i: strings[i] if i >= 0 else None #strings that may be None
+
+    if table == 'stems':
+        return [(strings[label], sequence(offset5p, length5p), sequence(offset3p, length3p), tuple(span5p), tuple(span3p))
+                for _, label, offset5p, length5p, offset3p, length3p, span5p, span3p in rows]
+    elif table == 'hairpins':
+        return [(strings[label], sequence(offset, length), tuple(span), _decodePair(closingPair), tuple(closingPairSpan), string(pk))
+                for _, label, offset, length, span, closingPair, closingPairSpan, pk in rows]
+    elif table == 'bulges':
+        return [(strings[label], sequence(offset, length), tuple(span), _decodePair(closingPair5p), tuple(closingPair5pSpan),
+                 _decodePair(closingPair3p), tuple(closingPair3pSpan), string(pk))
+                for _, label, offset, length, span, closingPair5p, closingPair5pSpan, closingPair3p, closingPair3pSpan, pk in rows]
+    elif table == 'internalLoops':
+        return [(strings[label], string(label5p), string(label3p), sequence(offset5p, length5p), sequence(offset3p, length3p),
+                 tuple(span5p), tuple(span3p), _decodePairs(closingPairs), _spans(closingPairsSpan))
+                for _, label, label5p, label3p, offset5p, length5p, offset3p, length3p, span5p, span3p, closingPairs, closingPairsSpan in rows]
+    elif table == 'multiLoops':
+        #multiloop subunits are stored one per row in order, so consecutive rows with the same label form a multiloop
+        multiLoops = []
+        for _, label, subunit, offset, length, span, closingPairs, closingPairsSpan in rows:
+            label, subunit = strings[label], strings[subunit]
+            if not multiLoops or multiLoops[-1][0] != label:
+                multiLoops.append((label, [], {}, {}, {}, {}))
+            multiLoops[-1][1].append(subunit)
+            multiLoops[-1][2][subunit] = sequence(offset, length)
+            multiLoops[-1][3][subunit] = tuple(span)
+            multiLoops[-1][4][subunit] = _decodePairs(closingPairs)
+            multiLoops[-1][5][subunit] = _spans(closingPairsSpan)
+        return multiLoops
+    elif table == 'externalLoops':
+        return [(strings[label], sequence(offset, length), tuple(span), _decodePair(closingPair5p), tuple(closingPair5pSpan),
+                 _decodePair(closingPair3p), tuple(closingPair3pSpan))
+                for _, label, offset, length, span, closingPair5p, closingPair5pSpan, closingPair3p, closingPair3pSpan in rows]
+    elif table == 'ncbps':
+        return [(strings[label], _decodePair(basePair), tuple(basePairSpan), string(parentUnit)) for _, label, basePair, basePairSpan, parentUnit in rows]
+    else:
+        return [(strings[label], sequence(offset, length), tuple(span)) for _, label, offset, length, span in rows]
+
+
+'''
+## BINARY CORPUS WRITER OBJECT ##
+The BinaryCorpusWriter object packs Structure objects into the columns of a binary corpus. Structures are added one at a time
+and the columns are written to the directory by close().
+
+Member variable -- data type -- description:
+self._directory -- str -- directory that the corpus is written to, or None for a writer that is only used for columns()
+self._records -- list -- record table rows
+self._rows -- dict -- component table name : list of rows
+self._buffers -- dict -- text field : list of encoded chunks
+self._bufferSizes -- dict -- text field : number of bytes written
+self._componentArrays -- list -- component arrays of the structures
+self._componentArraySize -- int -- number of component array entries written
+self._componentLabels -- list -- string table indices of the component label tables
+self._strings -- dict -- string : index in the string table
+self._ascii -- bool -- True if all of the text of the structure being added, other than its name, is ascii
+'''
+class BinaryCorpusWriter:
+    #__init__() method for the BinaryCorpusWriter object
+    def __init__(self, directory):
+        self._directory = directory
+        self._records = []
+        self._rows = {table: [] for table in COMPONENT_TABLES}
+        self._buffers = {field: [] for field in TEXT_FIELDS}
+        self._bufferSizes = {field: 0 for field in TEXT_FIELDS}
+        self._componentArrays = []
+        self._componentArraySize = 0
+        self._componentLabels = []
+        self._strings = {}
+        self._ascii = True
+
+    #define len function for the writer as the number of structures added
+    def __len__(self):
+        return len(self._records)
+
+    #allow the writer to be used in a with statement
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        if excType is None:
+            self.close()
+
+    #internal method that returns the string table index of a string, or -1 for None
+    def _string(self, value):
+        if value is None:
+            return -1
+        return self._strings.setdefault(value, len(self._strings))
+
+    #internal method that appends text to a shared buffer and returns its (offset, length). None is stored with length -1
+    def _appendText(self, field, text):
+        if text is None:
+            return (self._bufferSizes[field], -1)
+        if field != 'name' and not text.isascii():
+            self._ascii = False
+        data = text.encode('utf-8')
+        offset = self._bufferSizes[field]
+        self._buffers[field].append(data)
+        self._bufferSizes[field] += len(data)
+        return (offset, len(data))
+
+    #internal method that returns the (offset, length) of a component sequence in the sequence buffer. Sequences that match the
+    #molecule sequence at their span point into the molecule. Other sequences are appended to the buffer
+    def _componentSequence(self, sequence, span, molecule, moleculeOffset):
+        start = span[0] - 1
+        if sequence is not None and molecule is not None and 0 <= start and molecule[start:start+len(sequence)] == sequence:
+            return (moleculeOffset + start, len(sequence))
+        return self._appendText('sequence', sequence)
+
+
+    '''
+    Function Name: add(structure)
+    Description: Function adds a Structure object to the corpus
+    Parameters:
+            (structure) - Structure - the structure to add
+    Return Type:
+            int - index of the structure in the corpus
+    '''
+    def add(self, structure):
+        data = structure._serialize()
+        stems, hairpins, bulges, internalLoops, multiLoops, externalLoops, ncbps, ends = data[7:]
+        recordIndex = len(self._records)
+        self._ascii = True
+
+        #text fields
+        text = {field: self._appendText(field, data[position]) for field, position in TEXT_FIELDS.items()}
+        molecule = data[3] if data[3] is not None and data[3].isascii() else None #byte offsets equal string offsets
+        moleculeOffset = text['sequence'][0]
+
+        #component array and its label table
+        componentArray = structure.componentIdArray()
+        if componentArray is None:
+            componentArray = np.zeros(0, dtype=np.int32)
+        componentArrayOffset = self._componentArraySize
+        self._componentArrays.append(np.asarray(componentArray, dtype=np.int32))
+        self._componentArraySize += len(componentArray)
+        componentLabelOffset = len(self._componentLabels)
+        self._componentLabels.extend(self._string(label) for label in structure._componentLabels)
+
+        rows = self._rows
+        tableRows = {table: len(rows[table]) for table in COMPONENT_TABLES}
+        for label, sequence5p, sequence3p, span5p, span3p in stems:
+            rows['stems'].append((recordIndex, self._string(label)) + self._componentSequence(sequence5p, span5p, molecule, moleculeOffset) +
+                                 self._componentSequence(sequence3p, span3p, molecule, moleculeOffset) + (span5p, span3p))
+        for label, sequence, span, closingPair, closingPairSpan, pk in hairpins:
+            rows['hairpins'].append((recordIndex, self._string(label)) + self._componentSequence(sequence, span, molecule, moleculeOffset) +
+                                    (span, _encodePair(closingPair), closingPairSpan, self._string(pk)))
+        for label, sequence, span, closingPair5p, closingPair5pSpan, closingPair3p, closingPair3pSpan, pk in bulges:
+            rows['bulges'].append((recordIndex, self._string(label)) + self._componentSequence(sequence, span, molecule, moleculeOffset) +
+                                  (span, _encodePair(closingPair5p), closingPair5pSpan, _encodePair(closingPair3p), closingPair3pSpan, self._string(pk)))
+        for label, label5p, label3p, loop5p, loop3p, span5p, span3p, closingPairs, closingPairsSpan in internalLoops:
+            rows['internalLoops'].append((recordIndex, self._string(label), self._string(label5p), self._string(label3p)) +
+                                         self._componentSequence(loop5p, span5p, molecule, moleculeOffset) + self._componentSequence(loop3p, span3p, molecule, moleculeOffset) +
+                                         (span5p, span3p, tuple(_encodePair(pair) for pair in closingPairs), closingPairsSpan))
+        for label, subunitLabels, sequences, spans, closingPairs, closingPairsSpan in multiLoops:
+            for subunit in subunitLabels:
+                rows['multiLoops'].append((recordIndex, self._string(label), self._string(subunit)) +
+                                          self._componentSequence(sequences[subunit], spans[subunit], molecule, moleculeOffset) +
+                                          (spans[subunit], tuple(_encodePair(pair) for pair in closingPairs[subunit]), closingPairsSpan[subunit]))
+        for label, sequence, span, closingPair5p, closingPair5pSpan, closingPair3p, closingPair3pSpan in externalLoops:
+            rows['externalLoops'].append((recordIndex, self._string(label)) + self._componentSequence(sequence, span, molecule, moleculeOffset) +
+                                         (span, _encodePair(closingPair5p), closingPair5pSpan, _encodePair(closingPair3p), closingPair3pSpan))
+        for label, basePair, basePairSpan, parentUnit in ncbps:
+            rows['ncbps'].append((recordIndex, self._string(label), _encodePair(basePair), basePairSpan, self._string(parentUnit)))
+        for label, sequence, span in ends:
+            rows['ends'].append((recordIndex, self._string(label)) + self._componentSequence(sequence, span, molecule, moleculeOffset) + (span,))
+
+        self._records.append((data[1] if data[1] is not None else 0, data[2] if data[2] is not None else -1, self._ascii, componentArrayOffset,
+                              componentLabelOffset, len(structure._componentLabels)) +
+                             tuple(text[field][0] for field in TEXT_FIELDS) + tuple(text[field][1] for field in TEXT_FIELDS) +
+                             tuple(tableRows[table] for table in COMPONENT_TABLES) + tuple(len(rows[table]) - tableRows[table] for table in COMPONENT_TABLES))
+        return recordIndex
+
+
+    '''
+    Function Name: columns()
+    Description: Function returns the columns of the corpus as in-memory numpy arrays, keyed by the name of their .npy file
+    Parameters: None
+    Return Type:
+            dict - column name : numpy array
+    '''
+    def columns(self):
+        columns = {'version': np.array([FORMAT_VERSION], dtype=np.int32), 'records': np.array(self._records, dtype=RECORD_DTYPE)}
+        for field in TEXT_FIELDS:
+            columns[field] = np.frombuffer(b''.join(self._buffers[field]), dtype=np.uint8)
+        columns['componentArray'] = np.concatenate(self._componentArrays) if self._componentArrays else np.zeros(0, dtype=np.int32)
+        columns['componentLabels'] = np.array(self._componentLabels, dtype=np.int32)
+        strings = sorted(self._strings, key=self._strings.get)
+        columns['strings'] = np.array(strings, dtype=f'<U{max([len(string) for string in strings] + [1])}')
+        for table in COMPONENT_TABLES:
+            columns[table] = np.array(self._rows[table], dtype=TABLE_DTYPES[table])
+        return columns
+
+
+    '''
+    Function Name: close()
+    Description: Function writes the columns of the corpus to the directory
+    Parameters: None
+    Return Type:
+            None
+    '''
+    def close(self):
+        os.makedirs(self._directory, exist_ok=True)
+        for name, column in self.columns().items():
+            np.save(os.path.join(self._directory, name + '.npy'), column)
+
+
+'''
+Function Name: writeBinaryCorpus(structures, directory)
+Description: Function writes Structure objects to a binary corpus directory
+Parameters:
+        (structures) - iterable of Structure objects
+        (directory) - str - directory to write. It is created if it does not exist
+Return Type:
+        int - number of structures written
+'''
+def writeBinaryCorpus(structures, directory):
+    with BinaryCorpusWriter(directory) as writer:
+        for structure in structures:
+            writer.add(structure)
+    return len(writer)
+
+
+'''
+## BINARY CORPUS OBJECT ##
+The BinaryCorpus object opens a binary corpus directory. All of the columns are memory mapped, so opening the corpus is
+independent of its size and only the pages that are used are read from disk.
+
+Member variable -- data type -- description:
+self._directory -- str -- directory of the corpus
+self._records -- numpy memmap -- record table
+self._text -- dict -- text field : uint8 memmap buffer
+self._componentArray -- numpy memmap -- concatenated component arrays
+self._componentLabels -- numpy memmap -- concatenated component label tables
+self._strings -- numpy memmap -- string table
+self._stringList -- list -- string table as python strings
+self._tables -- dict -- component table name : numpy memmap
+'''
+class BinaryCorpus:
+    #__init__() method for the BinaryCorpus object
+    def __init__(self, directory):
+        load = lambda name: np.load(os.path.join(directory, name + '.npy'), mmap_mode='r')
+        version = int(load('version')[0])
+        if version != FORMAT_VERSION:
+            raise ValueError(f'{directory} is binary corpus format version {version}. Expected version {FORMAT_VERSION}.')
+
+        self._directory = directory
+        self._records = load('records')
+        self._text = {field: load(field) for field in TEXT_FIELDS}
+        self._componentArray = load('componentArray')
+        self._componentLabels = load('componentLabels')
+        self._strings = load('strings')
+        self._stringList = self._strings.tolist()
+        self._tables = {table: load(table) for table in COMPONENT_TABLES}
+
+    #define len function as the number of structures in the corpus
+    def __len__(self):
+        return len(self._records)
+
+    #define string representation of the corpus
+    def __str__(self):
+        return f'Binary Corpus: {self._directory} ({len(self)} structures)'
+
+    #internal method that decodes a string table index
+    def _string(self, index):
+        return self._stringList[index] if index >= 0 else None
+
+    #internal method that decodes a slice of a text buffer
+    def _decode(self, field, offset, length):
+        if length < 0:
+            return None
+        return bytes(self._text[field][offset:offset+length]).decode('utf-8')
+
+    #internal method that returns the component table rows of a record
+    def _tableRows(self, table, index):
+        record = self._records[index]
+        start = int(record[table + 'Row'])
+        return self._tables[table][start:start + int(record[table + 'Count'])]
+
+    #internal method that returns the component table rows of a record as tuples of python values. The columns are converted
+    #with tolist() one at a time, which also turns the span and closing pair columns into lists
+    def _tableColumns(self, table, index):
+        rows = self._tableRows(table, index)
+        return zip(*[rows[name].tolist() for name in rows.dtype.names])
+
+
+    '''
+    Function Name: text(field, index)
+    Description: Function returns a text field of a structure without building the Structure object
+    Parameters:
+            (field) - str - 'name', 'sequence', 'dbn', 'structureArray', or 'varna'
+            (index) - int - index of the structure in the corpus
+    Return Type:
+            str or None
+    '''
+    def text(self, field, index):
+        record = self._records[index]
+        return self._decode(field, int(record[field + 'Offset']), int(record[field + 'Length']))
+
+
+    '''
+    Function Name: view(field, index)
+    Description: Function returns a text field of an ascii structure as a BufferView into the memory mapped buffer. Text shorter
+    than VIEW_MIN_LENGTH and text of structures that are not ascii is returned as a str
+    Parameters:
+            (field) - str - 'sequence', 'dbn', 'structureArray', or 'varna'
+            (index) - int - index of the structure in the corpus
+    Return Type:
+            BufferView, str, or None
+    '''
+    def view(self, field, index):
+        record = self._records[index]
+        if not record['ascii']:
+            return self.text(field, index)
+        return self._view(self._text[field], int(record[field + 'Offset']), int(record[field + 'Length']))
+
+    #internal method that returns a BufferView of ascii text in a buffer, or a str if the text is short
+    def _view(self, buffer, offset, length):
+        if length < 0:
+            return None
+        if length < VIEW_MIN_LENGTH:
+            return bytes(buffer[offset:offset+length]).decode('ascii')
+        return BufferView(buffer, offset, length)
+
+
+    '''
+    Function Name: sequence(index)
+    Description: Function returns the sequence of a structure without building the Structure object
+    Parameters:
+            (index) - int - index of the structure in the corpus
+    Return Type:
+            str
+    '''
+    def sequence(self, index):
+        return self.text('sequence', index)
+
+
+    '''
+    Function Name: componentArray(index)
+    Description: Function returns the int32 component array of a structure as a read only view into the corpus
+    Parameters:
+            (index) - int - index of the structure in the corpus
+    Return Type:
+            numpy array of int32
+    '''
+    def componentArray(self, index):
+        record = self._records[index]
+        offset = int(record['componentArrayOffset'])
+        return self._componentArray[offset:offset + int(record['length'])]
+
+
+    '''
+    Function Name: componentLabels(index)
+    Description: Function returns the label table of the component array of a structure
+    Parameters:
+            (index) - int - index of the structure in the corpus
+    Return Type:
+            list of str - label of each component id
+    '''
+    def componentLabels(self, index):
+        record = self._records[index]
+        offset = int(record['componentLabelOffset'])
+        return [self._string(i) for i in self._componentLabels[offset:offset + int(record['componentLabelCount'])].tolist()]
+
+
+    '''
+    Function Name: columns()
+    Description: Function returns every memory mapped column of the corpus, keyed by the name of its .npy file. The keys match
+    BinaryCorpusWriter.columns()
+    Parameters: None
+    Return Type:
+            dict - column name : numpy memmap
+    '''
+    def columns(self):
+        columns = {'records': self._records, 'componentArray': self._componentArray, 'componentLabels': self._componentLabels, 'strings': self._strings}
+        columns.update(self._text)
+        columns.update(self._tables)
+        return columns
+
+
+    '''
+    Function Name: table(name)
+    Description: Function returns a whole component table as a memory mapped structured array
+    Parameters:
+            (name) - str - 'stems', 'hairpins', 'bulges', 'internalLoops', 'multiLoops', 'externalLoops', 'ncbps', or 'ends'
+    Return Type:
+            numpy memmap
+    '''
+    def table(self, name):
+        return self._tables[name]
+
+
+    '''
+    Function Name: componentSequences(name, field='sequence')
+    Description: Function returns the sequences of every row of a component table
+    Parameters:
+            (name) - str - component table name
+            (field='sequence') - str - prefix of the offset and length columns, for example 'sequence5p' for stems or 'loop3p' for internal loops
+    Return Type:
+            list of str
+    '''
+    def componentSequences(self, name, field='sequence'):
+        table = self._tables[name]
+        return [self._decode('sequence', offset, length) for offset, length in zip(table[field + 'Offset'].tolist(), table[field + 'Length'].tolist())]
+
+
+    '''
+    Function Name: header(index, views=False)
+    Description: Function reads the molecule information of a structure, which is the start of the tuple returned by record()
+    Parameters:
+            (index) - int - index of the structure in the corpus
+            (views=False) - bool - when true, the annotations of ascii records are returned as BufferView objects. See record()
+    Return Type:
+            tuple - (name, length, page number, sequence, dot-bracket, structure array, VARNA)
+    '''
+    def header(self, index, views=False):
+        record = self._records[index]
+        views = views and bool(record['ascii'])
+        text = {field: self.view(field, index) if views and field != 'name' else self.text(field, index) for field in TEXT_FIELDS}
+        pageNum = int(record['pageNum'])
+        return (text['name'], int(record['length']), pageNum if pageNum >= 0 else None, text['sequence'], text['dbn'], text['structureArray'], text['varna'])
+
+
+    '''
+    Function Name: record(index, views=False)
+    Description: Function reads a structure in the format produced by Structure._serialize(). Structure.loadBinary() and
+    StructureCorpus.iterBinaryStructures() turn records into Structure objects
+    Parameters:
+            (index) - int - index of the structure in the corpus
+            (views=False) - bool - when true, the sequences and annotations of ascii records that are at least VIEW_MIN_LENGTH
+                            long are returned as BufferView objects into the memory mapped buffers instead of str objects
+    Return Type:
+            tuple
+    '''
+    def record(self, index, views=False):
+        record = self._records[index]
+        views = views and bool(record['ascii'])
+
+        if views:
+            buffer = self._text['sequence']
+            sequence = lambda offset, length: self._view(buffer, offset, length)
+        else:
+            #the component sequences of a record point into its molecule sequence or follow it in the buffer, so the record's
+            #part of the sequence buffer is read once and the component sequences are decoded from it
+            start = int(record['sequenceOffset'])
+            end = int(self._records[index + 1]['sequenceOffset']) if index + 1 < len(self._records) else len(self._text['sequence'])
+            block = bytes(self._text['sequence'][start:end])
+            sequence = lambda offset, length: block[offset-start:offset-start+length].decode('utf-8') if length >= 0 else None
+
+        stems, hairpins, bulges, internalLoops, multiLoops, externalLoops, ncbps, ends = [
+            componentArguments(table, self._tableColumns(table, index), self._stringList, sequence) for table in COMPONENT_TABLES]
+
+        return self.header(index, views) + (stems, hairpins, bulges, internalLoops, multiLoops, externalLoops, ncbps, ends)
@@ -4,25 +4,28 @@ Author: Michael Hathaway
 
 Description: The Structure Components module defines individual classes for each of the secondary structures defined in the Structure
 Type file. These classes are: Stem, Bulge, Hairpin, InternalLoop, ExternalLoop, MultiLoop, PseudoKnot, End, and NCBP.
+The member variables of the component classes are declared in __slots__, so components do not carry a per-instance __dict__.
 '''
 
 ## Module Imports ##
 import numpy as np
-import logging
+import copy
+
+## Diagnostics Imports ##
+#warnings from the energy functions are counted by the Diagnostics collector. Messages are only formatted when the collector uses them
+from Diagnostics import report
 
 ## Free Energy Parameter Imports ##
-from parameters.LoopInitiationEnergy import InternalLoopInit, BulgeInit, HairpinInit #initiation parameters for internal loops, bulges, and hairpins
-from parameters.StackingEnergies import StackingEnergies #Watson-Crick stacking interaction parameters
-from parameters.InnerLoop_1x1_Energies import InnerLoop_1x1_Energies #Stabilities for 1x1 internal loops
-from parameters.InnerLoop_1x2_Energies import InnerLoop_1x2_Energies #Stabilities for 1x2 internal loops
-from parameters.InnerLoop_2x2_Energies import InnerLoop_2x2_Energies #Stabilities for 2x2 internal loops
-from parameters.InnerLoopMismatches import InnerLoopMismatches_2x3, OtherInnerLoopMismtaches #energy values for 2x3 inner loop mismatches
-from parameters.StackTerminalMismatches import StackTerminalMismatches #stacking terminal mismatches for Hairpin calculations
-from parameters.SpecialHairpins import SpecialHairpins #special case hairpins with precalculated energies
+#the Turner parameter dictionaries are compiled into numpy tables by the EnergyTables module. The accessors return None for missing parameters
+from EnergyTables import R, T, parameterSetId
+from EnergyTables import hairpinInitEnergy, bulgeInitEnergy, internalLoopInitEnergy #initiation parameters for internal loops, bulges, and hairpins
+from EnergyTables import stackEnergy #Watson-Crick stacking interaction parameters
+from EnergyTables import internalLoop1x1Energy, internalLoop1x2Energy, internalLoop2x2Energy #Stabilities for 1x1, 1x2, and 2x2 internal loops
+from EnergyTables import mismatch2x3Energy, mismatchOtherEnergy #energy values for inner loop mismatches
+from EnergyTables import terminalMismatchEnergy #stacking terminal mismatches for Hairpin calculations
+from EnergyTables import specialHairpinEnergy, SPECIAL_HAIRPIN_LENGTHS #special case hairpins with precalculated energies
 
 ## Free Energy Parameter Constants ##
-R = 0.001987204258 #source: https://en.wikipedia.org/wiki/Gas_constant
-T = 310.15
 
 #Stems(source: https://rna.urmc.rochester.edu/NNDB/turner04/wc-parameters.html)
 INTERMOLECULAR_INIT = 4.09 #intermolecular initiation value
@@ -31,11 +34,17 @@ STEM_AU_END_PENALTY = 0.45
 
 #Inner loops
 INNER_LOOP_ASYMMETRY_PENALTY = 0.6
+INNER_LOOP_CLOSING_PENALTY = 0.7
 
 #Bulges
 SPECIAL_C_BULGE = -0.9
 BULGE_AU_END_PENALTY = 0.45
 
+#Multiloops(linear multibranch loop model, source: Mathews et al. 1999, J Mol Biol 288:911-940)
+MULTILOOP_A = 3.4 #multiloop initiation
+MULTILOOP_BRANCH = 0.4 #per helix closing or branching from the multiloop
+MULTILOOP_UNPAIRED = 0.0 #per unpaired nucleotide in the multiloop
+
 #Hairpins
 HAIRPIN_UU_GA_FIRST_MISMATCH_BONUS = -0.9
 HAIRPIN_GG_FIRST_MISMATCH_BONUS = -0.8
@@ -47,13 +56,39 @@ HAIRPIN_C_LOOP_B = 1.6
 #other Constants
 CANONICAL_BASE_PAIRS = [('A', 'U'), ('U', 'A'), ('G', 'C'), ('C', 'G'), ('G', 'U'), ('U', 'G')]
 
+
 '''
--- set logging configuration --
-Logging file will be used to record errors associated with the StructureComponent energy functions. These errors
-are usually related to missing parameters for the energy calculation.
+Mutation helpers
+Used by the _withMutations() methods to build mutant copies of components for mutational scanning. Mutations are given as a
+dictionary of 1-indexed sequence position : new base.
 '''
-logging.basicConfig(filename='./StructureComponents.log', level=logging.WARNING, filemode='a', format='%(process)d - %(levelname)s - %(message)s')
-
+#returns the sequence that starts at position start with the mutated bases substituted
+def _substituteSequence(sequence, start, mutations):
+    if not any(start <= position < start + len(sequence) for position in mutations):
+        return sequence
+    return ''.join(mutations.get(start + i, base) for i, base in enumerate(sequence))
+
+#returns the base pair at the locations in span with the mutated bases substituted
+def _substitutePair(pair, span, mutations):
+    return (mutations.get(span[0], pair[0]), mutations.get(span[1], pair[1]))
+
+#returns a shallow copy of a component that has no memoized energies and no owning Structure
+def _mutantCopy(component):
+    mutant = copy.copy(component)
+    mutant._energyCache = {}
+    mutant._structure = None
+    return mutant
+
+#returns the change in energy of a loop for the point mutation of position to base by evaluating a mutant copy of the loop.
+#energy is the energy of the unmutated loop. Energies that can not be calculated count as 0 in non-strict mode, and None is
+#returned in strict mode when the mutant has no energy
+def _copyMutationDelta(component, position, base, energy, strict, temperature):
+    mutantEnergy = component._withMutations({position: base}).energy(strict=strict, temperature=temperature)
+    if mutantEnergy is None:
+        if strict:
+            return None
+        mutantEnergy = 0.0
+    return mutantEnergy - (energy if energy is not None else 0.0)
 
 '''
 ## STEM OBJECT ##
@@ -63,11 +98,14 @@ Member variable -- data type -- description:
 self._label -- String -- the label for the stem as defined in the structure type file.
 self._sequence5p -- String -- the 5' portion of the stem sequence.
 self._sequence3p -- String -- the 3' portion of the stem sequence.
+self._sequence -- list -- (5' base, 3' base) tuples for the base pairs of the stem. None until it is first used.
 self._sequenceLen -- Int -- the length of the stem in number of base pairs.
 self._sequence5p_index -- (int, int) -- tuple containing the integer value start and stop indices for the 5' portion of the stem sequence.
 self._sequence3p_index -- (int, int) -- tuple containing the integer value start and stop indices for the 3' portion of the stem sequence.
 self._neighbor5p -- str -- label for 5' neighbor in Structure object
 self._neighbor3p -- str -- label for 5' neighbor in Structure object
+self._energyCache -- dict -- memoized energies keyed by (strict, init, temperature, parameter set id)
+self._structure -- Structure -- the Structure object that owns the stem, notified when the stem changes
 
 
             5' Sequence
@@ -80,18 +118,22 @@ self._neighbor3p -- str -- label for 5' neighbor in Structure object
 
 '''
 class Stem:
+    __slots__ = ('_label', '_sequence5p', '_sequence3p', '_sequence', '_sequenceLen', '_sequence5pSpan', '_sequence3pSpan', '_neighbor5p', '_neighbor3p', '_adjacentBulges', '_energyCache', '_structure')
+
     # __init__ method for stem object
     def __init__(self, label="", sequence5p="", sequence3p="", sequence5pSpan=(-1, -1), sequence3pSpan=(-1, -1), neighbor5p=('', ''), neighbor3p=('', ''), adjacentBulges=(False, False)):
         self._label = label #sequence label
         self._sequence5p = sequence5p #5' portion of stem
         self._sequence3p = sequence3p #3' portion of stem
-        self._sequence = list(zip(list(self._sequence5p), list(self._sequence3p[::-1])))
+        self._sequence = None #list of base pair tuples, built on first use by _pairs()
         self._sequenceLen = (len(sequence5p) + len(sequence3p)) // 2 #sequence length
         self._sequence5pSpan = sequence5pSpan #tuple containing start and stop indices of 5' prime portion of stem
         self._sequence3pSpan = sequence3pSpan #tuple containing start and stop indices of 3' prime portion of stem
         self._neighbor5p = neighbor5p
         self._neighbor3p = neighbor3p
         self._adjacentBulges = adjacentBulges
+        self._energyCache = {} #(strict, init, temperature, parameter set id) : energy
+        self._structure = None #Structure that owns the stem
 
     ###
     ### Internal Methods
@@ -105,10 +147,17 @@ class Stem:
     def __len__(self):
         return self._sequenceLen
 
-    #Internal method to set the object _sequence member variable as a list of tuples based on the 5' and 3' sequence variables
+    #Internal method to reset the object _sequence member variable after the 5' or 3' sequence is changed. The list of base pair
+    #tuples is rebuilt by _pairs() the next time it is used
     def _setSequence(self):
         if len(self._sequence5p) == len(self._sequence3p):
-            self._sequence = list(zip(list(self._sequence5p), list(self._sequence3p[::-1])))
+            self._sequence = None
+
+    #Internal method that returns the _sequence member variable, building the list of base pair tuples from the 5' and 3' sequences on first use
+    def _pairs(self):
+        if self._sequence is None:
+            self._sequence = list(zip(self._sequence5p, self._sequence3p[::-1]))
+        return self._sequence
 
     #internal method to update the sequenceLen member variable when the sequence is changed by the user
     def _setSequenceLen(self):
@@ -117,6 +166,7 @@ class Stem:
     #internal method used during Structure object parsing to track if stem is next to length=1 bulges
     def _addAdjacentBulgeBoolean(self, bulge5p, bulge3p):
         self._adjacentBulges = (bulge5p, bulge3p)
+        self._invalidateEnergy()
 
     #Internal method that returns tuple containg booleans for whether or not the stem is adjacent to length=1 bulges
     def _adjacentBulgeBoolean(self):
@@ -127,6 +177,90 @@ class Stem:
         self._neighbor5p = neighbor5p
         self._neighbor3p = neighbor3p
 
+    #internal method to set the Structure that is notified when the stem changes
+    def _setStructure(self, structure):
+        self._structure = structure
+
+    #internal method to clear the memoized energies after the stem changes and notify the owning Structure
+    def _invalidateEnergy(self):
+        self._energyCache.clear()
+        if self._structure is not None:
+            self._structure._componentChanged(self)
+
+    #internal method that returns a copy of the stem with the mutations({position: base}) applied. The stem is not changed
+    def _withMutations(self, mutations):
+        mutant = _mutantCopy(self)
+        mutant._sequence5p = _substituteSequence(self._sequence5p, self._sequence5pSpan[0], mutations)
+        mutant._sequence3p = _substituteSequence(self._sequence3p, self._sequence3pSpan[0], mutations)
+        mutant._setSequence()
+        return mutant
+
+    #internal method that returns the number of locations where the 5' and 3' sequences differ. Used by _pointMutationDelta() to
+    #update the symmetry term without comparing the full sequences for every mutation
+    def _mutationState(self):
+        return sum(base5p != base3p for base5p, base3p in zip(self._sequence5p, self._sequence3p))
+
+    #internal method that returns the change in energy for the point mutation of position to base, or None in strict mode when the
+    #mutant stem has no energy. Only the stacks that contain the mutated pair, the end penalty of a mutated terminal pair, and the
+    #symmetry term are recalculated. differences is the value of _mutationState() and energy is the energy of the unmutated stem
+    def _pointMutationDelta(self, position, base, differences, energy, strict, temperature):
+        if self._sequenceLen == 1: #stems of length 1 have no energy with or without the mutation
+            return 0.0
+
+        pairs = self._pairs()
+        if self._sequence5pSpan[0] <= position <= self._sequence5pSpan[1]:
+            offset = position - self._sequence5pSpan[0]
+            index = offset
+            mutantPair = (base, pairs[index][1])
+            wildTypeBase, opposite = self._sequence5p[offset], self._sequence3p[offset]
+        else:
+            offset = position - self._sequence3pSpan[0]
+            index = self._sequenceLen - 1 - offset
+            mutantPair = (pairs[index][0], base)
+            wildTypeBase, opposite = self._sequence3p[offset], self._sequence5p[offset]
+
+        #symmetry term(the stem is symmetric when the 5' and 3' sequences do not differ at any location)
+        mutantDifferences = differences - (wildTypeBase != opposite) + (base != opposite)
+        delta = STEM_SYMMETRY_PENALTY * ((mutantDifferences == 0) - (differences == 0))
+
+        #AU end penalties
+        adjacentBulges = self._adjacentBulgeBoolean()
+        if index == 0:
+            delta += self._endPenalty(mutantPair, adjacentBulges[0]) - self._endPenalty(pairs[index], adjacentBulges[0])
+        if index == self._sequenceLen - 1:
+            delta += self._endPenalty(mutantPair, adjacentBulges[1]) - self._endPenalty(pairs[index], adjacentBulges[1])
+
+        #stacking interactions of the mutated pair with its neighbors
+        for neighbor in (index - 1, index + 1):
+            if not 0 <= neighbor < self._sequenceLen:
+                continue
+            if neighbor < index:
+                wildTypeStack = stackEnergy(pairs[neighbor], pairs[index], temperature)
+                mutantStack = self._stackEnergy(pairs[neighbor], mutantPair, temperature)
+            else:
+                wildTypeStack = stackEnergy(pairs[index], pairs[neighbor], temperature)
+                mutantStack = self._stackEnergy(mutantPair, pairs[neighbor], temperature)
+            if mutantStack is None:
+                if strict:
+                    return None
+                mutantStack = 0.0 #missing stacks are skipped in non-strict mode
+            delta += mutantStack - (wildTypeStack if wildTypeStack is not None else 0.0)
+
+        return delta
+
+    #internal method that returns the AU/GU end penalty for a terminal pair of the stem. No penalty is applied next to a length 1 bulge
+    def _endPenalty(self, pair, adjacentBulge):
+        if pair in (('A', 'U'), ('U', 'A'), ('G', 'U'), ('U', 'G')) and adjacentBulge == False:
+            return STEM_AU_END_PENALTY
+        return 0
+
+    #internal method that returns the stacking energy of two adjacent pairs of the stem, or None if the parameter is missing
+    def _stackEnergy(self, pair, nextPair, temperature):
+        stackingEnergy = stackEnergy(pair, nextPair, temperature)
+        if stackingEnergy is None:
+            report('Stem', ('stack', pair, nextPair), 'In energy() function for Stem: {}, Stacking energy not found for {} and {}.', self._label, pair, nextPair)
+        return stackingEnergy
+
     ###
     ### User Accesible Methods
     ###
@@ -159,6 +293,7 @@ class Stem:
             if(len(newSequence) == self._sequenceLen): #check that sequence length matchees other 3' sequences
                 self._sequence5p = newSequence
                 self._setSequence() #reset the self._sequence variable
+                self._invalidateEnergy()
             else:
                 print('Unable to set new 5\' sequence')
         else:
@@ -178,6 +313,7 @@ class Stem:
             if(len(newSequence) == self._sequenceLen): #check that sequence length matchees other 5' sequences
                 self._sequence3p = newSequence
                 self._setSequence() #reset the self._sequence variable
+                self._invalidateEnergy()
             else:
                 print('Unable to set new 3\' sequence')
         else:
@@ -200,10 +336,11 @@ class Stem:
                 self._sequence3p = sequence3p
                 self._setSequence()
                 self._setSequenceLen()
+                self._invalidateEnergy()
             else:
                 print('Could not set the stem sequence because the 5\' and 3\' sequences are different lengths.')
         else:
-            return self._sequence
+            return self._pairs()
 
 
     '''
@@ -269,21 +406,29 @@ class Stem:
             bool - true or false as to whether or not the stem contains all cannonical base pairings
     '''
     def canonical(self):
-        return (self._sequenceLen > 1 and all(pair in CANONICAL_BASE_PAIRS for pair in self._sequence))
+        return (self._sequenceLen > 1 and all(pair in CANONICAL_BASE_PAIRS for pair in self._pairs()))
 
 
     '''
     Function: Stem.energy()
-    Description: function calculates the folding free energy change for the stem
+    Description: function calculates the folding free energy change for the stem. The result is memoized until the stem is changed
     Parameters:
             (strict=True) -- bool -- when true, energy values will only be calculated for cannonical stems/stems with all present energy parameters
             (init=False) -- bool -- when true, the 4.09 Kcal/mol initiation value is inlcuded in energy calculations.
+            (temperature=T) -- float -- temperature in Kelvin used for the stacking energies
     Return Value:
             float - the calculated energy value for the given stem
     '''
-    def energy(self, strict=True, init=False):
+    def energy(self, strict=True, init=False, temperature=T):
+        key = (strict, init, temperature, parameterSetId())
+        if key not in self._energyCache:
+            self._energyCache[key] = self._stemEnergy(strict, init, temperature)
+        return self._energyCache[key]
+
+    #internal method that calculates the energy of the stem. See Stem.energy()
+    def _stemEnergy(self, strict, init, temperature):
         if(self._sequenceLen == 1):
-            logging.warning(f'In energy() function for Stem: {self._label}, cannot calculate energy for stem of length 1.')
+            report('Stem', 'length', 'In energy() function for Stem: {}, cannot calculate energy for stem of length 1.', self._label)
             return None
 
         seq = self.sequence() #get stem as list of tuple base pairs
@@ -295,18 +440,16 @@ class Stem:
 
         #check for AU end penalty
         endPenalty = 0
-        if (seq[0] == ('A', 'U') or seq[0] == ('U', 'A') or seq[0] == ('G', 'U') or seq[0] == ('U', 'G')) and (self._adjacentBulgeBoolean()[0] == False):
-            endPenalty += STEM_AU_END_PENALTY
-        if (seq[-1] == ('A', 'U') or seq[-1] == ('U', 'A') or seq[-1] == ('G', 'U') or seq[-1] == ('U', 'G')) and (self._adjacentBulgeBoolean()[1] == False):
-            endPenalty += STEM_AU_END_PENALTY
+        endPenalty += self._endPenalty(seq[0], self._adjacentBulgeBoolean()[0])
+        endPenalty += self._endPenalty(seq[-1], self._adjacentBulgeBoolean()[1])
 
         #sum up watson crick stacking interactions
         stack = 0
         for i in range(0, self._sequenceLen-1):
-            try:
-                stack += StackingEnergies[seq[i]][seq[i+1]]
-            except KeyError:
-                logging.warning(f'In energy() function for Stem: {self._label}, Stacking energy not found for {seq[i]} and {seq[i+1]}.')
+            stackingEnergy = self._stackEnergy(seq[i], seq[i+1], temperature)
+            if stackingEnergy is not None:
+                stack += stackingEnergy
+            else:
                 if strict: #default strict mode - only calculate energy for stems with all valid parameters
                     return None
                 else:
@@ -334,6 +477,8 @@ self._closingPair -- (string, string) -- tuple containing two single character s
 self._closing_span -- (int, int) -- tuple containing two integers. The first integer is the index location of the 5' base in the closing pair. The second integer is the index location of the 3'base in the closing pair.
 self._pk -- Int -- The pseudoknot the hairpin is a part of, if any(default value is None)
 self._neighbor -- str -- label for the neighboring stem to the hairpin
+self._energyCache -- dict -- memoized energies keyed by (strict, temperature, parameter set id)
+self._structure -- Structure -- the Structure object that owns the hairpin, notified when the hairpin changes
 
 
                   C
@@ -348,6 +493,8 @@ self._neighbor -- str -- label for the neighboring stem to the hairpin
 
 '''
 class Hairpin:
+    __slots__ = ('_label', '_sequence', '_sequenceLen', '_span', '_closingPair', '_closingPairSpan', '_pk', '_neighbors', '_energyCache', '_structure')
+
     # __init__ method for stem object
     def __init__(self, label="", sequence="", sequenceSpan=(-1, -1), closingPair=('', ''), closingPairSpan=(-1, -1), pk=None, neighbors=('', '')):
         self._label = label
@@ -358,6 +505,8 @@ class Hairpin:
         self._closingPairSpan = closingPairSpan
         self._pk = pk
         self._neighbors = neighbors
+        self._energyCache = {} #(strict, temperature, parameter set id) : energy
+        self._structure = None #Structure that owns the hairpin
 
 
     ###
@@ -376,6 +525,44 @@ class Hairpin:
     def _addNeighbors(self, neighbor5p, neighbor3p):
         self._neighbors = (neighbor5p, neighbor3p)
 
+    #internal method to set the Structure that is notified when the hairpin changes
+    def _setStructure(self, structure):
+        self._structure = structure
+
+    #internal method to clear the memoized energies after the hairpin changes and notify the owning Structure
+    def _invalidateEnergy(self):
+        self._energyCache.clear()
+        if self._structure is not None:
+            self._structure._componentChanged(self)
+
+    #internal method that returns a copy of the hairpin with the mutations({position: base}) applied. The hairpin is not changed
+    def _withMutations(self, mutations):
+        mutant = _mutantCopy(self)
+        mutant._sequence = _substituteSequence(self._sequence, self._span[0], mutations)
+        mutant._closingPair = _substitutePair(self._closingPair, self._closingPairSpan, mutations)
+        return mutant
+
+    #internal method that returns the number of loop bases that are not C. Used by _pointMutationDelta() to update the all C loop
+    #penalty without counting the loop bases for every mutation
+    def _mutationState(self):
+        return self._sequenceLen - self._sequence.count('C')
+
+    #internal method that returns the change in energy for the point mutation of position to base, or None in strict mode when the
+    #mutant hairpin has no energy. Mutations of the closing pair or the first mismatch, and mutations in short or special hairpins,
+    #are evaluated on a mutant copy. The other bases of the loop only take part in the all C loop penalty.
+    #nonC is the value of _mutationState() and energy is the energy of the unmutated hairpin
+    def _pointMutationDelta(self, position, base, nonC, energy, strict, temperature):
+        if position in self._closingPairSpan or position in self._span or self._sequenceLen < 4 or self._sequenceLen in SPECIAL_HAIRPIN_LENGTHS:
+            return _copyMutationDelta(self, position, base, energy, strict, temperature)
+        mutantNonC = nonC - (self._sequence[position - self._span[0]] != 'C') + (base != 'C')
+        return self._cLoopPenalty(mutantNonC) - self._cLoopPenalty(nonC)
+
+    #internal method that returns the all C loop penalty for hairpins of 4 nucleotides or greater. nonC is the number of loop bases that are not C
+    def _cLoopPenalty(self, nonC):
+        if nonC == 0:
+            return (self._sequenceLen * HAIRPIN_C_LOOP_A) + HAIRPIN_C_LOOP_B
+        return 0
+
 
     ###
     ### User Accessible Methods
@@ -408,6 +595,7 @@ class Hairpin:
         if newSequence:
             self._sequence = newSequence #set new sequence
             self._sequenceLen = len(newSequence) #update sequence length
+            self._invalidateEnergy()
         else:
             return self._sequence
 
@@ -447,6 +635,7 @@ class Hairpin:
             try:
                 if newClose[0] and newClose[1]:
                     self._closingPair = newClose
+                    self._invalidateEnergy()
             except:
                 print('Please provide and tuple with the opening and closing base pairs for the hairpin.')
         else:
@@ -495,7 +684,7 @@ class Hairpin:
     '''
     def canonical(self):
         firstMismatch = (self._sequence[0], self._sequence[-1])
-        if(self._closingPair not in StackTerminalMismatches) or (firstMismatch not in StackTerminalMismatches[self._closingPair]):
+        if terminalMismatchEnergy(self._closingPair, firstMismatch) is None:
             return False
         elif self._sequenceLen < 3:
             return False
@@ -505,29 +694,34 @@ class Hairpin:
 
     '''
     Function: Hairpin.energy()
-    Description: function to calculate folding free energy of hairpin
+    Description: function to calculate folding free energy of hairpin. The result is memoized until the hairpin is changed
     Parameters:
             (strict=True) -- bool -- when True, the function will only calculate the energy of the molecule valid energy parameters are present.
+            (temperature=T) -- float -- temperature in Kelvin
     Return Value:
             float - the calculated energy for the hairpin
     '''
-    def energy(self, strict=True):
+    def energy(self, strict=True, temperature=T):
+        key = (strict, temperature, parameterSetId())
+        if key not in self._energyCache:
+            self._energyCache[key] = self._hairpinEnergy(strict, temperature)
+        return self._energyCache[key]
+
+    #internal method that calculates the energy of the hairpin. See Hairpin.energy()
+    def _hairpinEnergy(self, strict, temperature):
         #check that hairpin is at least 3 nucleotides long
         if self._sequenceLen < 3:
-            logging.warning(f'In energy() function for Hairpin: {self._label}, hairpin is less than 3 nucleotides long.')
+            report('Hairpin', 'length', 'In energy() function for Hairpin: {}, hairpin is less than 3 nucleotides long.', self._label)
             return None
 
         #Check if the hairpin is a special case hairpin with precalculated energy values
-        elif (self._closingPair in SpecialHairpins) and (self._sequence in SpecialHairpins[self._closingPair]):
-            return SpecialHairpins[self._closingPair][self._sequence]
+        elif specialHairpinEnergy(self._closingPair, self._sequence, temperature) is not None:
+            return specialHairpinEnergy(self._closingPair, self._sequence, temperature)
 
         #Hairpins of length 3
         elif self._sequenceLen == 3:
-            #get hairpin initiation term
-            if self._sequenceLen in HairpinInit: #try to get from dictionary
-                init = HairpinInit[self._sequenceLen]
-            else: #otherwise calculate
-                init = HairpinInit[9] + (1.75 * R * T * np.log(float(self._sequenceLen/9.0)))
+            #get hairpin initiation term(extrapolated for hairpins longer than the tabulated values)
+            init = hairpinInitEnergy(self._sequenceLen, temperature)
 
             #check for all c loop penalty
             if self._sequence.count('C') == self._sequenceLen:
@@ -537,18 +731,14 @@ class Hairpin:
 
         #hairpins of 4 nucleotides or greater
         else:
-            #get hairpin initiation term
-            if self._sequenceLen in HairpinInit: #try to get from dictionary
-                init = HairpinInit[self._sequenceLen]
-            else: #otherwise calculate
-                init = HairpinInit[9] + (1.75 * R * T * np.log(float(self._sequenceLen/9.0)))
+            #get hairpin initiation term(extrapolated for hairpins longer than the tabulated values)
+            init = hairpinInitEnergy(self._sequenceLen, temperature)
 
             #get terminal mismatch parameter
             firstMismatch = (self._sequence[0], self._sequence[-1])
-            try:
-                terminalMismatch = StackTerminalMismatches[self._closingPair][firstMismatch]
-            except KeyError:
-                logging.warning(f'In energy() function for Hairpin: {self._label}, terminal mismatch parameters for closing pair: {self._closingPair} and first mismatch: {firstMismatch} not found in Dictionary.')
+            terminalMismatch = terminalMismatchEnergy(self._closingPair, firstMismatch, temperature)
+            if terminalMismatch is None:
+                report('Hairpin', ('terminalMismatch', self._closingPair, firstMismatch), 'In energy() function for Hairpin: {}, terminal mismatch parameters for closing pair: {} and first mismatch: {} not found in Dictionary.', self._label, self._closingPair, firstMismatch)
                 if strict:
                     return None #strict mode - only calculate energy for hairpins with valid params
                 else:
@@ -570,9 +760,7 @@ class Hairpin:
                 gu_closure = HAIRPIN_SPECIAL_GU_CLOSURE
 
             #All C loop penalty
-            c_loop_penalty = 0
-            if self._sequence.count('C') == self._sequenceLen:
-                c_loop_penalty = (self._sequenceLen * HAIRPIN_C_LOOP_A) + HAIRPIN_C_LOOP_B
+            c_loop_penalty = self._cLoopPenalty(self._sequenceLen - self._sequence.count('C'))
 
             return init + terminalMismatch + uu_ga_bonus + gg_bonus + gu_closure + c_loop_penalty
 
@@ -593,6 +781,8 @@ self._closingPair3pSpan -- (int, int) -- Tuple containing 2 integers. The first
 self._pk -- int -- the pseudoknot the bulge is a part of, if any(default value is None)
 self._neighbot5p -- str -- label for the 5'neighbor of the bulge
 self._neighbot3p -- str -- label for the 3'neighbor of the bulge
+self._energyCache -- dict -- memoized energies keyed by (strict, temperature, parameter set id)
+self._structure -- Structure -- the Structure object that owns the bulge, notified when the bulge changes
 
 
 
@@ -607,6 +797,8 @@ self._neighbot3p -- str -- label for the 3'neighbor of the bulge
 
 '''
 class Bulge:
+    __slots__ = ('_label', '_sequence', '_sequenceLen', '_span', '_closingPair5p', '_closingPair5pSpan', '_closingPair3p', '_closingPair3pSpan', '_pk', '_neighbor5p', '_neighbor3p', '_energyCache', '_structure')
+
     # __init__ method for bulge object
     def __init__(self, label=None, sequence='', sequenceSpan=(-1, -1), closingPair5p=('', ''), closingPair5pSpan=(-1, -1), closingPair3p=('', ''), closingPair3pSpan=(-1, -1), pk=None, neighbor5p=None, neighbor3p=None):
         self._label = label
@@ -620,6 +812,8 @@ class Bulge:
         self._pk = pk
         self._neighbor5p = neighbor5p
         self._neighbor3p = neighbor3p
+        self._energyCache = {} #(strict, temperature, parameter set id) : energy
+        self._structure = None #Structure that owns the bulge
 
     ###
     ### Internal Methods
@@ -638,6 +832,35 @@ class Bulge:
         self._neighbor5p = neighbor5p
         self._neighbor3p = neighbor3p
 
+    #internal method to set the Structure that is notified when the bulge changes
+    def _setStructure(self, structure):
+        self._structure = structure
+
+    #internal method to clear the memoized energies after the bulge changes and notify the owning Structure
+    def _invalidateEnergy(self):
+        self._energyCache.clear()
+        if self._structure is not None:
+            self._structure._componentChanged(self)
+
+    #internal method that returns a copy of the bulge with the mutations({position: base}) applied. The bulge is not changed
+    def _withMutations(self, mutations):
+        mutant = _mutantCopy(self)
+        mutant._sequence = _substituteSequence(self._sequence, self._span[0], mutations)
+        mutant._closingPair5p = _substitutePair(self._closingPair5p, self._closingPair5pSpan, mutations)
+        mutant._closingPair3p = _substitutePair(self._closingPair3p, self._closingPair3pSpan, mutations)
+        return mutant
+
+    #internal method that returns the state used by _pointMutationDelta(). Bulges do not need one
+    def _mutationState(self):
+        return None
+
+    #internal method that returns the change in energy for the point mutation of position to base, or None in strict mode when the
+    #mutant bulge has no energy. Only bulges of length 1 depend on their bases, the energy of longer bulges depends only on the length
+    def _pointMutationDelta(self, position, base, state, energy, strict, temperature):
+        if self._sequenceLen == 1:
+            return _copyMutationDelta(self, position, base, energy, strict, temperature)
+        return 0.0
+
     ###
     ### User Accesible Functions
     ###
@@ -666,6 +889,7 @@ class Bulge:
         if newSequence:
             self._sequence = newSequence
             self._sequenceLen = len(newSequence)
+            self._invalidateEnergy()
         else:
             return self._sequence
 
@@ -703,6 +927,7 @@ class Bulge:
     def closingPair5p(self, newClose=None):
         if newClose:
             self._closingPair5p = newClose
+            self._invalidateEnergy()
         else:
             return self._closingPair5p
 
@@ -729,6 +954,7 @@ class Bulge:
     def closingPair3p(self, newClose=None):
         if newClose:
             self._closingPair3p = newClose
+            self._invalidateEnergy()
         return self._closingPair3p
 
 
@@ -763,27 +989,34 @@ class Bulge:
     '''
     def canonical(self):
         if self._sequenceLen == 1:
-            if (self._closingPair5p not in StackingEnergies) or (self._closingPair3p not in StackingEnergies[self._closingPair5p]):
+            if stackEnergy(self._closingPair5p, self._closingPair3p) is None:
                 return False
         return True
 
 
     '''
     Function: Bulge.energy()
-    Description: function calculates the folding free energy change for the bulge
+    Description: function calculates the folding free energy change for the bulge. The result is memoized until the bulge is changed
     Parameters:
             (strict=True) -- bool -- when true only energy values for bulges with all valid energy parameters will be calaculated
+            (temperature=T) -- float -- temperature in Kelvin
     Return Value:
             float - the calculated energy of the Bulge
     '''
-    def energy(self, strict=True):
+    def energy(self, strict=True, temperature=T):
+        key = (strict, temperature, parameterSetId())
+        if key not in self._energyCache:
+            self._energyCache[key] = self._bulgeEnergy(strict, temperature)
+        return self._energyCache[key]
+
+    #internal method that calculates the energy of the bulge. See Bulge.energy()
+    def _bulgeEnergy(self, strict, temperature):
         if self._sequenceLen == 1: #bulges of length 1
             #get base pair stack
             #base pair stack = the stack of the closing base pairs as if the bulge was not present
-            try:
-                basePairStack = StackingEnergies[self._closingPair5p][self._closingPair3p]
-            except KeyError:
-                logging.warning(f'In energy() function for Bulge: {self._label}, No base pair stack found for {self._closingPair5p} and {self._closingPair3p}. Energy Value set to float(\'inf\').')
+            basePairStack = stackEnergy(self._closingPair5p, self._closingPair3p, temperature)
+            if basePairStack is None:
+                report('Bulge', ('stack', self._closingPair5p, self._closingPair3p), 'In energy() function for Bulge: {}, No base pair stack found for {} and {}.', self._label, self._closingPair5p, self._closingPair3p)
 
                 if strict:
                     return None #strict mode - only calculate energy for bulges with valid params
@@ -802,17 +1035,14 @@ class Bulge:
                 if (self._closingPair3p[0] == 'C'):
                     cCount += 1
 
-                return BulgeInit[1] + basePairStack + specialC - (R * T * np.log(cCount))
+                return bulgeInitEnergy(1, temperature) + basePairStack + specialC - (R * temperature * np.log(cCount))
 
             #if not special C bulge, return bulge init + basePairStack
             else:
-                return BulgeInit[1] + basePairStack
+                return bulgeInitEnergy(1, temperature) + basePairStack
 
-        else: #bulge of length > 1
-            if self._sequenceLen in BulgeInit: #try to get value from dictionary
-                return BulgeInit[self._sequenceLen]
-            else: #otherwise calculate
-                return BulgeInit[6] + (1.75 * R * T * np.log(float(self._sequenceLen/6.0)))
+        else: #bulge of length > 1(extrapolated for bulges longer than the tabulated values)
+            return bulgeInitEnergy(self._sequenceLen, temperature)
 
 
 
@@ -832,6 +1062,9 @@ self._3pLoopSpan -- tuple(int, int) -- tuple containing the integer start and st
 self._closingPairs -- tuple((string, string), (string, string)) -- tuple with two nested tuples containing the closing pairs for the inner loop
 self._closingPairsSpan -- tuple((int, int), (int, int)) -- tuple with two nested tuples containing the index locations of the closing pairs for the inner loop
 self._strict -- bool -- boolean used to control whether energy is calculated strictly
+self._energyCache -- dict -- memoized energies keyed by (strict, temperature, parameter set id)
+self._structure -- Structure -- the Structure object that owns the internal loop, notified when the loop changes
+self._temperature -- float -- temperature in Kelvin used for the current energy calculation
 
 
 
@@ -845,6 +1078,8 @@ self._strict -- bool -- boolean used to control whether energy is calculated str
 
 '''
 class InternalLoop:
+    __slots__ = ('_parentLabel', '_5pLabel', '_3pLabel', '_5pLoop', '_3pLoop', '_loopsLen', '_span5p', '_span3p', '_closingPairs', '_closingPairsSpan', '_neighbor5p', '_neighbor3p', '_strict', '_temperature', '_energyCache', '_structure')
+
     # __init__ method for InternalLoop object
     def __init__(self, pLabel=None, label5p=None, label3p=None,  loop5p='', loop3p='', loop5pSpan=(-1, -1), loop3pSpan=(-1, -1), closingPairs=(('', ''), ('', '')), closingPairsSpan=((-1, -1), (-1, -1)), neighbor5p=('', ''), neighbor3p=('', '')):
         self._parentLabel = pLabel
@@ -860,6 +1095,9 @@ class InternalLoop:
         self._neighbor5p = neighbor5p
         self._neighbor3p = neighbor5p
         self._strict = True #used for to control energy function
+        self._temperature = T #temperature used by the energy function
+        self._energyCache = {} #(strict, temperature, parameter set id) : energy
+        self._structure = None #Structure that owns the internal loop
 
     ###
     ### Internal Methods
@@ -876,12 +1114,44 @@ class InternalLoop:
     #function to update loop lengths upon change
     def _updateLoopLen(self):
         self._loopsLen = (len(self._5pLoop), len(self._3pLoop))
+        self._invalidateEnergy()
 
     #internal method to set the 5' and 3' neighbors for a InternalLoop
     def _addNeighbors(self, neighbor5p, neighbor3p):
         self._neighbor5p = neighbor5p
         self._neighbor3p = neighbor3p
 
+    #internal method to set the Structure that is notified when the internal loop changes
+    def _setStructure(self, structure):
+        self._structure = structure
+
+    #internal method to clear the memoized energies after the internal loop changes and notify the owning Structure
+    def _invalidateEnergy(self):
+        self._energyCache.clear()
+        if self._structure is not None:
+            self._structure._componentChanged(self)
+
+    #internal method that returns a copy of the internal loop with the mutations({position: base}) applied. The loop is not changed
+    def _withMutations(self, mutations):
+        mutant = _mutantCopy(self)
+        mutant._5pLoop = _substituteSequence(self._5pLoop, self._span5p[0], mutations)
+        mutant._3pLoop = _substituteSequence(self._3pLoop, self._span3p[0], mutations)
+        mutant._closingPairs = (_substitutePair(self._closingPairs[0], self._closingPairsSpan[0], mutations),
+                                _substitutePair(self._closingPairs[1], self._closingPairsSpan[1], mutations))
+        return mutant
+
+    #internal method that returns the state used by _pointMutationDelta(). Internal loops do not need one
+    def _mutationState(self):
+        return None
+
+    #internal method that returns the change in energy for the point mutation of position to base, or None in strict mode when the
+    #mutant loop has no energy. The loop energy depends on the closing pairs and the first and last base of each side of the loop
+    #(every base of the tabulated 1x1, 1x2, 2x1, and 2x2 loops), so mutations of the other bases do not change it
+    def _pointMutationDelta(self, position, base, state, energy, strict, temperature):
+        if position in self._closingPairsSpan[0] or position in self._closingPairsSpan[1] or position in self._span5p or position in self._span3p:
+            return _copyMutationDelta(self, position, base, energy, strict, temperature)
+        return 0.0
+
     #Function checks that the internal loop has the same 5' closing pair structures
     def _same5pNeighbors(self):
         return (self._neighbor5p[0] == self._neighbor5p[1])
@@ -1025,23 +1295,23 @@ class InternalLoop:
     def canonical(self):
         #Check if energy value is present for 1x1 loop
         if len(self._5pLoop) == 1 and len(self._3pLoop) == 1:
-            if (self._closingPairs[0], self._closingPairs[1], self._5pLoop, self._3pLoop) in InnerLoop_1x1_Energies:
+            if internalLoop1x1Energy(self._closingPairs[0], self._closingPairs[1], self._5pLoop, self._3pLoop) is not None:
                 return True
             return False
         #check if energy value is present for 1x2 loop
         elif len(self._5pLoop) == 1 and len(self._3pLoop) == 2:
-            if (self._closingPairs[0], self._closingPairs[1], self._5pLoop, self._3pLoop[1], self._3pLoop[0]) in InnerLoop_1x2_Energies:
+            if internalLoop1x2Energy(self._closingPairs[0], self._closingPairs[1], self._5pLoop, self._3pLoop[1], self._3pLoop[0]) is not None:
                 return True
             return False
         #check if energy value is present for 2x1 loop
         elif len(self._5pLoop) == 2 and len(self._3pLoop) == 1:
-            if ((self._closingPairs[1][1], self._closingPairs[1][0]), (self._closingPairs[0][1], self._closingPairs[0][0]), self._3pLoop, self._5pLoop[1], self._5pLoop[0]) in InnerLoop_1x2_Energies:
+            if internalLoop1x2Energy((self._closingPairs[1][1], self._closingPairs[1][0]), (self._closingPairs[0][1], self._closingPairs[0][0]), self._3pLoop, self._5pLoop[1], self._5pLoop[0]) is not None:
                 return True
             return False
         #Check if energy value is present for 2x2 loop
         elif len(self._5pLoop) == 2 and len(self._3pLoop) == 2:
             loops = list(zip(list(self._5pLoop), list(self._3pLoop[::-1]))) #convert loop sequences to proper format for dictionary
-            if (self._closingPairs[0], self._closingPairs[1], loops[0], loops[1]) in InnerLoop_2x2_Energies:
+            if internalLoop2x2Energy(self._closingPairs[0], self._closingPairs[1], loops[0], loops[1]) is not None:
                 return True
             return False
         #Check for valid parameters needed to calculate energy for loops of other lengths
@@ -1060,10 +1330,7 @@ class InternalLoop:
     def _getInnerLoopInitEnergy(self):
         #get total length of inner loop for initiation parameter calculation
         loopLength = len(self._5pLoop) + len(self._3pLoop)
-        if loopLength in InternalLoopInit:#try to get initiation energy from dictionary
-            return float(InternalLoopInit[loopLength])
-        else: #otherwise calculate value
-            return InternalLoopInit[6] + (1.08 * np.log(float(loopLength)/6.0))
+        return internalLoopInitEnergy(loopLength, self._temperature) #extrapolated for loops longer than the tabulated values
 
 
     '''
@@ -1087,9 +1354,9 @@ class InternalLoop:
         endPenaltyPairs = [('A', 'U'), ('G', 'U'), ('U', 'A'), ('U', 'G')] #closing pairs that result in end penalty
         closingPair5p, closingPair3p = self.closingPairs() #get the closing pairs for the inner loop
         if closingPair5p in endPenaltyPairs: #check for penalty condition in 5' closing pair
-            closingPenalty += 0.7
+            closingPenalty += INNER_LOOP_CLOSING_PENALTY
         if closingPair3p in endPenaltyPairs: #check for penalty in 3' closing pair
-            closingPenalty += 0.7
+            closingPenalty += INNER_LOOP_CLOSING_PENALTY
 
         return float(closingPenalty)
 
@@ -1107,18 +1374,20 @@ class InternalLoop:
 
         mismatchEnergy_3x2 = 0
         #check for mismatch condition between 5' closing pair and first mismatch
-        if ((self._closingPairs[1][1], self._closingPairs[1][0]), mismatch5p) in InnerLoopMismatches_2x3:
-            mismatchEnergy_3x2 += InnerLoopMismatches_2x3[((self._closingPairs[1][1], self._closingPairs[1][0]), mismatch5p)]
+        mismatchEnergy = mismatch2x3Energy((self._closingPairs[1][1], self._closingPairs[1][0]), mismatch5p, self._temperature)
+        if mismatchEnergy is not None:
+            mismatchEnergy_3x2 += mismatchEnergy
         else:
-            logging.warning(f'In energy() function for 3x2 InnerLoop: {self._parentLabel}, no mismatch parameter for closing pair: {(self._closingPairs[1][1], self._closingPairs[1][0])} and the 5\' mismatch: {mismatch5p}.')
+            report('InternalLoop', ('mismatch2x3', (self._closingPairs[1][1], self._closingPairs[1][0]), mismatch5p), 'In energy() function for 3x2 InnerLoop: {}, no mismatch parameter for closing pair: {} and the 5\' mismatch: {}.', self._parentLabel, (self._closingPairs[1][1], self._closingPairs[1][0]), mismatch5p)
             if (self._strict):
                 return None
 
         #check for mismatch condition between 3'closing pair and mismatch 2
-        if ((self._closingPairs[0][1], self._closingPairs[0][0]), mismatch3p) in InnerLoopMismatches_2x3:
-            mismatchEnergy_3x2 += InnerLoopMismatches_2x3[((self._closingPairs[0][1], self._closingPairs[0][0]), mismatch3p)]
+        mismatchEnergy = mismatch2x3Energy((self._closingPairs[0][1], self._closingPairs[0][0]), mismatch3p, self._temperature)
+        if mismatchEnergy is not None:
+            mismatchEnergy_3x2 += mismatchEnergy
         else:
-            logging.warning(f'In energy() function for 3x2 InnerLoop: {self._parentLabel}, no mismatch parameter for closing pair: {(self._closingPairs[0][1], self._closingPairs[0][0])} and the 3\' mismatch: {mismatch3p}.')
+            report('InternalLoop', ('mismatch2x3', (self._closingPairs[0][1], self._closingPairs[0][0]), mismatch3p), 'In energy() function for 3x2 InnerLoop: {}, no mismatch parameter for closing pair: {} and the 3\' mismatch: {}.', self._parentLabel, (self._closingPairs[0][1], self._closingPairs[0][0]), mismatch3p)
             if (self._strict):
                 return None
 
@@ -1138,18 +1407,20 @@ class InternalLoop:
 
         mismatchEnergy_2x3 = 0
         #check for mismatch condition between 5' closing pair and first mismatch
-        if (self._closingPairs[0], mismatch5p) in InnerLoopMismatches_2x3:
-            mismatchEnergy_2x3 += InnerLoopMismatches_2x3[(self._closingPairs[0], mismatch5p)]
+        mismatchEnergy = mismatch2x3Energy(self._closingPairs[0], mismatch5p, self._temperature)
+        if mismatchEnergy is not None:
+            mismatchEnergy_2x3 += mismatchEnergy
         else:
-            logging.warning(f'In energy() function for 2x3 InnerLoop: {self._parentLabel}, no mismatch parameter for closing pair: {self._closingPairs[0]} and the 5\' mismatch: {mismatch5p}.')
+            report('InternalLoop', ('mismatch2x3', self._closingPairs[0], mismatch5p), 'In energy() function for 2x3 InnerLoop: {}, no mismatch parameter for closing pair: {} and the 5\' mismatch: {}.', self._parentLabel, self._closingPairs[0], mismatch5p)
             if (self._strict):
                 return None
 
         #check for mismatch condition between 3'closing pair and mismatch 2
-        if ((self._closingPairs[1][1], self._closingPairs[1][0]), mismatch3p) in InnerLoopMismatches_2x3:
-            mismatchEnergy_2x3 += InnerLoopMismatches_2x3[((self._closingPairs[1][1], self._closingPairs[1][0]), mismatch3p)]
+        mismatchEnergy = mismatch2x3Energy((self._closingPairs[1][1], self._closingPairs[1][0]), mismatch3p, self._temperature)
+        if mismatchEnergy is not None:
+            mismatchEnergy_2x3 += mismatchEnergy
         else:
-            logging.warning(f'In energy() function for 2x3 InnerLoop: {self._parentLabel}, no mismatch parameter for closing pair: {(self._closingPairs[1][1], self._closingPairs[1][0])} and the 3\' mismatch: {mismatch3p}.')
+            report('InternalLoop', ('mismatch2x3', (self._closingPairs[1][1], self._closingPairs[1][0]), mismatch3p), 'In energy() function for 2x3 InnerLoop: {}, no mismatch parameter for closing pair: {} and the 3\' mismatch: {}.', self._parentLabel, (self._closingPairs[1][1], self._closingPairs[1][0]), mismatch3p)
             if (self._strict):
                 return None
 
@@ -1169,14 +1440,16 @@ class InternalLoop:
 
         mismatchEnergy_Other = 0
         #check for mismatch 1 for condition
-        if mismatch5p in OtherInnerLoopMismtaches:
-            mismatchEnergy_Other += OtherInnerLoopMismtaches[mismatch5p]
+        mismatchEnergy = mismatchOtherEnergy(mismatch5p, self._temperature)
+        if mismatchEnergy is not None:
+            mismatchEnergy_Other += mismatchEnergy
         elif (self._strict):
             return None
 
         #check mismatch 2 for condition
-        if mismatch3p in OtherInnerLoopMismtaches:
-            mismatchEnergy_Other += OtherInnerLoopMismtaches[mismatch3p]
+        mismatchEnergy = mismatchOtherEnergy(mismatch3p, self._temperature)
+        if mismatchEnergy is not None:
+            mismatchEnergy_Other += mismatchEnergy
         elif (self._strict):
             return None
 
@@ -1241,21 +1514,31 @@ class InternalLoop:
 
     '''
     Function Name: energy(self)
-    Description: Function to get the free energy for the inner loop object
-    Parameters: None
+    Description: Function to get the free energy for the inner loop object. The result is memoized until the loop sequences are changed
+    Parameters:
+            (strict=True) -- bool -- when true, energy values are only calculated for inner loops with all present energy parameters
+            (temperature=T) -- float -- temperature in Kelvin
     Return Type: float
     '''
-    def energy(self, strict=True):
+    def energy(self, strict=True, temperature=T):
+        key = (strict, temperature, parameterSetId())
+        if key not in self._energyCache:
+            self._energyCache[key] = self._internalLoopEnergy(strict, temperature)
+        return self._energyCache[key]
+
+    #internal method that calculates the energy of the inner loop. See InternalLoop.energy()
+    def _internalLoopEnergy(self, strict, temperature):
         #set mode for energy calculations
         self._strict = strict
+        self._temperature = temperature
 
         #check for 1x1 - value taken from imported dicitionary
         if len(self._5pLoop) == 1 and len(self._3pLoop) == 1:
-            if (self._closingPairs[0], self._closingPairs[1], self._5pLoop, self._3pLoop) in InnerLoop_1x1_Energies: #check if key in dictionary
-                loopEnergy = InnerLoop_1x1_Energies[(self._closingPairs[0], self._closingPairs[1], self._5pLoop, self._3pLoop)]
+            loopEnergy = internalLoop1x1Energy(self._closingPairs[0], self._closingPairs[1], self._5pLoop, self._3pLoop, temperature)
+            if loopEnergy is not None: #check if parameter is present
                 return loopEnergy
             else: #otherwise calculate energy
-                logging.warning(f'Inner Loop: {self._parentLabel}, loop is 1x1, but energy parameters is not present in InnerLoop_1x1_Energies dicitonary. Energy value calculated using _calcEnergy() function.')
+                report('InternalLoop', ('1x1', self._closingPairs, self._5pLoop, self._3pLoop), 'Inner Loop: {}, loop is 1x1, but energy parameters is not present in InnerLoop_1x1_Energies dicitonary. Energy value calculated using _calcEnergy() function.', self._parentLabel)
                 if(self._strict):
                     return None
                 else:
@@ -1263,11 +1546,11 @@ class InternalLoop:
 
         #check for 1x2 - value taken from imported dicitionary
         elif len(self._5pLoop) == 1 and len(self._3pLoop) == 2:
-            if (self._closingPairs[0], self._closingPairs[1], self._5pLoop, self._3pLoop[1], self._3pLoop[0]) in InnerLoop_1x2_Energies: #check if key in dictionary
-                loopEnergy = InnerLoop_1x2_Energies[(self._closingPairs[0], self._closingPairs[1], self._5pLoop, self._3pLoop[1], self._3pLoop[0])]
+            loopEnergy = internalLoop1x2Energy(self._closingPairs[0], self._closingPairs[1], self._5pLoop, self._3pLoop[1], self._3pLoop[0], temperature)
+            if loopEnergy is not None: #check if parameter is present
                 return loopEnergy
             else: #otherwise calculate energy
-                logging.warning(f'Inner Loop: {self._parentLabel}, loop is 1x2, but energy parameters is not present in InnerLoop_1x1_Energies dicitonary. Energy value calculated using _calcEnergy() function.')
+                report('InternalLoop', ('1x2', self._closingPairs, self._5pLoop, self._3pLoop), 'Inner Loop: {}, loop is 1x2, but energy parameters is not present in InnerLoop_1x2_Energies dicitonary. Energy value calculated using _calcEnergy() function.', self._parentLabel)
                 if(self._strict):
                     return None
                 else:
@@ -1275,11 +1558,11 @@ class InternalLoop:
 
         #check for 2x1 case - value taken from dicitonary
         elif len(self._5pLoop) == 2 and len(self._3pLoop) == 1:
-            if ((self._closingPairs[1][1], self._closingPairs[1][0]), (self._closingPairs[0][1], self._closingPairs[0][0]), self._3pLoop, self._5pLoop[1], self._5pLoop[0]) in InnerLoop_1x2_Energies: #check if key in dictionary
-                loopEnergy = InnerLoop_1x2_Energies[((self._closingPairs[1][1], self._closingPairs[1][0]), (self._closingPairs[0][1], self._closingPairs[0][0]), self._3pLoop, self._5pLoop[1], self._5pLoop[0])]
+            loopEnergy = internalLoop1x2Energy((self._closingPairs[1][1], self._closingPairs[1][0]), (self._closingPairs[0][1], self._closingPairs[0][0]), self._3pLoop, self._5pLoop[1], self._5pLoop[0], temperature)
+            if loopEnergy is not None: #check if parameter is present
                 return loopEnergy
             else: #otherwise calculate energy
-                logging.warning(f'Inner Loop: {self._parentLabel}, loop is 2x1, but energy parameters is not present in InnerLoop_1x1_Energies dicitonary. Energy value calculated using _calcEnergy() function.')
+                report('InternalLoop', ('2x1', self._closingPairs, self._5pLoop, self._3pLoop), 'Inner Loop: {}, loop is 2x1, but energy parameters is not present in InnerLoop_1x2_Energies dicitonary. Energy value calculated using _calcEnergy() function.', self._parentLabel)
                 if(self._strict):
                     return None
                 else:
@@ -1288,11 +1571,11 @@ class InternalLoop:
         #check for 2x2 - value taken from imported dicitionary
         elif len(self._5pLoop) == 2 and len(self._3pLoop) == 2:
             loops = list(zip(list(self._5pLoop), list(self._3pLoop[::-1]))) #convert loop sequences to proper format for dictionary
-            if (self._closingPairs[0], self._closingPairs[1], loops[0], loops[1]) in InnerLoop_2x2_Energies: #check if key in dictionary
-                loopEnergy = InnerLoop_2x2_Energies[(self._closingPairs[0], self._closingPairs[1], loops[0], loops[1])]
+            loopEnergy = internalLoop2x2Energy(self._closingPairs[0], self._closingPairs[1], loops[0], loops[1], temperature)
+            if loopEnergy is not None: #check if parameter is present
                 return loopEnergy
             else: #otherwise calculate energy
-                logging.warning(f'Inner Loop: {self._parentLabel}, loop is 2x2, but energy parameters is not present in InnerLoop_1x1_Energies dicitonary. Energy value calculated using _calcEnergy() function.')
+                report('InternalLoop', ('2x2', self._closingPairs, self._5pLoop, self._3pLoop), 'Inner Loop: {}, loop is 2x2, but energy parameters is not present in InnerLoop_2x2_Energies dicitonary. Energy value calculated using _calcEnergy() function.', self._parentLabel)
                 if(self._strict):
                     return None
                 else:
@@ -1318,6 +1601,8 @@ self._closingPair3p -- tuple(string, string) -- tuple that contains the 3' closi
 self._closingPair3pSpan -- tuple(int, int) -- tuple containg the integer index locations for the 3' closing pair
 '''
 class ExternalLoop:
+    __slots__ = ('_label', '_sequence', '_sequenceLen', '_span', '_closingPair5p', '_closingPair5pSpan', '_closingPair3p', '_closingPair3pSpan', '_neighbor5p', '_neighbor3p')
+
     #__init__() method for the external loop object
     def __init__(self, label='', seq='', seqSpan=(-1,-1), closingPair5p=('', ''), closingPair5pSpan=(-1,-1), closingPair3p=('', ''), closingPair3pSpan=(-1, -1), neighbor5p=None, neighbor3p=None):
         self._label = label
@@ -1413,6 +1698,20 @@ class ExternalLoop:
         return (self._neighbor5p, self._neighbor3p)
 
 
+    '''
+    Function: ExternalLoop.energy()
+    Description: Function returns the free energy contribution of the external loop. Dangling ends and terminal mismatches on
+    the exterior loop are not modeled, so the external loop does not change the folding free energy.
+    Parameters:
+            (strict=True) -- bool -- accepted for consistency with the other energy functions
+            (temperature=T) -- float -- accepted for consistency with the other energy functions
+    Return Value:
+            float - 0.0
+    '''
+    def energy(self, strict=True, temperature=T):
+        return 0.0
+
+
 '''
 ENDS
 
@@ -1422,13 +1721,16 @@ self._sequence -- string -- sequence that defines the end objects
 self._span -- tuple(int, int) -- tuple containing the integer start and stop locations for the end object
 '''
 class End:
+    __slots__ = ('_label', '_sequence', '_sequenceLen', '_span', '_neighbor5p', '_neighbor3p')
+
     #__init__() method for end object
     def __init__(self, label='', sequence='', span=(-1, -1), neighbor=None):
         self._label = label
         self._sequence = sequence
         self._sequenceLen = len(sequence)
         self._span = span
-        self._neighbor=None
+        self._neighbor5p = None
+        self._neighbor3p = None
 
     ###
     ### Internal Methods
@@ -1525,6 +1827,8 @@ self._basePairSpan -- tuple(int, int) -- tuple containing the integer locations
 self._parentUnit -- string -- label for the secondary structure that the NCBP is located in
 '''
 class NCBP:
+    __slots__ = ('_label', '_basePair', '_basePairSpan', '_parentUnit')
+
     #__init__() method for the NCBP object
     def __init__(self, label, basePair, basePairSpan, loc):
         self._label = label
@@ -1609,8 +1913,11 @@ self._sequences -- dictionary -- dictionary of the multiloop component sequences
 self._span -- dictionary -- dictionary of the multiloop component spans. key values are the subunit labels
 self._closingPairs -- ((str, str), (str, str)) -- tuple containing the 5' and 3' closing base pairs as tuples
 self._closingPairsSpan - ((int, int), (int, int)) -- tuple containing the 5' and 3' closing base pair spans as tuples
+self._neighbors -- dictionary -- dictionary of (5' neighbor, 3' neighbor) label tuples. key values are the subunit labels
 '''
 class MultiLoop:
+    __slots__ = ('_parentLabel', '_subunitLabels', '_numSubunits', '_sequences', '_spans', '_closingPairs', '_closingPairsSpan', '_neighbors')
+
     #__init__() method for MultiLoop class
     def __init__(self, parentLabel, subunitLabels, sequences, spans, closingPairs, closingPairsSpan):
         self._parentLabel = parentLabel
@@ -1620,6 +1927,7 @@ class MultiLoop:
         self._spans = spans
         self._closingPairs = closingPairs
         self._closingPairsSpan = closingPairsSpan
+        self._neighbors = {}
 
     ###
     ### Internal Methods
@@ -1629,10 +1937,9 @@ class MultiLoop:
     def __str__(self):
         return f'MultiLoop: {self._parentLabel}'
 
-    #internal method to set the 5' and 3' neighbors for a multiloop
-    def _addNeighbors(self, neighbor5p, neighbor3p):
-        self._neighbor5p = neighbor5p
-        self._neighbor3p = neighbor3p
+    #internal method to set the 5' and 3' neighbors for each multiloop subunit
+    def _addNeighbors(self, subunitNeighbors):
+        self._neighbors = subunitNeighbors
 
     ###
     ### User Accesible Methods
@@ -1755,6 +2062,57 @@ class MultiLoop:
         else:
             return self._closingPairsSpan
 
+    
+    '''
+    Function: MultiLoop.neighbors()
+    Description: Function to return dictionary of subunitLabel : neighbors for the MultiLoop object
+    Parameters:
+            (subunit=None) -- str -- label for specific subunit being accessed
+    Return Value:
+            dict - dictionary of (5' neighbor label, 3' neighbor label) tuples for multiloop subunits mapped to their subunit label
+            * if a specific subunit label is provided, only that tuple will be returned
+    '''
+    def neighbors(self, subunit=None):
+        if(subunit):
+            try:
+                neighbors = self._neighbors[subunit]
+                return neighbors
+            except KeyError:
+                return None
+        else:
+            return self._neighbors
+
+    
+    '''
+    Function: MultiLoop.numBranches()
+    Description: Function to return the number of helices that close or branch from the MultiLoop
+    Parameters: None
+    Return Value:
+            int - number of distinct closing base pairs of the multiloop subunits
+    '''
+    def numBranches(self):
+        branches = set()
+        for closingPair5pSpan, closingPair3pSpan in self._closingPairsSpan.values():
+            branches.add(tuple(sorted(closingPair5pSpan)))
+            branches.add(tuple(sorted(closingPair3pSpan)))
+        return len(branches)
+
+    
+    '''
+    Function: MultiLoop.energy()
+    Description: Function calculates the folding free energy change of the MultiLoop with the linear multibranch loop model:
+    a + (branch penalty * number of branches) + (unpaired penalty * number of unpaired nucleotides)
+    Parameters:
+            (strict=True) -- bool -- accepted for consistency with the other energy functions. All multiloop parameters are always present
+            (temperature=T) -- float -- accepted for consistency with the other energy functions. No multiloop enthalpies are available,
+                                        so the multiloop parameters keep their 37 ºC values
+    Return Value:
+            float - the calculated energy of the MultiLoop
+    '''
+    def energy(self, strict=True, temperature=T):
+        unpaired = sum(len(sequence) for sequence in self._sequences.values())
+        return MULTILOOP_A + (MULTILOOP_BRANCH * self.numBranches()) + (MULTILOOP_UNPAIRED * unpaired)
+
 
 
 '''
@@ -0,0 +1,710 @@
+'''
+Filename: StructureCorpus.py
+Author: Michael Hathaway
+
+Description: The Structure Corpus module provides functionality for working with large collections of structure type
+records. Records can be streamed from directories, glob patterns, multi-record .st files, and gzip or tar archives
+without holding the whole corpus in memory.
+
+Corpora often contain the same structure under different names. A FingerprintIndex maps the fingerprint of every record(see
+Structure.fingerprint()) to its record ids, and the loaders and corpus energy functions use it to skip duplicate records and
+fan the results of the unique records back out to all of them.
+'''
+
+## Module Imports ##
+import numpy as np
+import os
+import glob
+import gzip
+import tarfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+## Structure Import ##
+from Structure import Structure
+from StructureBinary import BinaryCorpus, writeBinaryCorpus
+from StructureAnnotation import annotateDotBracket, structureFingerprint
+from EnergyTables import T
+from BatchEnergy import batchStemEnergy, batchHairpinEnergy, batchInternalLoopEnergy
+
+## Corpus Constants ##
+STRUCTURE_FILE_EXTENSIONS = ('.st', '.st.gz')
+TAR_FILE_EXTENSIONS = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+RECORD_START = '#Name:' #every record in a structure type file starts with a name line
+DEFAULT_CHUNKSIZE = 1 #number of corpus files sent to a worker process at a time
+
+
+'''
+Function Name: _isTarFile(path)
+Description: Internal function to check if a path names a tar archive
+Parameters:
+        (path) - str - path to check
+Return Type:
+        bool
+'''
+def _isTarFile(path):
+    return path.endswith(TAR_FILE_EXTENSIONS)
+
+
+'''
+Function Name: _isStructureFile(path)
+Description: Internal function to check if a path names a (possibly gzipped) structure type file
+Parameters:
+        (path) - str - path to check
+Return Type:
+        bool
+'''
+def _isStructureFile(path):
+    return path.endswith(STRUCTURE_FILE_EXTENSIONS) and not _isTarFile(path)
+
+
+'''
+Function Name: _expandSource(source, keepMissing=False)
+Description: Internal function that expands a corpus source into an ordered list of file paths. A source can be a single
+file, a directory(searched recursively for structure type files and archives), a glob pattern, or a list of any of these.
+Parameters:
+        (source) - str or list - the corpus source to expand
+        (keepMissing=False) - bool - when true, a source that is not found is kept in the list so that opening it reports the
+                              error for that path. When false, it is reported and left out
+Return Type:
+        list of str
+'''
+def _expandSource(source, keepMissing=False):
+    if isinstance(source, (list, tuple)):
+        paths = []
+        for item in source:
+            paths.extend(_expandSource(item, keepMissing))
+        return paths
+
+    source = os.fspath(source)
+
+    if os.path.isdir(source):
+        paths = []
+        for root, dirs, files in os.walk(source):
+            dirs.sort() #walk directories in a stable order
+            for name in sorted(files):
+                if _isStructureFile(name) or _isTarFile(name):
+                    paths.append(os.path.join(root, name))
+        return paths
+
+    if os.path.isfile(source):
+        return [source]
+
+    if glob.has_magic(source):
+        return sorted(glob.glob(source, recursive=True))
+
+    if keepMissing:
+        return [source]
+    print(f'Corpus source: {source} not found.')
+    return []
+
+
+'''
+Function Name: _iterTextSources(path)
+Description: Internal generator that opens a corpus file and yields (name, text stream) pairs. Plain and gzipped files
+yield a single stream. Tar archives are read in streaming mode and yield one stream per structure type member. Errors
+finding, opening, or decompressing the file(OSError) and unreadable archives(tarfile.TarError) are raised to the caller,
+which reports them for the file.
+Parameters:
+        (path) - str - path to a structure type file or archive
+Return Type:
+        generator of (str, iterable of str) tuples
+'''
+def _iterTextSources(path):
+    if _isTarFile(path):
+        with tarfile.open(path, mode='r|*') as archive:
+            for member in archive:
+                if not member.isfile() or not _isStructureFile(member.name):
+                    continue
+                stream = archive.extractfile(member)
+                if member.name.endswith('.gz'):
+                    stream = gzip.GzipFile(fileobj=stream)
+                yield (f'{path}:{member.name}', (line.decode('utf-8') for line in stream)) #streamed members are not seekable, so decode line by line
+
+    elif path.endswith('.gz'):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            yield (path, f)
+
+    else:
+        with open(path, 'r') as f:
+            yield (path, f)
+
+
+'''
+Function Name: iterRecords(lines)
+Description: Generator that splits the lines of a structure type file into individual records. A new record is started
+at every #Name: line, so a file containing many concatenated records is split into one list of lines per record.
+Parameters:
+        (lines) - iterable of str - lines of a structure type file
+Return Type:
+        generator of lists of str
+'''
+def iterRecords(lines):
+    record = []
+    named = False #whether the current record already has a name line
+    for line in lines:
+        if line.startswith(RECORD_START):
+            if named:
+                yield record
+                record = []
+            named = True
+        record.append(line)
+
+    if record:
+        yield record
+
+
+'''
+Class: FingerprintIndex
+Description: The FingerprintIndex object maps the fingerprints of the records of a corpus to their record ids, the 0-based
+position of each record in the order it was added. The first record with a fingerprint is a unique record and later records
+with the same fingerprint are its duplicates, so results calculated for the unique records are fanned back out to every record
+with fanOut() or uniqueIndex(). Structures without a fingerprint are always unique. Records that could not be loaded are added
+with addSkipped(), so record ids keep matching the positions of the input records, but they have no unique record.
+
+Member variable -- data type -- description:
+self._records -- dictionary -- fingerprint : list of the ids of the records with that fingerprint
+self._fingerprints -- list of str -- fingerprint of every record
+self._names -- list of str -- name of every record
+self._uniqueIds -- list of int -- position of the unique record of every record among the unique records, -1 for skipped records
+self._numUnique -- int -- number of unique records
+self._numSkipped -- int -- number of records added with addSkipped()
+'''
+class FingerprintIndex:
+    #__init__() method for the FingerprintIndex object
+    def __init__(self):
+        self._records = {}
+        self._fingerprints = []
+        self._names = []
+        self._uniqueIds = []
+        self._numUnique = 0
+        self._numSkipped = 0
+
+    #define len function for the FingerprintIndex object as the number of records
+    def __len__(self):
+        return len(self._fingerprints)
+
+    #define in operator for fingerprints
+    def __contains__(self, fingerprint):
+        return fingerprint in self._records
+
+
+    '''
+    Function Name: add(fingerprint, name='')
+    Description: Function adds a record to the index
+    Parameters:
+            (fingerprint) - str - fingerprint of the record, or None if it does not have one
+            (name='') - str - name of the record
+    Return Type:
+            bool - True if the record is unique, False if it is a duplicate of an earlier record
+    '''
+    def add(self, fingerprint, name=''):
+        recordId = len(self._fingerprints)
+        self._fingerprints.append(fingerprint)
+        self._names.append(name)
+        records = self._records.get(fingerprint) if fingerprint is not None else None
+        if records is not None:
+            records.append(recordId)
+            self._uniqueIds.append(self._uniqueIds[records[0]])
+            return False
+
+        if fingerprint is not None:
+            self._records[fingerprint] = [recordId]
+        self._uniqueIds.append(self._numUnique)
+        self._numUnique += 1
+        return True
+
+
+    '''
+    Function Name: addSkipped(name='')
+    Description: Function adds a record that was not loaded, for example because its dot-bracket is not valid. The record gets
+    the next record id, but it is not a unique record and no result is fanned out to it
+    Parameters:
+            (name='') - str - name of the record
+    Return Type: None
+    '''
+    def addSkipped(self, name=''):
+        self._fingerprints.append(None)
+        self._names.append(name)
+        self._uniqueIds.append(-1)
+        self._numSkipped += 1
+
+
+    '''
+    Function Name: addStructure(structure)
+    Description: Function adds a Structure object to the index with its fingerprint and name
+    Parameters:
+            (structure) - Structure object
+    Return Type:
+            bool - True if the structure is unique, False if it is a duplicate of an earlier record
+    '''
+    def addStructure(self, structure):
+        return self.add(structure.fingerprint(), structure.name())
+
+
+    '''
+    Function Name: numUnique()
+    Description: Function returns the number of unique records
+    Parameters: None
+    Return Type:
+            int
+    '''
+    def numUnique(self):
+        return self._numUnique
+
+
+    '''
+    Function Name: numDuplicates()
+    Description: Function returns the number of records that are duplicates of an earlier record. Skipped records are not
+    duplicates
+    Parameters: None
+    Return Type:
+            int
+    '''
+    def numDuplicates(self):
+        return len(self._fingerprints) - self._numSkipped - self._numUnique
+
+
+    '''
+    Function Name: numSkipped()
+    Description: Function returns the number of records that were added with addSkipped()
+    Parameters: None
+    Return Type:
+            int
+    '''
+    def numSkipped(self):
+        return self._numSkipped
+
+
+    '''
+    Function Name: fingerprint(recordId)
+    Description: Function returns the fingerprint of a record
+    Parameters:
+            (recordId) - int - id of the record
+    Return Type:
+            str or None
+    '''
+    def fingerprint(self, recordId):
+        return self._fingerprints[recordId]
+
+
+    '''
+    Function Name: name(recordId)
+    Description: Function returns the name of a record
+    Parameters:
+            (recordId) - int - id of the record
+    Return Type:
+            str
+    '''
+    def name(self, recordId):
+        return self._names[recordId]
+
+
+    '''
+    Function Name: recordIds(fingerprint)
+    Description: Function returns the ids of the records with a fingerprint, starting with the unique record
+    Parameters:
+            (fingerprint) - str - fingerprint
+    Return Type:
+            list of int - empty if no record has the fingerprint
+    '''
+    def recordIds(self, fingerprint):
+        return list(self._records.get(fingerprint, []))
+
+
+    '''
+    Function Name: isDuplicate(recordId)
+    Description: Function checks if a record is a duplicate of an earlier record
+    Parameters:
+            (recordId) - int - id of the record
+    Return Type:
+            bool
+    '''
+    def isDuplicate(self, recordId):
+        fingerprint = self._fingerprints[recordId]
+        return fingerprint is not None and self._records[fingerprint][0] != recordId
+
+
+    '''
+    Function Name: isSkipped(recordId)
+    Description: Function checks if a record was added with addSkipped()
+    Parameters:
+            (recordId) - int - id of the record
+    Return Type:
+            bool
+    '''
+    def isSkipped(self, recordId):
+        return self._uniqueIds[recordId] < 0
+
+
+    '''
+    Function Name: duplicates()
+    Description: Function returns the fingerprints that are shared by more than one record
+    Parameters: None
+    Return Type:
+            dictionary - fingerprint : list of the ids of the records with that fingerprint
+    '''
+    def duplicates(self):
+        return {fingerprint: list(records) for fingerprint, records in self._records.items() if len(records) > 1}
+
+
+    '''
+    Function Name: uniqueIndex()
+    Description: Function returns the position of the unique record of every record among the unique records, so an array of
+    results for the unique records is fanned out to every record with results[index.uniqueIndex()]. Skipped records are -1, so
+    their rows have to be masked with index.uniqueIndex() >= 0
+    Parameters: None
+    Return Type:
+            numpy array of int64
+    '''
+    def uniqueIndex(self):
+        return np.array(self._uniqueIds, dtype=np.int64)
+
+
+    '''
+    Function Name: fanOut(results)
+    Description: Function fans the results of the unique records back out to every record
+    Parameters:
+            (results) - sequence - one result for every unique record, in the order the unique records were added
+    Return Type:
+            list - result of the unique record of every record, in record id order. None for skipped records
+    '''
+    def fanOut(self, results):
+        return [results[uniqueId] if uniqueId >= 0 else None for uniqueId in self._uniqueIds]
+
+
+'''
+Function Name: _recordName(record)
+Description: Internal function that reads the name of a structure type record from its name line without parsing the record
+Parameters:
+        (record) - list of str - lines of the record
+Return Type:
+        str - name of the record, or an empty string if it does not start with a name line
+'''
+def _recordName(record):
+    if record and record[0].startswith(RECORD_START):
+        return record[0][len(RECORD_START):].strip()
+    return ''
+
+
+'''
+Function Name: iterStructures(source, lazy=False, index=None)
+Description: Generator that lazily streams Structure objects from a corpus of structure type records. Only one record
+is held in memory at a time, so whole-corpus passes can be run in constant memory. Records that are not proper .st
+format are reported and skipped.
+Parameters:
+        (source) - str or list - a structure type file(single or multi-record, optionally gzipped), a tar archive,
+                   a directory, a glob pattern, or a list of any of these
+        (lazy=False) - bool - when true, the feature lines of each record are only parsed when one of its components is
+                       accessed, so passes that only use the sequences, annotations, or component counts skip them
+        (index=None) - FingerprintIndex - when given, every record is added to the index and duplicates of earlier records
+                       are skipped. Only the header lines of a duplicate are parsed. Records that are not proper .st format
+                       are added with FingerprintIndex.addSkipped()
+Return Type:
+        generator of Structure objects
+'''
+def iterStructures(source, lazy=False, index=None):
+    for path in _expandSource(source):
+        try:
+            for name, stream in _iterTextSources(path):
+                for record in iterRecords(stream):
+                    structure = Structure()
+                    if not structure._loadLines(record, name, lazy or index is not None):
+                        if index is not None:
+                            index.addSkipped(_recordName(record))
+                        continue
+                    if index is not None:
+                        if not index.addStructure(structure):
+                            continue
+                        if not lazy:
+                            structure._parseDeferredFeatures()
+                    yield structure
+
+        except OSError: #error finding, opening, or decompressing file
+            print(f'An error ocurred when trying to access the file: {path}')
+        except tarfile.TarError: #archive is not a readable tar file
+            print(f'Could not read the archive: {path}')
+
+
+'''
+Function Name: iterDotBracketStructures(records, index=None)
+Description: Generator that streams Structure objects annotated directly from sequences and dot-bracket strings(see the
+StructureAnnotation module), for example the output of a folding pipeline. Records with an invalid dot-bracket are reported
+and skipped. The structures can be packed into a binary corpus with StructureBinary.writeBinaryCorpus().
+Parameters:
+        (records) - iterable of tuples - (sequence, dbn) or (name, sequence, dbn) for every molecule
+        (index=None) - FingerprintIndex - when given, every record is added to the index and duplicates of earlier records
+                       are skipped without being annotated. Records with an invalid dot-bracket are added with
+                       FingerprintIndex.addSkipped(), so record ids are the positions of the records
+Return Type:
+        generator of Structure objects
+'''
+def iterDotBracketStructures(records, index=None):
+    for record in records:
+        name = record[0] if len(record) == 3 else ''
+        sequence, dbn = record[-2:]
+        fingerprint = None
+        if index is not None:
+            fingerprint = structureFingerprint(sequence, dbn)
+            if fingerprint is None: #not a valid dot-bracket, so it can not be annotated either
+                index.addSkipped(name)
+                continue
+            if fingerprint in index:
+                index.add(fingerprint, name)
+                continue
+
+        annotation = annotateDotBracket(sequence, dbn, name=name)
+        if annotation is None:
+            if index is not None:
+                index.addSkipped(name)
+            continue
+        if index is not None:
+            index.add(fingerprint, name)
+        structure = Structure()
+        structure._deserialize(annotation)
+        yield structure
+
+
+
+'''
+Function Name: _parseCorpusFiles(paths)
+Description: Internal function run inside the worker processes of loadCorpus(). Parses every record in each of the given
+files and returns the records as compact serialized Structures. Any error raised while reading a file is caught and
+reported for that file so a single bad file does not abort the batch.
+Parameters:
+        (paths) - list of str - corpus files to parse
+Return Type:
+        list of (str, list, str) tuples - (path, serialized Structures, error message or None) for every file. Records that
+        are not proper .st format are replaced by their name(a str)
+'''
+def _parseCorpusFiles(paths):
+    results = []
+    for path in paths:
+        try:
+            records = []
+            for name, stream in _iterTextSources(path):
+                for record in iterRecords(stream):
+                    structure = Structure()
+                    records.append(structure._serialize() if structure._loadLines(record, name) else _recordName(record))
+            results.append((path, records, None))
+        except Exception as e: #report the failure and keep the batch running
+            results.append((path, [], f'{type(e).__name__}: {e}'))
+
+    return results
+
+
+'''
+Function Name: _loadCorpusResults(results, index=None)
+Description: Internal generator that turns the results of _parseCorpusFiles() back into Structure objects
+Parameters:
+        (results) - list of (str, list, str) tuples - results produced by _parseCorpusFiles()
+        (index=None) - FingerprintIndex - when given, every record is added to the index and duplicates are dropped before
+                       their Structure objects are built. Records that are not proper .st format are added with
+                       FingerprintIndex.addSkipped()
+Return Type:
+        generator of (str, list, str) tuples - (path, list of Structure objects, error message or None)
+'''
+def _loadCorpusResults(results, index=None):
+    for path, records, error in results:
+        structures = []
+        for data in records:
+            if isinstance(data, str): #name of a record that is not proper .st format
+                if index is not None:
+                    index.addSkipped(data)
+                continue
+            if index is not None and not index.add(structureFingerprint(data[3], data[4]), data[0]):
+                continue
+            structure = Structure()
+            structure._deserialize(data)
+            structures.append(structure)
+        yield (path, structures, error)
+
+
+'''
+Function Name: loadCorpus(paths, workers=None, ordered=True, chunksize=DEFAULT_CHUNKSIZE, index=None)
+Description: Generator that parses a corpus of structure type files in parallel using a pool of worker processes. Files are
+fanned out to the workers in chunks, the workers send back compact serialized Structures, and the Structure objects are
+rebuilt in the calling process. Errors are reported per file without aborting the rest of the batch: files that do not
+exist, can not be opened or decompressed, or are not readable archives are yielded with an error message.
+Parameters:
+        (paths) - str or list - corpus source(s). Accepts anything accepted by iterStructures()
+        (workers=None) - int - number of worker processes. Defaults to the number of CPUs. A value of 1 parses the
+                         corpus in the calling process
+        (ordered=True) - bool - when True, results are yielded in the same order as the corpus files. When False, results
+                         are yielded as soon as each chunk of files is finished
+        (chunksize=DEFAULT_CHUNKSIZE) - int - number of files sent to a worker at a time
+        (index=None) - FingerprintIndex - when given, every record is added to the index in the order the results are
+                       yielded, and duplicates of earlier records are left out of the lists of Structure objects. Records that
+                       are not proper .st format are added with FingerprintIndex.addSkipped(). The records of a file that can
+                       not be read are not added
+Return Type:
+        generator of (str, list, str) tuples - (path, list of Structure objects, error message or None) for every file
+'''
+def loadCorpus(paths, workers=None, ordered=True, chunksize=DEFAULT_CHUNKSIZE, index=None):
+    files = _expandSource(paths, keepMissing=True)
+    chunksize = max(1, int(chunksize))
+    chunks = [files[i:i+chunksize] for i in range(0, len(files), chunksize)]
+
+    #parse in the calling process when only one worker is requested
+    if workers == 1:
+        for chunk in chunks:
+            yield from _loadCorpusResults(_parseCorpusFiles(chunk), index)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        if ordered:
+            for results in executor.map(_parseCorpusFiles, chunks):
+                yield from _loadCorpusResults(results, index)
+        else:
+            futures = [executor.submit(_parseCorpusFiles, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                yield from _loadCorpusResults(future.result(), index)
+
+
+'''
+Function Name: saveBinaryCorpus(source, directory)
+Description: Function parses a corpus once and packs every structure into a binary corpus(see the StructureBinary module).
+The records are streamed with iterStructures(), and later passes can read the binary corpus with iterBinaryStructures()
+instead of re-parsing the structure type text.
+Parameters:
+        (source) - str or list - corpus source(s). Accepts anything accepted by iterStructures()
+        (directory) - str - directory to write the binary corpus to. It is created if it does not exist
+Return Type:
+        int - number of structures written
+'''
+def saveBinaryCorpus(source, directory):
+    return writeBinaryCorpus(iterStructures(source), directory)
+
+
+'''
+Function Name: iterBinaryStructures(directory, views=False, index=None)
+Description: Generator that streams Structure objects from a binary corpus written by saveBinaryCorpus(). The corpus is memory
+mapped, so only one structure is held in memory at a time.
+Parameters:
+        (directory) - str - binary corpus directory
+        (views=False) - bool - when true, the sequences and annotations of the structures are StructureBinary.BufferView objects
+                        into the memory mapped corpus, so structures that are kept do not hold copies of their text
+        (index=None) - FingerprintIndex - when given, every record is added to the index and duplicates of earlier records
+                       are skipped. Only the sequence and dot-bracket of a duplicate are read
+Return Type:
+        generator of Structure objects
+'''
+def iterBinaryStructures(directory, views=False, index=None):
+    corpus = BinaryCorpus(directory)
+    for record in range(len(corpus)):
+        if index is not None:
+            fingerprint = structureFingerprint(corpus.text('sequence', record), corpus.text('dbn', record))
+            if not index.add(fingerprint, corpus.text('name', record)):
+                continue
+        structure = Structure()
+        structure._deserialize(corpus.record(record, views=views))
+        yield structure
+
+
+'''
+Function Name: _corpusComponents(source, components, deduplicate)
+Description: Internal function that collects one type of component from every structure in a corpus. With deduplicate, the
+components of duplicate records are not collected, and the rows of their unique records are returned for them instead
+Parameters:
+        (source) - str or list - corpus source(s). Accepts anything accepted by iterStructures()
+        (components) - function - returns the list of components of a Structure object, such as Structure.stems
+        (deduplicate) - bool - when true, duplicate records are skipped with a FingerprintIndex
+Return Type:
+        (list of (str, str) tuples, list, numpy array of int64) - (structure name, component label) for every component of every
+        record, the collected components, and the position in the collected components of every key
+'''
+def _corpusComponents(source, components, deduplicate):
+    index = FingerprintIndex() if deduplicate else None
+    names = []
+    collected = []
+    offsets = [0] #position of the first component of every structure in collected
+    for structure in iterStructures(source, index=index):
+        names.append(structure.name())
+        collected.extend(components(structure))
+        offsets.append(len(collected))
+
+    labels = [component.label() for component in collected]
+    if index is None:
+        records = range(len(names))
+        uniqueIds = range(len(names))
+    else:
+        records = range(len(index))
+        uniqueIds = index.uniqueIndex().tolist()
+        names = [index.name(record) for record in records]
+
+    keys = []
+    rows = []
+    for record, uniqueId in zip(records, uniqueIds):
+        if uniqueId < 0: #records that were not loaded have no components
+            continue
+        structureRows = range(offsets[uniqueId], offsets[uniqueId + 1])
+        keys.extend((names[record], labels[row]) for row in structureRows)
+        rows.extend(structureRows)
+    return keys, collected, np.array(rows, dtype=np.int64)
+
+
+'''
+Function Name: corpusStemEnergy(source, strict=True, init=False, temperature=T, deduplicate=False)
+Description: Function calculates the energy of every stem in a corpus in one batch using BatchEnergy.batchStemEnergy().
+The records are streamed with iterStructures(), so only the stems are kept in memory.
+Parameters:
+        (source) - str or list - corpus source(s). Accepts anything accepted by iterStructures()
+        (strict=True) -- bool -- when true, stems with a missing stacking parameter are masked as missing
+        (init=False) -- bool -- when true, the 4.09 Kcal/mol initiation value is included in the energies
+        (temperature=T) -- float -- temperature in Kelvin
+        (deduplicate=False) -- bool -- when true, the stems of records that duplicate an earlier record(see FingerprintIndex)
+                               are not calculated, and the energies of the earlier record are returned for them
+Return Type:
+        (list of (str, str) tuples, numpy array of float64, numpy array of bool) - (structure name, stem label) for every stem,
+        the energy of each stem, and the mask of stems without an energy
+'''
+def corpusStemEnergy(source, strict=True, init=False, temperature=T, deduplicate=False):
+    keys, stems, rows = _corpusComponents(source, Structure.stems, deduplicate)
+    energies, missing = batchStemEnergy(stems, strict=strict, init=init, temperature=temperature)
+    return keys, energies[rows], missing[rows]
+
+
+'''
+Function Name: corpusHairpinEnergy(source, strict=True, temperature=T, deduplicate=False)
+Description: Function calculates the energy of every hairpin in a corpus in one batch using BatchEnergy.batchHairpinEnergy()
+Parameters:
+        (source) - str or list - corpus source(s). Accepts anything accepted by iterStructures()
+        (strict=True) -- bool -- when true, hairpins with a missing terminal mismatch parameter are masked as missing
+        (temperature=T) -- float -- temperature in Kelvin
+        (deduplicate=False) -- bool -- when true, the hairpins of duplicate records are not calculated. See corpusStemEnergy()
+Return Type:
+        (list of (str, str) tuples, numpy array of float64, numpy array of bool) - (structure name, hairpin label) for every hairpin,
+        the energy of each hairpin, and the mask of hairpins without an energy
+'''
+def corpusHairpinEnergy(source, strict=True, temperature=T, deduplicate=False):
+    keys, hairpins, rows = _corpusComponents(source, Structure.hairpins, deduplicate)
+    sequences = [hairpin.sequence() for hairpin in hairpins]
+    closingPairs = [hairpin.closingPair() for hairpin in hairpins]
+
+    energies, missing = batchHairpinEnergy(sequences, closingPairs, strict=strict, temperature=temperature)
+    return keys, energies[rows], missing[rows]
+
+
+'''
+Function Name: corpusInternalLoopEnergy(source, strict=True, temperature=T, deduplicate=False)
+Description: Function calculates the energy of every internal loop in a corpus in one batch using BatchEnergy.batchInternalLoopEnergy()
+Parameters:
+        (source) - str or list - corpus source(s). Accepts anything accepted by iterStructures()
+        (strict=True) -- bool -- when true, internal loops with a missing parameter are masked as missing
+        (temperature=T) -- float -- temperature in Kelvin
+        (deduplicate=False) -- bool -- when true, the internal loops of duplicate records are not calculated. See corpusStemEnergy()
+Return Type:
+        (list of (str, str) tuples, numpy array of float64, numpy array of bool) - (structure name, internal loop label) for every
+        internal loop, the energy of each internal loop, and the mask of internal loops without an energy
+'''
+def corpusInternalLoopEnergy(source, strict=True, temperature=T, deduplicate=False):
+    keys, internalLoops, rows = _corpusComponents(source, Structure.internalLoops, deduplicate)
+    loops5p = []
+    loops3p = []
+    for internalLoop in internalLoops:
+        loop5p, loop3p = internalLoop.loops()
+        loops5p.append(loop5p)
+        loops3p.append(loop3p)
+    closingPairs = [internalLoop.closingPairs() for internalLoop in internalLoops]
+
+    energies, missing = batchInternalLoopEnergy(loops5p, loops3p, closingPairs, strict=strict, temperature=temperature)
+    return keys, energies[rows], missing[rows]
@@ -0,0 +1,163 @@
+'''
+Filename: StructureTokenizer.py
+Author: Michael Hathaway
+
+Description: The Structure Tokenizer module converts the feature lines of a structure type file into typed values. Each
+feature type has a precompiled regular expression that extracts every span, sequence, and closing pair of a line in a
+single pass. The tokenizer functions are used by the Structure object when parsing structure type files.
+
+Feature line formats:
+    S1 1..7 "CUGGCGG" 40..46 "CCGCCAG"
+    H1 22..25 "GAAA" (21,26) C:G PK{1}
+    B1 17..17 "A" (16,35) G:C (18,34) C:G PK{1}
+    I1.1 9..10 "AA" (8,39) G:C
+    M1.1 25..27 "ACU" (24,70) G:C (28,40) A:U
+    X1 47..50 "AAAA" (40,46) C:G (51,60) G:C
+    E1 1..3 "GGA"
+    NCBP1 12 U 30 U S2
+'''
+
+## Module Imports ##
+import re
+
+## Compiled Feature Line Patterns ##
+_SPAN = r'(\d+)\.\.(\d+) "([^"]*)"' #start..stop "sequence"
+_PAIR = r'\((\d+),(\d+)\) (\S):(\S)' #(5' index,3' index) 5' base:3' base
+_PK = r'(?:\s+PK\{(\d+))?' #optional pseudoknot annotation
+
+STEM_PATTERN = re.compile(r'(S\d+) ' + _SPAN + ' ' + _SPAN)
+HAIRPIN_PATTERN = re.compile(r'(H\d+) ' + _SPAN + ' ' + _PAIR + _PK)
+BULGE_PATTERN = re.compile(r'(B\d+) ' + _SPAN + ' ' + _PAIR + ' ' + _PAIR + _PK)
+INTERNAL_LOOP_PATTERN = re.compile(r'(I\d+)\.(\d+) ' + _SPAN + ' ' + _PAIR)
+MULTILOOP_PATTERN = re.compile(r'(M\d+)\.(\d+) ' + _SPAN + ' ' + _PAIR + ' ' + _PAIR)
+EXTERNAL_LOOP_PATTERN = re.compile(r'(X\d+) ' + _SPAN + ' ' + _PAIR + ' ' + _PAIR)
+END_PATTERN = re.compile(r'(E\d+) ' + _SPAN)
+NCBP_PATTERN = re.compile(r'(NCBP\d+) (\d+) (\S) (\d+) (\S)(?: (\S+))?')
+
+
+'''
+Function Name: _match(pattern, line, featureType)
+Description: Internal function that matches a feature line against its pattern
+Parameters:
+        (pattern) - compiled regular expression - pattern for the feature type
+        (line) - str - feature line from a structure type file
+        (featureType) - str - name of the feature type used in the error message
+Return Type:
+        tuple - the groups of the match
+'''
+def _match(pattern, line, featureType):
+    match = pattern.match(line)
+    if match is None:
+        raise ValueError(f'Could not parse {featureType} line: {line}')
+    return match.groups()
+
+
+'''
+Function Name: tokenizeStem(line)
+Description: Function converts a stem line into typed values
+Parameters:
+        (line) - str - stem line from a structure type file
+Return Type:
+        tuple - (label, 5' sequence, 3' sequence, (5' start, 5' stop), (3' start, 3' stop))
+'''
+def tokenizeStem(line):
+    label, start5p, stop5p, seq5p, start3p, stop3p, seq3p = _match(STEM_PATTERN, line, 'stem')
+    return (label, seq5p, seq3p, (int(start5p), int(stop5p)), (int(start3p), int(stop3p)))
+
+
+'''
+Function Name: tokenizeHairpin(line)
+Description: Function converts a hairpin line into typed values
+Parameters:
+        (line) - str - hairpin line from a structure type file
+Return Type:
+        tuple - (label, sequence, (start, stop), (5' closing base, 3' closing base), (5' closing index, 3' closing index), pk)
+'''
+def tokenizeHairpin(line):
+    label, start, stop, seq, close5p, close3p, base5p, base3p, pk = _match(HAIRPIN_PATTERN, line, 'hairpin')
+    return (label, seq, (int(start), int(stop)), (base5p, base3p), (int(close5p), int(close3p)), pk)
+
+
+'''
+Function Name: tokenizeBulge(line)
+Description: Function converts a bulge line into typed values
+Parameters:
+        (line) - str - bulge line from a structure type file
+Return Type:
+        tuple - (label, sequence, (start, stop), preceding pair bases, preceding pair indices, trailing pair bases, trailing pair indices, pk)
+'''
+def tokenizeBulge(line):
+    (label, start, stop, seq, pre5pIndex, pre3pIndex, pre5pBase, pre3pBase,
+        trail5pIndex, trail3pIndex, trail5pBase, trail3pBase, pk) = _match(BULGE_PATTERN, line, 'bulge')
+    return (label, seq, (int(start), int(stop)), (pre5pBase, pre3pBase), (int(pre5pIndex), int(pre3pIndex)),
+            (trail5pBase, trail3pBase), (int(trail5pIndex), int(trail3pIndex)), pk)
+
+
+'''
+Function Name: tokenizeInternalLoop(line)
+Description: Function converts one of the two lines describing an internal loop into typed values
+Parameters:
+        (line) - str - internal loop line from a structure type file
+Return Type:
+        tuple - (parent label, subunit label, sequence, (start, stop), (closing base 1, closing base 2), (closing index 1, closing index 2))
+'''
+def tokenizeInternalLoop(line):
+    parentLabel, subunitLabel, start, stop, seq, close1, close2, base1, base2 = _match(INTERNAL_LOOP_PATTERN, line, 'internal loop')
+    return (parentLabel, subunitLabel, seq, (int(start), int(stop)), (base1, base2), (int(close1), int(close2)))
+
+
+'''
+Function Name: tokenizeMultiLoop(line)
+Description: Function converts a multiloop subunit line into typed values
+Parameters:
+        (line) - str - multiloop line from a structure type file
+Return Type:
+        tuple - (parent label, subunit label, sequence, (start, stop), 5' closing pair bases, 5' closing pair indices,
+                 3' closing pair bases, 3' closing pair indices)
+'''
+def tokenizeMultiLoop(line):
+    (parentLabel, subunitLabel, start, stop, seq, close5pStart, close5pEnd, base5pStart, base5pEnd,
+        close3pStart, close3pEnd, base3pStart, base3pEnd) = _match(MULTILOOP_PATTERN, line, 'multiloop')
+    return (parentLabel, subunitLabel, seq, (int(start), int(stop)), (base5pStart, base5pEnd), (int(close5pStart), int(close5pEnd)),
+            (base3pStart, base3pEnd), (int(close3pStart), int(close3pEnd)))
+
+
+'''
+Function Name: tokenizeExternalLoop(line)
+Description: Function converts an external loop line into typed values
+Parameters:
+        (line) - str - external loop line from a structure type file
+Return Type:
+        tuple - (label, sequence, (start, stop), 5' closing pair bases, 5' closing pair indices, 3' closing pair bases, 3' closing pair indices)
+'''
+def tokenizeExternalLoop(line):
+    (label, start, stop, seq, close5pStart, close5pEnd, base5pStart, base5pEnd,
+        close3pStart, close3pEnd, base3pStart, base3pEnd) = _match(EXTERNAL_LOOP_PATTERN, line, 'external loop')
+    return (label, seq, (int(start), int(stop)), (base5pStart, base5pEnd), (int(close5pStart), int(close5pEnd)),
+            (base3pStart, base3pEnd), (int(close3pStart), int(close3pEnd)))
+
+
+'''
+Function Name: tokenizeEnd(line)
+Description: Function converts an end line into typed values
+Parameters:
+        (line) - str - end line from a structure type file
+Return Type:
+        tuple - (label, sequence, (start, stop))
+'''
+def tokenizeEnd(line):
+    label, start, stop, seq = _match(END_PATTERN, line, 'end')
+    return (label, seq, (int(start), int(stop)))
+
+
+'''
+Function Name: tokenizeNCBP(line)
+Description: Function converts an NCBP line into typed values
+Parameters:
+        (line) - str - NCBP line from a structure type file
+Return Type:
+        tuple - (label, (5' base, 3' base), (5' index, 3' index), label of the containing structure or None)
+'''
+def tokenizeNCBP(line):
+    label, index5p, base5p, index3p, base3p, loc = _match(NCBP_PATTERN, line, 'NCBP')
+    return (label, (base5p, base3p), (int(index5p), int(index3p)), loc)
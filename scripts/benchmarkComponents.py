@@ -0,0 +1,128 @@
+'''
+Filename: benchmarkComponents.py
+Author: Michael Hathaway
+
+Description: Benchmark comparing the memory use and construction speed of the slotted StructureComponent classes against
+the previous classes, which stored their member variables in a per-instance __dict__ and built the Stem base pair list at
+construction. The previous classes are rebuilt from the current ones without __slots__, so both versions run the same methods.
+The script builds every component of a corpus with both versions and reports the traced heap size and the number of
+components built per second.
+
+Usage:
+python3 benchmarkComponents.py <corpus source> [--repeat N]
+'''
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from StructureCorpus import iterStructures
+from StructureComponents import Stem, Hairpin, Bulge, InternalLoop, MultiLoop, ExternalLoop, NCBP, End
+
+#component classes in the order they are stored in a serialized Structure
+COMPONENT_CLASSES = (Stem, Hairpin, Bulge, InternalLoop, MultiLoop, ExternalLoop, NCBP, End)
+
+
+'''
+Function: dictClass(cls)
+Description: Function rebuilds a slotted component class as a class that stores its member variables in a __dict__. The
+rebuilt Stem class builds its base pair list at construction like the previous Stem class
+parameters: (cls) -- class -- slotted StructureComponent class
+Return Type: class
+'''
+def dictClass(cls):
+    namespace = {name: value for name, value in vars(cls).items() if name not in cls.__slots__ and name != '__slots__'}
+    if cls is Stem:
+        slottedInit = cls.__init__
+        def eagerInit(self, *args, **kwargs):
+            slottedInit(self, *args, **kwargs)
+            self._pairs()
+        namespace['__init__'] = eagerInit
+    return type(cls.__name__, (), namespace)
+
+
+'''
+Function: collectArguments(source)
+Description: Function collects the constructor arguments of every component in a corpus
+parameters: (source) -- str -- corpus source accepted by StructureCorpus.iterStructures()
+Return Type: list of (class, list of tuples) - component class and the constructor arguments of each component
+'''
+def collectArguments(source):
+    arguments = [(cls, []) for cls in COMPONENT_CLASSES]
+    for structure in iterStructures(source):
+        for (cls, componentArguments), serialized in zip(arguments, structure._serialize()[7:]):
+            componentArguments.extend(serialized)
+    return arguments
+
+
+'''
+Function: build(arguments, classes)
+Description: Function constructs every component
+parameters: (arguments) -- list -- result of collectArguments()
+            (classes) -- dict -- slotted class : class used to construct its components
+Return Type: list of component objects
+'''
+def build(arguments, classes):
+    components = []
+    for cls, componentArguments in arguments:
+        construct = classes[cls]
+        components.extend(construct(*args) for args in componentArguments)
+    return components
+
+
+'''
+Function: measure(arguments, classes, repeat)
+Description: Function measures the heap size and construction rate of the components
+parameters: (arguments) -- list -- result of collectArguments()
+            (classes) -- dict -- slotted class : class used to construct its components
+            (repeat) -- int -- number of timed constructions. The fastest is reported
+Return Type: (int, float) - traced bytes held by the components, components built per second
+'''
+def measure(arguments, classes, repeat):
+    tracemalloc.start()
+    components = build(arguments, classes)
+    heapSize = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del components
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        components = build(arguments, classes)
+        best = min(best, time.perf_counter() - start)
+        del components
+    return heapSize, sum(len(componentArguments) for cls, componentArguments in arguments) / best
+
+
+'''
+Function: parseArgs()
+Description: Function to handle command line arguments
+parameters: None
+Return Type: argparse namespace
+'''
+def parseArgs():
+    parser = argparse.ArgumentParser(description="Benchmark the memory use and construction speed of the StructureComponent classes.")
+    parser.add_argument('Corpus', help="Structure type file, directory, glob pattern, or archive.", type=str)
+    parser.add_argument('--repeat', help="Number of timed constructions of the components.", type=int, default=5)
+    return parser.parse_args()
+
+
+## Main Function ##
+if __name__ == '__main__':
+    args = parseArgs()
+    arguments = collectArguments(args.Corpus)
+    numComponents = sum(len(componentArguments) for cls, componentArguments in arguments)
+    if not numComponents:
+        print(f'No components found in {args.Corpus}')
+        sys.exit()
+
+    dictBytes, dictRate = measure(arguments, {cls: dictClass(cls) for cls in COMPONENT_CLASSES}, args.repeat)
+    slotBytes, slotRate = measure(arguments, {cls: cls for cls in COMPONENT_CLASSES}, args.repeat)
+    print(f'components: {numComponents}')
+    print(f'__dict__ classes: {dictBytes / numComponents:,.1f} bytes/component, {dictRate:,.0f} components/second')
+    print(f'__slots__ classes: {slotBytes / numComponents:,.1f} bytes/component, {slotRate:,.0f} components/second')
+    print(f'memory reduction: {1 - slotBytes / dictBytes:.1%}')
+    print(f'speedup: {slotRate / dictRate:.2f}x')
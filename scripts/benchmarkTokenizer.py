@@ -0,0 +1,188 @@
+'''
+Filename: benchmarkTokenizer.py
+Author: Michael Hathaway
+
+Description: Microbenchmark comparing the character-by-character span and sequence scanning that the Structure object
+previously used to parse feature lines against the compiled regular expressions in the StructureTokenizer module.
+The script collects every feature line in a (multi-record) structure type file, checks that both approaches produce the
+same values, and reports the number of lines parsed per second by each approach.
+
+Usage:
+python3 benchmarkTokenizer.py <structure type file> [--repeat N]
+'''
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from StructureTokenizer import tokenizeStem, tokenizeHairpin, tokenizeBulge, tokenizeInternalLoop, tokenizeMultiLoop, tokenizeExternalLoop, tokenizeEnd
+
+
+'''
+Character scanning helpers
+These reproduce the loops that were previously repeated in every Structure._parse*Data() method.
+'''
+def _scanStart(token):
+    start = ''
+    for char in token:
+        if char.isnumeric():
+            start += char
+        else:
+            break
+    return int(start)
+
+def _scanStop(token):
+    stop = ''
+    for char in reversed(token):
+        if char.isnumeric():
+            stop += char
+        else:
+            break
+    return int(stop[::-1])
+
+def _scanSequence(token):
+    seq = ''
+    for char in token:
+        if char.isalpha():
+            seq += char
+    return seq
+
+def _scanPairStart(token):
+    index = ''
+    for char in token:
+        if char.isnumeric():
+            index += char
+        elif char == ',':
+            break
+    return int(index)
+
+def _scanPairEnd(token):
+    index = ''
+    for char in reversed(token):
+        if char.isnumeric():
+            index += char
+        elif char == ',':
+            break
+    return int(index[::-1])
+
+def _scanPair(indexToken, baseToken):
+    return ((baseToken[0], baseToken[2]), (_scanPairStart(indexToken), _scanPairEnd(indexToken)))
+
+
+'''
+Function: legacyTokenize(line)
+Description: Function extracts the values of a feature line using character scanning
+parameters: (line) -- str -- feature line from a structure type file
+Return Type: tuple of the same values returned by the StructureTokenizer functions
+'''
+def legacyTokenize(line):
+    data = line.split(' ')
+    kind = line[0]
+    if kind == 'S':
+        return (data[0], _scanSequence(data[2]), _scanSequence(data[4]), (_scanStart(data[1]), _scanStop(data[1])), (_scanStart(data[3]), _scanStop(data[3])))
+    elif kind == 'H':
+        pk = data[5][3] if len(data) > 5 and data[5] != '' else None
+        pair, pairSpan = _scanPair(data[3], data[4])
+        return (data[0], _scanSequence(data[2]), (_scanStart(data[1]), _scanStop(data[1])), pair, pairSpan, pk)
+    elif kind == 'B':
+        pk = data[7][3] if len(data) > 7 and data[7] != '' else None
+        pair5p, pair5pSpan = _scanPair(data[3], data[4])
+        pair3p, pair3pSpan = _scanPair(data[5], data[6])
+        return (data[0], _scanSequence(data[2]), (_scanStart(data[1]), _scanStop(data[1])), pair5p, pair5pSpan, pair3p, pair3pSpan, pk)
+    elif kind == 'I':
+        pair, pairSpan = _scanPair(data[3], data[4])
+        return (data[0].partition('.')[0], data[0][-1], _scanSequence(data[2]), (_scanStart(data[1]), _scanStop(data[1])), pair, pairSpan)
+    elif kind == 'M':
+        pair5p, pair5pSpan = _scanPair(data[3], data[4])
+        pair3p, pair3pSpan = _scanPair(data[5], data[6])
+        return (data[0].partition('.')[0], data[0][-1], _scanSequence(data[2]), (_scanStart(data[1]), _scanStop(data[1])), pair5p, pair5pSpan, pair3p, pair3pSpan)
+    elif kind == 'X':
+        pair5p, pair5pSpan = _scanPair(data[3], data[4])
+        pair3p, pair3pSpan = _scanPair(data[5], data[6])
+        return (data[0], _scanSequence(data[2]), (_scanStart(data[1]), _scanStop(data[1])), pair5p, pair5pSpan, pair3p, pair3pSpan)
+    else:
+        return (data[0], _scanSequence(data[2]), (_scanStart(data[1]), _scanStop(data[1])))
+
+
+TOKENIZERS = {'S': tokenizeStem, 'H': tokenizeHairpin, 'B': tokenizeBulge, 'I': tokenizeInternalLoop,
+              'M': tokenizeMultiLoop, 'X': tokenizeExternalLoop, 'E': tokenizeEnd}
+
+
+'''
+Function: regexTokenize(line)
+Description: Function extracts the values of a feature line using the StructureTokenizer module
+parameters: (line) -- str -- feature line from a structure type file
+Return Type: tuple
+'''
+def regexTokenize(line):
+    return TOKENIZERS[line[0]](line)
+
+
+'''
+Function: collectFeatureLines(filename)
+Description: Function reads every stem, hairpin, bulge, internal loop, multiloop, external loop, and end line in a file
+parameters: (filename) -- str -- structure type file
+Return Type: list of str
+'''
+def collectFeatureLines(filename):
+    lines = []
+    with open(filename, 'r') as f:
+        for line in f:
+            line = line.rstrip('\r\n')
+            if line[:1] in TOKENIZERS and line[1:2].isdigit(): #skips segment lines
+                lines.append(line)
+    return lines
+
+
+'''
+Function: benchmark(function, lines, repeat)
+Description: Function times how long it takes to tokenize all the lines
+parameters: (function) -- function -- tokenizer to time
+            (lines) -- list -- feature lines to tokenize
+            (repeat) -- int -- number of passes over the lines. The fastest pass is reported
+Return Type: float - lines per second
+'''
+def benchmark(function, lines, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in lines:
+            function(line)
+        best = min(best, time.perf_counter() - start)
+    return len(lines) / best
+
+
+'''
+Function: parseArgs()
+Description: Function to handle command line arguments
+parameters: None
+Return Type: argparse namespace
+'''
+def parseArgs():
+    parser = argparse.ArgumentParser(description="Benchmark the structure type feature line tokenizer.")
+    parser.add_argument('Input_File', help="Structure type file to tokenize. Multi-record files are supported.", type=str)
+    parser.add_argument('--repeat', help="Number of timed passes over the feature lines.", type=int, default=5)
+    return parser.parse_args()
+
+
+## Main Function ##
+if __name__ == '__main__':
+    args = parseArgs()
+    lines = collectFeatureLines(args.Input_File)
+    if not lines:
+        print(f'No feature lines found in {args.Input_File}')
+        sys.exit()
+
+    #check that both approaches agree before timing them
+    mismatches = [line for line in lines if legacyTokenize(line) != regexTokenize(line)]
+    if mismatches:
+        print(f'{len(mismatches)} lines tokenized differently. First: {mismatches[0]}')
+
+    legacyRate = benchmark(legacyTokenize, lines, args.repeat)
+    regexRate = benchmark(regexTokenize, lines, args.repeat)
+    print(f'feature lines: {len(lines)}')
+    print(f'character scanning: {legacyRate:,.0f} lines/second')
+    print(f'compiled regex:     {regexRate:,.0f} lines/second')
+    print(f'speedup:            {regexRate / legacyRate:.2f}x')
@@ -0,0 +1,102 @@
+'''
+Filename: validateBatchEnergy.py
+Author: Michael Hathaway
+
+Description: Script that validates the BatchEnergy module against the scalar StructureComponent energy() methods. Every
+component of a corpus(for example the full bpRNA set) is evaluated with both the batch functions and the energy() methods in
+strict and non-strict mode. The script reports the number of components whose results differ and the time taken by each approach.
+
+Usage:
+python3 validateBatchEnergy.py <corpus source> [--temperature K]
+'''
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from StructureCorpus import iterStructures
+from BatchEnergy import batchStemEnergy, batchHairpinEnergy, batchBulgeEnergy, batchInternalLoopEnergy
+
+
+'''
+Function: collectComponents(source)
+Description: Function collects the components of every structure in a corpus
+parameters: (source) -- str -- corpus source accepted by StructureCorpus.iterStructures()
+Return Type: dict - component type : list of StructureComponent objects
+'''
+def collectComponents(source):
+    components = {'stems': [], 'hairpins': [], 'bulges': [], 'internal loops': []}
+    for structure in iterStructures(source):
+        components['stems'].extend(structure.stems())
+        components['hairpins'].extend(structure.hairpins())
+        components['bulges'].extend(structure.bulges())
+        components['internal loops'].extend(structure.internalLoops())
+    return components
+
+
+'''
+Function: compare(components, scalar, batch)
+Description: Function compares the batch energies of a list of components with their scalar energies
+parameters: (components) -- list -- StructureComponent objects
+            (scalar) -- function -- function(component) that returns the scalar energy of a component
+            (batch) -- function -- function(components) that returns the batch energies and missing mask
+Return Type: (int, float, float) - number of components with different results, scalar time, batch time
+'''
+def compare(components, scalar, batch):
+    start = time.perf_counter()
+    expected = [scalar(component) for component in components]
+    scalarTime = time.perf_counter() - start
+
+    start = time.perf_counter()
+    energies, missing = batch(components)
+    batchTime = time.perf_counter() - start
+
+    mismatches = 0
+    for energy, batchEnergy, batchMissing in zip(expected, energies, missing):
+        if (energy is None) != bool(batchMissing) or (energy is not None and energy != batchEnergy):
+            mismatches += 1
+
+    return mismatches, scalarTime, batchTime
+
+
+'''
+Function: parseArgs()
+Description: Function to handle command line arguments
+parameters: None
+Return Type: argparse namespace
+'''
+def parseArgs():
+    parser = argparse.ArgumentParser(description="Validate the batch energy functions against the scalar energy() methods.")
+    parser.add_argument('Corpus', help="Structure type file, directory, glob pattern, or archive.", type=str)
+    parser.add_argument('--temperature', help="Temperature in Kelvin used for the energies.", type=float, default=310.15)
+    return parser.parse_args()
+
+
+## Main Function ##
+if __name__ == '__main__':
+    args = parseArgs()
+    components = collectComponents(args.Corpus)
+    temperature = args.temperature
+
+    checks = {
+        'stems': (lambda stem, strict: stem.energy(strict=strict, temperature=temperature),
+                  lambda stems, strict: batchStemEnergy(stems, strict=strict, temperature=temperature)),
+        'hairpins': (lambda hairpin, strict: hairpin.energy(strict=strict, temperature=temperature),
+                     lambda hairpins, strict: batchHairpinEnergy([h.sequence() for h in hairpins], [h.closingPair() for h in hairpins], strict=strict, temperature=temperature)),
+        'bulges': (lambda bulge, strict: bulge.energy(strict=strict, temperature=temperature),
+                   lambda bulges, strict: batchBulgeEnergy([b.sequence() for b in bulges], [b.closingPair5p() for b in bulges],
+                                                           [b.closingPair3p() for b in bulges], strict=strict, temperature=temperature)),
+        'internal loops': (lambda internalLoop, strict: internalLoop.energy(strict=strict, temperature=temperature),
+                           lambda internalLoops, strict: batchInternalLoopEnergy([il.loops()[0] for il in internalLoops], [il.loops()[1] for il in internalLoops],
+                                                                                 [il.closingPairs() for il in internalLoops], strict=strict, temperature=temperature)),
+    }
+
+    for componentType, (scalar, batch) in checks.items():
+        for strict in (True, False):
+            mismatches, scalarTime, batchTime = compare(components[componentType],
+                                                        lambda component: scalar(component, strict),
+                                                        lambda batchComponents: batch(batchComponents, strict))
+            print(f'{componentType} (strict={strict}): {len(components[componentType])} components, {mismatches} mismatches, '
+                  f'scalar {scalarTime:.3f}s, batch {batchTime:.3f}s')
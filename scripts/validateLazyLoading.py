@@ -0,0 +1,84 @@
+'''
+Filename: validateLazyLoading.py
+Author: Michael Hathaway
+
+Description: Script that validates lazily loaded Structure objects against eagerly parsed ones. Every record of a corpus is
+streamed twice with StructureCorpus.iterStructures(), once with lazy=True and once without, and the energy totals, energy
+breakdowns, mutation scans, and double mutant energies of the two are compared. The lazy structures call the energy functions
+before any component accessor, and after accessors that do not parse the feature lines(numStems() and fingerprint()), so the
+deferred parse is triggered from inside the energy functions. The script reports the number of structures with different results.
+
+Usage:
+python3 validateLazyLoading.py <corpus source> [--temperature K]
+'''
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from StructureCorpus import iterStructures
+
+
+'''
+Function: energyResults(structure, temperature)
+Description: Function calculates the energy results that are compared between lazy and eager structures
+parameters: (structure) -- Structure -- structure to evaluate
+            (temperature) -- float -- temperature in Kelvin
+Return Type: tuple - non-strict total, strict total, breakdown, mutation scan of the first 3 locations, and a double mutant ddG
+'''
+def energyResults(structure, temperature):
+    positions = list(range(1, min(structure.length(), 3) + 1))
+    mutations = {position: 'A' for position in positions[:2]}
+    return (structure.energy(strict=False, temperature=temperature),
+            structure.energy(strict=True, temperature=temperature),
+            structure.energy(breakdown=True, temperature=temperature),
+            structure.scanMutations(positions, temperature=temperature),
+            structure.mutationEnergy(mutations, temperature=temperature))
+
+
+'''
+Function: sameResults(lazy, eager)
+Description: Function compares the energy results of a lazy structure with the results of the eager structure
+parameters: (lazy) -- tuple -- results of energyResults() for the lazy structure
+            (eager) -- tuple -- results of energyResults() for the eager structure
+Return Type: bool
+'''
+def sameResults(lazy, eager):
+    lazyScan, eagerScan = lazy[3], eager[3]
+    if (lazyScan is None) != (eagerScan is None):
+        return False
+    if lazyScan is not None and not np.array_equal(lazyScan, eagerScan, equal_nan=True):
+        return False
+    return lazy[:3] == eager[:3] and (lazy[4] == eager[4] or (np.isnan(lazy[4]) and np.isnan(eager[4])))
+
+
+'''
+Function: parseArgs()
+Description: Function to handle command line arguments
+parameters: None
+Return Type: argparse namespace
+'''
+def parseArgs():
+    parser = argparse.ArgumentParser(description="Validate lazily loaded structures against eagerly parsed structures.")
+    parser.add_argument('Corpus', help="Structure type file, directory, glob pattern, or archive.", type=str)
+    parser.add_argument('--temperature', help="Temperature in Kelvin used for the energies.", type=float, default=310.15)
+    return parser.parse_args()
+
+
+## Main Function ##
+if __name__ == '__main__':
+    args = parseArgs()
+    accessors = {'energy first': None, 'after numStems()': 'numStems', 'after fingerprint()': 'fingerprint'}
+    eager = [energyResults(structure, args.temperature) for structure in iterStructures(args.Corpus)]
+
+    for description, accessor in accessors.items():
+        mismatches = 0
+        for structure, expected in zip(iterStructures(args.Corpus, lazy=True), eager):
+            if accessor is not None:
+                getattr(structure, accessor)()
+            if not sameResults(energyResults(structure, args.temperature), expected):
+                mismatches += 1
+        print(f'lazy {description}: {len(eager)} structures, {mismatches} mismatches')